@@ -0,0 +1,45 @@
+"""Add token_reservations table
+
+Revision ID: 9c2e7d41a8b3
+Revises: f37ce0a5e2aa
+Create Date: 2026-10-16 10:12:05.418226
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9c2e7d41a8b3"
+down_revision: Union[str, Sequence[str], None] = "f37ce0a5e2aa"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "token_reservations",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("amount", sa.BigInteger(), nullable=False),
+        sa.Column("dialog_id", sa.UUID(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["dialog_id"], ["dialogs.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_token_reservations_created_at"), "token_reservations", ["created_at"], unique=False
+    )
+    op.create_index(
+        op.f("ix_token_reservations_user_id"), "token_reservations", ["user_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_token_reservations_user_id"), table_name="token_reservations")
+    op.drop_index(op.f("ix_token_reservations_created_at"), table_name="token_reservations")
+    op.drop_table("token_reservations")
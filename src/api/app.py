@@ -14,6 +14,7 @@ import uuid
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 from contextvars import ContextVar
+from datetime import timedelta
 
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
@@ -36,8 +37,15 @@ from src.config.logging import configure_logging, get_logger
 from src.config.settings import settings
 from src.data.database import get_session_maker
 from src.domain.model_registry import model_registry
+from src.domain.token_service import TokenService
 from src.integrations.jwt_validator import JWTValidator
-from src.shared.metrics import record_http_request
+from src.integrations.llm_factory import aclose_providers
+from src.shared.metrics import (
+    record_http_request,
+    start_metrics_worker,
+    stop_metrics_worker,
+    warm_llm_metrics,
+)
 from src.shared.exceptions import (
     ApplicationError,
     ForbiddenError,
@@ -63,8 +71,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan context manager.
 
     Handles startup and shutdown:
-    - Startup: Load model registry from database
-    - Shutdown: Cleanup resources
+    - Startup: Load model registry from database (and pre-create its LLM
+      metric children), release abandoned token reservations, pre-warm the
+      Anthropic provider, start the metrics worker
+    - Shutdown: Close shared LLM connection pools, flush queued metrics
     """
     # Startup
     logger.info("Loading model registry from database...")
@@ -72,11 +82,31 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     async with session_maker() as session:
         await model_registry.load_models(session)
     logger.info(f"Model registry loaded: {len(model_registry.get_all_models())} models")
+    warm_llm_metrics((m.provider, m.name) for m in model_registry.get_all_models())
+
+    # Refund holds left by requests that never finished (e.g. a crashed worker).
+    # Anything younger may still belong to another replica's in-flight request.
+    async with session_maker() as session:
+        await TokenService().release_stale_reservations(
+            session, timedelta(seconds=2 * settings.llm_stream_timeout)
+        )
+        await session.commit()
+
+    # Build the shared provider and its connection pool before the first request
+    if settings.anthropic_api_key:
+        from src.integrations.anthropic_client import get_anthropic_provider
+
+        get_anthropic_provider().warm_up()
+
+    # Apply request metrics off the request path from here on
+    start_metrics_worker()
 
     yield
 
     # Shutdown
     logger.info("Application shutting down")
+    await aclose_providers()
+    await stop_metrics_worker()
 
 
 OPENAPI_TAGS = [
@@ -8,7 +8,8 @@ Endpoints:
 import logging
 from datetime import datetime, timezone
 
-from fastapi import APIRouter
+import orjson
+from fastapi import APIRouter, Response
 
 from src.api.dependencies import (
     CurrentUserId,
@@ -16,17 +17,18 @@ from src.api.dependencies import (
 )
 from src.data.models import Dialog, Message
 from src.shared.schemas import (
-    DialogExport,
     ExportResponse,
     ImportRequest,
     ImportResult,
-    MessageExport,
 )
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 logger = logging.getLogger(__name__)
 
+# Export format version, kept in step with the documented schema
+EXPORT_VERSION = ExportResponse.model_fields["version"].default
+
 router = APIRouter(prefix="/export", tags=["export"])
 
 
@@ -39,15 +41,19 @@ router = APIRouter(prefix="/export", tags=["export"])
 async def export_dialogs(
     session: DbSession,
     user_id: CurrentUserId,
-) -> ExportResponse:
+) -> Response:
     """Export all user dialogs with messages.
 
+    The export is built as plain dicts from the ORM rows and encoded by
+    orjson in one pass, skipping pydantic validation and serialization of
+    every nested message. ExportResponse still documents the shape.
+
     Args:
         session: Database session
         user_id: Current user ID from JWT
 
     Returns:
-        ExportResponse with all dialogs and messages
+        JSON response in the ExportResponse shape with all dialogs and messages
     """
     # Get all dialogs with messages
     result = await session.execute(
@@ -65,28 +71,28 @@ async def export_dialogs(
     for dialog in dialogs:
         messages = sorted(dialog.messages, key=lambda m: m.created_at)
         message_exports = [
-            MessageExport(
-                role=msg.role,
-                content=msg.content,
-                prompt_tokens=msg.prompt_tokens,
-                completion_tokens=msg.completion_tokens,
-                created_at=msg.created_at,
-            )
+            {
+                "role": msg.role,
+                "content": msg.content,
+                "prompt_tokens": msg.prompt_tokens,
+                "completion_tokens": msg.completion_tokens,
+                "created_at": msg.created_at,
+            }
             for msg in messages
         ]
         total_messages += len(message_exports)
 
         dialog_exports.append(
-            DialogExport(
-                id=dialog.id,
-                title=dialog.title,
-                system_prompt=dialog.system_prompt,
-                model_name=dialog.model_name,
-                agent_config=dialog.agent_config,
-                created_at=dialog.created_at,
-                updated_at=dialog.updated_at,
-                messages=message_exports,
-            )
+            {
+                "id": dialog.id,
+                "title": dialog.title,
+                "system_prompt": dialog.system_prompt,
+                "model_name": dialog.model_name,
+                "agent_config": dialog.agent_config,
+                "created_at": dialog.created_at,
+                "updated_at": dialog.updated_at,
+                "messages": message_exports,
+            }
         )
 
     logger.info(
@@ -94,12 +100,18 @@ async def export_dialogs(
         extra={"user_id": user_id},
     )
 
-    return ExportResponse(
-        exported_at=datetime.now(timezone.utc),
-        user_id=user_id,
-        dialog_count=len(dialog_exports),
-        message_count=total_messages,
-        dialogs=dialog_exports,
+    payload = {
+        "version": EXPORT_VERSION,
+        "exported_at": datetime.now(timezone.utc),
+        "user_id": user_id,
+        "dialog_count": len(dialog_exports),
+        "message_count": total_messages,
+        "dialogs": dialog_exports,
+    }
+    # OPT_UTC_Z renders UTC datetimes with "Z", as pydantic does
+    return Response(
+        content=orjson.dumps(payload, option=orjson.OPT_UTC_Z),
+        media_type="application/json",
     )
 
 
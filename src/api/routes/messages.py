@@ -9,6 +9,7 @@ import logging
 from typing import AsyncGenerator
 from uuid import UUID
 
+import orjson
 from fastapi import APIRouter, status
 from fastapi.responses import StreamingResponse
 
@@ -33,16 +34,17 @@ async def sse_stream(
     user_id: int,
     data: MessageCreate,
     is_admin: bool,
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     """Generate SSE events from message stream.
 
     Yields Server-Sent Events in the format:
     data: {"content": "...", "done": false}
 
     data: {"content": "", "done": true, "message_id": "...", "prompt_tokens": N, "completion_tokens": N}
-    """
-    import json
 
+    Frames are yielded as UTF-8 bytes encoded by orjson, so the response
+    writes them without a further str-to-bytes pass.
+    """
     try:
         async for chunk in service.send_message_stream(
             session=session,
@@ -65,12 +67,12 @@ async def sse_stream(
                 if chunk.completion_tokens is not None:
                     event_data["completion_tokens"] = chunk.completion_tokens
 
-            yield f"data: {json.dumps(event_data)}\n\n"
+            yield b"data: " + orjson.dumps(event_data) + b"\n\n"
 
     except Exception as e:
         # Send error event
         error_data = {"error": str(e), "done": True}
-        yield f"data: {json.dumps(error_data)}\n\n"
+        yield b"data: " + orjson.dumps(error_data) + b"\n\n"
         raise
 
 
@@ -95,6 +95,9 @@ class Settings(BaseSettings):
     llm_timeout: int = Field(
         default=120, ge=1, le=600, description="LLM request timeout in seconds"
     )
+    llm_stream_timeout: int = Field(
+        default=300, ge=1, le=3600, description="Max total duration of a streamed LLM response"
+    )
     llm_max_retries: int = Field(default=3, ge=0, le=10, description="Max retries for LLM requests")
     llm_default_model: str = Field(default="gpt-4", description="Default LLM model")
 
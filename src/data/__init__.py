@@ -8,7 +8,15 @@ from src.data.database import (
     get_session_maker,
     get_transaction_session,
 )
-from src.data.models import Base, Dialog, Message, Model, TokenBalance, TokenTransaction
+from src.data.models import (
+    Base,
+    Dialog,
+    Message,
+    Model,
+    TokenBalance,
+    TokenReservation,
+    TokenTransaction,
+)
 from src.data.repositories import (
     DialogRepository,
     MessageRepository,
@@ -35,6 +43,7 @@ __all__ = [
     "Message",
     "TokenBalance",
     "TokenTransaction",
+    "TokenReservation",
     "Model",
     # Repositories
     "DialogRepository",
@@ -58,15 +58,23 @@ class CacheService:
     """Service for caching operations with automatic fallback to database.
 
     Cache keys:
-    - user:{user_id}:balance - token balance (TTL: 5 min)
+    - user:{user_id}:balance - token balance (TTL: 2 s)
     - model:{name} - model metadata (TTL: 1 hour)
     - jwks:keys - JWT public keys (TTL: 1 hour)
+    - completion:{provider}:{digest} - deterministic LLM completions (TTL: 1 hour)
+    - {key}:lock - short-lived fill lock for cache stampede protection
     """
 
     # TTL in seconds
-    TTL_BALANCE = 300  # 5 minutes
+    # Balances are invalidated after each committed update; the short TTL
+    # bounds staleness if an invalidation is lost
+    TTL_BALANCE = 2  # 2 seconds
     TTL_MODEL = 3600  # 1 hour
     TTL_JWKS = 3600  # 1 hour
+    TTL_COMPLETION = 3600  # 1 hour
+
+    # Fill lock TTL in milliseconds
+    LOCK_TTL_MS = 2000
 
     @staticmethod
     async def get(key: str) -> Any | None:
@@ -122,6 +130,28 @@ class CacheService:
             logger.warning(f"Cache delete failed for {key}: {e}")
             return False
 
+    @staticmethod
+    async def acquire_lock(key: str, ttl_ms: int) -> bool:
+        """Try to acquire a short-lived lock (SET NX PX).
+
+        Returns True if the lock was acquired or Redis is unavailable
+        (nothing to coordinate with), False if another worker holds it.
+        """
+        redis = await get_redis()
+        if redis is None:
+            return True
+
+        try:
+            return bool(await redis.set(key, "1", nx=True, px=ttl_ms))
+        except RedisError as e:
+            logger.warning(f"Cache lock failed for {key}: {e}")
+            return True
+
+    @staticmethod
+    def lock_key(key: str) -> str:
+        """Generate fill lock key for a cache key."""
+        return f"{key}:lock"
+
     @staticmethod
     def balance_key(user_id: int) -> str:
         """Generate cache key for user balance."""
@@ -137,16 +167,31 @@ class CacheService:
         """Generate cache key for JWKS."""
         return "jwks:keys"
 
+    @staticmethod
+    def completion_key(provider: str, digest: str) -> str:
+        """Generate cache key for a completion identified by request digest."""
+        return f"completion:{provider}:{digest}"
+
     async def get_balance(self, user_id: int) -> dict | None:
         """Get cached user balance."""
         key = self.balance_key(user_id)
         return await self.get(key)
 
     async def set_balance(self, user_id: int, balance_data: dict) -> bool:
-        """Cache user balance with 5 min TTL."""
+        """Cache user balance with a short TTL."""
         key = self.balance_key(user_id)
         return await self.set(key, balance_data, self.TTL_BALANCE)
 
+    async def acquire_balance_lock(self, user_id: int) -> bool:
+        """Acquire fill lock for a user's cached balance."""
+        key = self.lock_key(self.balance_key(user_id))
+        return await self.acquire_lock(key, self.LOCK_TTL_MS)
+
+    async def release_balance_lock(self, user_id: int) -> bool:
+        """Release fill lock for a user's cached balance."""
+        key = self.lock_key(self.balance_key(user_id))
+        return await self.delete(key)
+
     async def invalidate_balance(self, user_id: int) -> bool:
         """Invalidate cached balance after update."""
         key = self.balance_key(user_id)
@@ -162,6 +207,28 @@ class CacheService:
         key = self.model_key(model_name)
         return await self.set(key, model_data, self.TTL_MODEL)
 
+    async def get_completion(self, provider: str, digest: str) -> dict[str, Any] | None:
+        """Get cached completion."""
+        key = self.completion_key(provider, digest)
+        return await self.get(key)
+
+    async def set_completion(
+        self, provider: str, digest: str, completion: dict[str, Any]
+    ) -> bool:
+        """Cache completion with 1 hour TTL."""
+        key = self.completion_key(provider, digest)
+        return await self.set(key, completion, self.TTL_COMPLETION)
+
+    async def acquire_completion_lock(self, provider: str, digest: str, ttl_ms: int) -> bool:
+        """Acquire fill lock so only one replica calls the provider per request."""
+        key = self.lock_key(self.completion_key(provider, digest))
+        return await self.acquire_lock(key, ttl_ms)
+
+    async def release_completion_lock(self, provider: str, digest: str) -> bool:
+        """Release fill lock for a completion."""
+        key = self.lock_key(self.completion_key(provider, digest))
+        return await self.delete(key)
+
     async def get_jwks(self) -> dict | None:
         """Get cached JWKS."""
         key = self.jwks_key()
@@ -2,7 +2,9 @@
 
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from typing import Any
 
+import orjson
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -17,6 +19,15 @@ _engine: AsyncEngine | None = None
 _session_maker: async_sessionmaker[AsyncSession] | None = None
 
 
+def json_dumps(value: Any) -> str:
+    """Serialize a JSON/JSONB column value with orjson.
+
+    SQLAlchemy expects a str from json_serializer; orjson returns bytes.
+    Non-str keys are stringified, as the stdlib json module does.
+    """
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 def get_engine() -> AsyncEngine:
     """Get or create the global async database engine.
 
@@ -30,6 +41,8 @@ def get_engine() -> AsyncEngine:
             max_overflow=10,  # Total max 20 connections
             pool_pre_ping=True,
             echo=settings.debug,
+            json_serializer=json_dumps,
+            json_deserializer=orjson.loads,
         )
     return _engine
 
@@ -106,6 +106,27 @@ class TokenTransaction(Base):
     )
 
 
+class TokenReservation(Base):
+    """Token reservation entity - tokens held for an in-flight LLM request.
+
+    The reserved amount is already subtracted from the balance. The row is
+    removed when the request is finalized into an llm_usage transaction or
+    released on failure.
+    """
+
+    __tablename__ = "token_reservations"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(BigInteger, index=True, nullable=False)
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    dialog_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("dialogs.id", ondelete="SET NULL"), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False, index=True
+    )
+
+
 class Model(Base):
     """Model entity - available LLM models with pricing."""
 
@@ -1,15 +1,67 @@
 """Specialized repositories for each model with custom query methods."""
 
+import asyncio
 from datetime import datetime
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import CTE, Row, delete, event, func, insert, literal, select, true, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
 from src.data.cache import cache_service
-from src.data.models import Dialog, Message, Model, TokenBalance, TokenTransaction
+from src.data.models import (
+    Dialog,
+    Message,
+    Model,
+    TokenBalance,
+    TokenReservation,
+    TokenTransaction,
+)
 from src.data.repository import BaseRepository
 
+# How long a reader waits for a concurrent cache fill before querying the DB
+BALANCE_FILL_WAIT = 0.05
+
+# session.info key holding users whose cached balance is dropped once the
+# session's transaction ends
+STALE_BALANCES_INFO_KEY = "stale_balance_user_ids"
+
+# Invalidations scheduled by the commit hook, referenced until they finish
+_balance_invalidations: set[asyncio.Task[None]] = set()
+
+
+def _invalidate_balance_after_commit(session: AsyncSession, user_id: int) -> None:
+    """Drop a user's cached balance once the session's transaction ends.
+
+    Deleting the key before the commit would let a concurrent reader refill
+    it with the pre-commit balance from the database.
+    """
+    session.info.setdefault(STALE_BALANCES_INFO_KEY, set()).add(user_id)
+
+
+async def _invalidate_balances(user_ids: set[int]) -> None:
+    """Delete the cached balances of the given users."""
+    for user_id in user_ids:
+        await cache_service.invalidate_balance(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_stale_balances(session: Session) -> None:
+    """Invalidate the cached balances written by the transaction that just ended.
+
+    Also runs on rollback, since a read inside the transaction may have
+    cached a balance that was never committed.
+    """
+    user_ids = session.info.pop(STALE_BALANCES_INFO_KEY, None)
+    if not user_ids:
+        return
+    task = asyncio.get_running_loop().create_task(_invalidate_balances(user_ids))
+    _balance_invalidations.add(task)
+    task.add_done_callback(_balance_invalidations.discard)
+
 
 class DialogRepository(BaseRepository[Dialog]):
     """Repository for Dialog model."""
@@ -159,53 +211,85 @@ class TokenBalanceRepository(BaseRepository[TokenBalance]):
     async def get_by_user(self, session: AsyncSession, user_id: int) -> TokenBalance | None:
         """Get token balance for a user.
 
-        Uses cache with 5 min TTL, falls back to database on miss.
+        Uses cache with a short TTL, falls back to database on miss.
+        On a miss only one worker refills the cache; concurrent readers wait
+        briefly for it before falling back to the database themselves.
+
+        Note:
+            A cache hit returns a transient TokenBalance that is not attached
+            to the session - use it for reads only.
         """
         # Try cache first
         cached = await cache_service.get_balance(user_id)
         if cached:
-            # Reconstruct TokenBalance from cached data
-            balance = TokenBalance(
-                user_id=cached["user_id"],
-                balance=cached["balance"],
-                limit=cached.get("limit"),
-                updated_at=datetime.fromisoformat(cached["updated_at"]),
-            )
-            return balance
-
-        # Cache miss - fetch from database
-        balance = await session.get(TokenBalance, user_id)
-
-        # Cache the result for next time
-        if balance:
-            await cache_service.set_balance(
-                user_id,
-                {
-                    "user_id": balance.user_id,
-                    "balance": balance.balance,
-                    "limit": balance.limit,
-                    "updated_at": balance.updated_at.isoformat(),
-                },
-            )
+            return self._from_cache(cached)
+
+        # Cache miss - let a single worker fill it
+        acquired = await cache_service.acquire_balance_lock(user_id)
+        if not acquired:
+            await asyncio.sleep(BALANCE_FILL_WAIT)
+            cached = await cache_service.get_balance(user_id)
+            if cached:
+                return self._from_cache(cached)
+
+        try:
+            balance = await session.get(TokenBalance, user_id)
+
+            # Cache the result for next time
+            if balance:
+                await cache_service.set_balance(
+                    user_id,
+                    {
+                        "user_id": balance.user_id,
+                        "balance": balance.balance,
+                        "limit": balance.limit,
+                        "updated_at": balance.updated_at.isoformat(),
+                    },
+                )
+        finally:
+            if acquired:
+                await cache_service.release_balance_lock(user_id)
 
         return balance
 
+    @staticmethod
+    def _from_cache(cached: dict) -> TokenBalance:
+        """Reconstruct TokenBalance from cached data."""
+        return TokenBalance(
+            user_id=cached["user_id"],
+            balance=cached["balance"],
+            limit=cached.get("limit"),
+            updated_at=datetime.fromisoformat(cached["updated_at"]),
+        )
+
     async def get_or_create(
         self, session: AsyncSession, user_id: int, initial_balance: int = 0
     ) -> TokenBalance:
-        """Get existing balance or create new one with initial balance."""
+        """Get existing balance or create new one with initial balance.
+
+        Served from cache when possible - use for reads only.
+        """
         balance = await self.get_by_user(session, user_id)
         if balance is None:
             balance = await self.create(session, user_id=user_id, balance=initial_balance)
         return balance
 
+    async def _get_or_create_for_update(
+        self, session: AsyncSession, user_id: int
+    ) -> TokenBalance:
+        """Get or create balance attached to the session (bypasses cache)."""
+        balance = await session.get(TokenBalance, user_id)
+        if balance is None:
+            balance = await self.create(session, user_id=user_id, balance=0)
+        return balance
+
     async def deduct_tokens(self, session: AsyncSession, user_id: int, amount: int) -> TokenBalance:
         """Deduct tokens from user balance (atomic operation).
 
         Raises ValueError if insufficient balance.
-        Invalidates cache after update.
+        Invalidates cache after commit.
         """
-        balance = await self.get_or_create(session, user_id)
+        balance = await self._get_or_create_for_update(session, user_id)
         if balance.balance < amount:
             raise ValueError(f"Insufficient tokens: balance={balance.balance}, required={amount}")
         balance.balance -= amount
@@ -213,24 +297,330 @@ class TokenBalanceRepository(BaseRepository[TokenBalance]):
         await session.flush()
         await session.refresh(balance)
 
-        # Invalidate cache after balance update
-        await cache_service.invalidate_balance(user_id)
+        # Drop the cached balance once the update commits
+        _invalidate_balance_after_commit(session, user_id)
 
         return balance
 
+    async def deduct_with_transaction(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        amount: int,
+        dialog_id: UUID,
+        message_id: UUID,
+    ) -> tuple[TokenBalance, TokenTransaction] | None:
+        """Deduct tokens and record the llm_usage transaction in one statement.
+
+        The balance check, the update and the transaction insert run as a
+        single query. A conditional UPDATE ... RETURNING CTE feeds an
+        INSERT ... SELECT, so nothing is written unless the balance covers
+        the amount.
+
+        Returns:
+            Tuple of (updated balance, transaction record), or None if the
+            user has no balance row or the balance is insufficient
+
+        Invalidates cache after commit.
+        """
+        now = func.now()
+        upd = (
+            update(TokenBalance)
+            .where(TokenBalance.user_id == user_id, TokenBalance.balance >= amount)
+            .values(balance=TokenBalance.balance - amount, updated_at=now)
+            .returning(
+                TokenBalance.user_id,
+                TokenBalance.balance,
+                TokenBalance.limit,
+                TokenBalance.updated_at,
+            )
+            .cte("upd")
+        )
+        return await self._execute_deduction(session, upd, user_id, amount, dialog_id, message_id)
+
+    async def finalize_reservation(
+        self,
+        session: AsyncSession,
+        reservation_id: int,
+        user_id: int,
+        amount: int,
+        dialog_id: UUID,
+        message_id: UUID,
+    ) -> tuple[TokenBalance, TokenTransaction] | int | None:
+        """Turn a reservation into an llm_usage transaction in one statement.
+
+        Deletes the reservation, refunds the held amount while charging the
+        actual usage, and records the transaction. The balance update and the
+        transaction insert only happen if the balance plus the hold covers the
+        usage, but the reservation is deleted either way: the caller must roll
+        back unless a tuple is returned.
+
+        Returns:
+            Tuple of (updated balance, transaction record) on success; the
+            balance plus the hold (int) if that doesn't cover the usage; None
+            if the reservation no longer exists
+
+        Invalidates cache after commit.
+        """
+        res = (
+            delete(TokenReservation)
+            .where(TokenReservation.id == reservation_id, TokenReservation.user_id == user_id)
+            .returning(TokenReservation.user_id, TokenReservation.amount)
+            .cte("res")
+        )
+        upd = (
+            update(TokenBalance)
+            .where(
+                TokenBalance.user_id == res.c.user_id,
+                TokenBalance.balance + res.c.amount >= amount,
+            )
+            .values(balance=TokenBalance.balance + res.c.amount - amount, updated_at=func.now())
+            .returning(
+                TokenBalance.user_id,
+                TokenBalance.balance,
+                TokenBalance.limit,
+                TokenBalance.updated_at,
+            )
+            .cte("upd")
+        )
+        tx = self._deduction_tx(upd, amount, dialog_id, message_id)
+        # The outer query sees token_balances as it was before upd ran
+        result = await session.execute(
+            select(
+                (TokenBalance.balance + res.c.amount).label("available"),
+                upd.c.balance,
+                upd.c["limit"],
+                upd.c.updated_at,
+                tx.c.id,
+                tx.c.created_at,
+            ).select_from(
+                res.join(TokenBalance, TokenBalance.user_id == res.c.user_id).outerjoin(
+                    upd.join(tx, true()), true()
+                )
+            )
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        if row.id is None:
+            return int(row.available)
+        return self._deduction_result(session, user_id, amount, dialog_id, message_id, row)
+
+    @staticmethod
+    def _deduction_tx(upd: CTE, amount: int, dialog_id: UUID, message_id: UUID) -> CTE:
+        """Build the llm_usage transaction insert fed by a balance UPDATE CTE."""
+        return (
+            insert(TokenTransaction)
+            .from_select(
+                ["user_id", "amount", "reason", "dialog_id", "message_id", "created_at"],
+                select(
+                    upd.c.user_id,
+                    literal(-amount),  # Negative for deduction
+                    literal("llm_usage"),
+                    literal(dialog_id, TokenTransaction.dialog_id.type),
+                    literal(message_id, TokenTransaction.message_id.type),
+                    func.now(),
+                ),
+            )
+            .returning(TokenTransaction.id, TokenTransaction.created_at)
+            .cte("tx")
+        )
+
+    async def _execute_deduction(
+        self,
+        session: AsyncSession,
+        upd: CTE,
+        user_id: int,
+        amount: int,
+        dialog_id: UUID,
+        message_id: UUID,
+    ) -> tuple[TokenBalance, TokenTransaction] | None:
+        """Insert the llm_usage transaction fed by a balance UPDATE CTE and run it."""
+        tx = self._deduction_tx(upd, amount, dialog_id, message_id)
+        result = await session.execute(
+            select(
+                upd.c.balance,
+                upd.c["limit"],
+                upd.c.updated_at,
+                tx.c.id,
+                tx.c.created_at,
+            ).select_from(upd.join(tx, true()))
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        return self._deduction_result(session, user_id, amount, dialog_id, message_id, row)
+
+    def _deduction_result(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        amount: int,
+        dialog_id: UUID,
+        message_id: UUID,
+        row: Row[tuple[Any, ...]],
+    ) -> tuple[TokenBalance, TokenTransaction]:
+        """Build the balance and transaction from a deduction's result row."""
+        balance = self._sync_loaded_balance(session, user_id, row.balance, row.updated_at)
+        if balance is None:
+            balance = TokenBalance(
+                user_id=user_id,
+                balance=row.balance,
+                limit=row.limit,
+                updated_at=row.updated_at,
+            )
+
+        transaction = TokenTransaction(
+            id=row.id,
+            user_id=user_id,
+            amount=-amount,
+            reason="llm_usage",
+            dialog_id=dialog_id,
+            message_id=message_id,
+            admin_user_id=None,
+            created_at=row.created_at,
+        )
+
+        # Drop the cached balance once the update commits
+        _invalidate_balance_after_commit(session, user_id)
+
+        return balance, transaction
+
+    @staticmethod
+    def _sync_loaded_balance(
+        session: AsyncSession, user_id: int, balance: int, updated_at: datetime
+    ) -> TokenBalance | None:
+        """Keep an already-loaded balance in the session consistent with the DB."""
+        loaded = session.identity_map.get(session.identity_key(TokenBalance, user_id))
+        if loaded is not None:
+            set_committed_value(loaded, "balance", balance)
+            set_committed_value(loaded, "updated_at", updated_at)
+        return loaded
+
+    async def reserve(
+        self, session: AsyncSession, user_id: int, amount: int, dialog_id: UUID
+    ) -> int | None:
+        """Hold tokens for an in-flight request in one statement.
+
+        A conditional UPDATE ... RETURNING CTE feeds the reservation
+        INSERT ... SELECT, so nothing is written unless the balance covers
+        the amount.
+
+        Returns:
+            Reservation ID, or None if the user has no balance row or the
+            balance is insufficient
+
+        Invalidates cache after commit.
+        """
+        now = func.now()
+        upd = (
+            update(TokenBalance)
+            .where(TokenBalance.user_id == user_id, TokenBalance.balance >= amount)
+            .values(balance=TokenBalance.balance - amount, updated_at=now)
+            .returning(TokenBalance.user_id, TokenBalance.balance, TokenBalance.updated_at)
+            .cte("upd")
+        )
+        res = (
+            insert(TokenReservation)
+            .from_select(
+                ["user_id", "amount", "dialog_id", "created_at"],
+                select(
+                    upd.c.user_id,
+                    literal(amount),
+                    literal(dialog_id, TokenReservation.dialog_id.type),
+                    now,
+                ),
+            )
+            .returning(TokenReservation.id)
+            .cte("res")
+        )
+        result = await session.execute(
+            select(upd.c.balance, upd.c.updated_at, res.c.id).select_from(upd.join(res, true()))
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+
+        self._sync_loaded_balance(session, user_id, row.balance, row.updated_at)
+        _invalidate_balance_after_commit(session, user_id)
+        return int(row.id)
+
+    async def release_reservation(self, session: AsyncSession, reservation_id: int) -> bool:
+        """Delete a reservation and refund its held amount in one statement.
+
+        Returns:
+            True if a reservation was released, False if it no longer exists
+
+        Invalidates cache after commit.
+        """
+        res = (
+            delete(TokenReservation)
+            .where(TokenReservation.id == reservation_id)
+            .returning(TokenReservation.user_id, TokenReservation.amount)
+            .cte("res")
+        )
+        result = await session.execute(
+            update(TokenBalance)
+            .where(TokenBalance.user_id == res.c.user_id)
+            .values(balance=TokenBalance.balance + res.c.amount, updated_at=func.now())
+            .returning(TokenBalance.user_id, TokenBalance.balance, TokenBalance.updated_at)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return False
+
+        self._sync_loaded_balance(session, row.user_id, row.balance, row.updated_at)
+        _invalidate_balance_after_commit(session, row.user_id)
+        return True
+
+    async def release_stale_reservations(
+        self, session: AsyncSession, older_than: datetime
+    ) -> int:
+        """Release every reservation created before a cutoff.
+
+        Recovers holds left behind by requests that never finished (e.g. a
+        crashed worker), refunding each user's total in one statement.
+
+        Returns:
+            Number of users whose balances were refunded
+
+        Invalidates cache for every refunded user after commit.
+        """
+        res = (
+            delete(TokenReservation)
+            .where(TokenReservation.created_at < older_than)
+            .returning(TokenReservation.user_id, TokenReservation.amount)
+            .cte("res")
+        )
+        totals = (
+            select(res.c.user_id, func.sum(res.c.amount).label("amount"))
+            .group_by(res.c.user_id)
+            .cte("totals")
+        )
+        result = await session.execute(
+            update(TokenBalance)
+            .where(TokenBalance.user_id == totals.c.user_id)
+            .values(balance=TokenBalance.balance + totals.c.amount, updated_at=func.now())
+            .returning(TokenBalance.user_id)
+        )
+        user_ids = list(result.scalars().all())
+        for user_id in user_ids:
+            _invalidate_balance_after_commit(session, user_id)
+        return len(user_ids)
+
     async def add_tokens(self, session: AsyncSession, user_id: int, amount: int) -> TokenBalance:
         """Add tokens to user balance (top-up).
 
-        Invalidates cache after update.
+        Invalidates cache after commit.
         """
-        balance = await self.get_or_create(session, user_id)
+        balance = await self._get_or_create_for_update(session, user_id)
         balance.balance += amount
         balance.updated_at = datetime.utcnow()
         await session.flush()
         await session.refresh(balance)
 
-        # Invalidate cache after balance update
-        await cache_service.invalidate_balance(user_id)
+        # Drop the cached balance once the update commits
+        _invalidate_balance_after_commit(session, user_id)
 
         return balance
 
@@ -247,14 +637,14 @@ class TokenBalanceRepository(BaseRepository[TokenBalance]):
         Returns:
             Updated balance record
         """
-        balance = await self.get_or_create(session, user_id)
+        balance = await self._get_or_create_for_update(session, user_id)
         balance.limit = limit
         balance.updated_at = datetime.utcnow()
         await session.flush()
         await session.refresh(balance)
 
-        # Invalidate cache after limit update
-        await cache_service.invalidate_balance(user_id)
+        # Drop the cached balance once the update commits
+        _invalidate_balance_after_commit(session, user_id)
 
         return balance
 
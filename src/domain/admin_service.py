@@ -17,6 +17,8 @@ from src.shared.schemas import (
     AdminActionEvent,
     GlobalStatsResponse,
     ModelUsageStats,
+    SetLimitDetails,
+    TokenAdjustDetails,
     TokenBalanceResponse,
     TokenTransactionResponse,
     UserDetailsResponse,
@@ -184,14 +186,14 @@ class AdminService:
             admin_user_id=admin_user_id,
             target_user_id=user_id,
             action="set_limit",
-            details={"limit": limit},
+            details=SetLimitDetails(limit=limit),
             timestamp=datetime.now(timezone.utc),
         )
         self._emit_event(event)
 
         logger.info(f"Admin {admin_user_id} set limit for user {user_id}: limit={limit}")
 
-        return TokenBalanceResponse.model_validate(updated_balance)
+        return TokenBalanceResponse.from_orm_fast(updated_balance)
 
     async def top_up_tokens(
         self,
@@ -245,7 +247,7 @@ class AdminService:
             admin_user_id=admin_user_id,
             target_user_id=user_id,
             action="top_up" if amount >= 0 else "deduct",
-            details={"amount": amount, "new_balance": updated_balance.balance},
+            details=TokenAdjustDetails(amount=amount, new_balance=updated_balance.balance),
             timestamp=datetime.now(timezone.utc),
         )
         self._emit_event(event)
@@ -256,8 +258,8 @@ class AdminService:
         )
 
         return (
-            TokenBalanceResponse.model_validate(updated_balance),
-            TokenTransactionResponse.model_validate(transaction),
+            TokenBalanceResponse.from_orm_fast(updated_balance),
+            TokenTransactionResponse.from_orm_fast(transaction),
         )
 
     async def get_token_history(
@@ -293,7 +295,7 @@ class AdminService:
             raise NotFoundError(f"User {user_id} not found")
 
         transactions = await self.transaction_repo.get_by_user(session, user_id, skip, limit)
-        return [TokenTransactionResponse.model_validate(t) for t in transactions]
+        return [TokenTransactionResponse.from_orm_fast(t) for t in transactions]
 
     async def get_global_stats(
         self,
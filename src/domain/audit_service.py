@@ -153,20 +153,7 @@ class AuditService:
         result = await session.execute(query)
         logs = result.scalars().all()
 
-        return [
-            AuditLogResponse(
-                id=log.id,
-                user_id=log.user_id,
-                action=log.action,
-                resource_type=log.resource_type,
-                resource_id=log.resource_id,
-                details=log.details,
-                ip_address=log.ip_address,
-                user_agent=log.user_agent,
-                created_at=log.created_at,
-            )
-            for log in logs
-        ]
+        return [AuditLogResponse.from_orm_fast(log) for log in logs]
 
     async def count_logs(
         self,
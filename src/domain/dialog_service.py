@@ -71,6 +71,11 @@ class DialogService:
         # Validate model exists
         self._validate_model(model_name)
 
+        # Stored as JSONB; unset parameters are omitted
+        agent_config = None
+        if data.agent_config is not None:
+            agent_config = data.agent_config.model_dump(exclude_none=True)
+
         # Create dialog
         dialog = await self.dialog_repo.create(
             session,
@@ -78,14 +83,14 @@ class DialogService:
             title=data.title,
             system_prompt=data.system_prompt,
             model_name=model_name,
-            agent_config=data.agent_config,
+            agent_config=agent_config,
         )
 
         await session.commit()
 
         logger.info(f"Created dialog {dialog.id} for user {user_id} with model {model_name}")
 
-        return DialogResponse.model_validate(dialog)
+        return DialogResponse.from_orm_fast(dialog)
 
     async def get_dialog(
         self, session: AsyncSession, dialog_id: UUID, user_id: int, is_admin: bool = False
@@ -114,7 +119,7 @@ class DialogService:
         if not is_admin and dialog.user_id != user_id:
             raise ForbiddenError(f"Access denied to dialog {dialog_id}")
 
-        return DialogResponse.model_validate(dialog)
+        return DialogResponse.from_orm_fast(dialog)
 
     async def list_dialogs(
         self, session: AsyncSession, user_id: int, page: int = 1, page_size: int = 20
@@ -152,7 +157,7 @@ class DialogService:
             dialogs = dialogs[:page_size]
 
         # Convert to response models
-        items = [DialogResponse.model_validate(d) for d in dialogs]
+        items = [DialogResponse.from_orm_fast(d) for d in dialogs]
 
         # For total, we'd need a count query, but for now we'll estimate
         # In production, add a count query to repository
@@ -10,9 +10,10 @@ Implements the complete message handling flow:
 7. Emit events
 """
 
+import asyncio
 import logging
 import time
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator
 from datetime import datetime, timezone
 from typing import Any, Callable, Protocol
 from uuid import UUID
@@ -21,10 +22,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.data.models import Dialog
 from src.data.repositories import DialogRepository, MessageRepository
+from src.domain.model_registry import ModelRegistry, model_registry
 from src.domain.token_service import TokenService
 from src.shared.exceptions import (
     ForbiddenError,
-    InsufficientTokensError,
     LLMError,
     LLMTimeoutError,
     NotFoundError,
@@ -39,9 +40,37 @@ from src.shared.schemas import (
 
 logger = logging.getLogger(__name__)
 
+# Stream coalescing: provider chunks are buffered and forwarded once the buffer
+# reaches STREAM_FLUSH_CHARS or STREAM_FLUSH_INTERVAL seconds have passed
+STREAM_FLUSH_CHARS = 2048
+STREAM_FLUSH_INTERVAL = 0.05
+
+# Provider chunks read ahead of the client; bounds memory if the client stalls
+STREAM_READ_AHEAD = 64
+
 # Event handler type
 MessageEventHandler = Callable[[MessageSentEvent | LLMResponseEvent], None]
 
+# (content_chunk, is_done, prompt_tokens, completion_tokens) from generate_stream
+ProviderChunk = tuple[str, bool, int | None, int | None]
+
+
+async def _read_provider_stream(
+    stream: AsyncIterator[ProviderChunk], queue: asyncio.Queue[ProviderChunk | Exception | None]
+) -> None:
+    """Feed provider chunks into a queue, ending with None or the provider's error.
+
+    Reading in its own task lets the stream wait on the queue with a deadline,
+    to flush buffered text, without cancelling the provider's generator.
+    """
+    try:
+        async for item in stream:
+            await queue.put(item)
+    except Exception as e:
+        await queue.put(e)
+    else:
+        await queue.put(None)
+
 
 class LLMProvider(Protocol):
     """Protocol for LLM provider interface.
@@ -111,15 +140,18 @@ class MessageService:
         self,
         token_service: TokenService,
         llm_provider: LLMProvider | None = None,
+        registry: ModelRegistry | None = None,
     ):
         """Initialize message service.
 
         Args:
             token_service: Service for token operations
             llm_provider: LLM provider implementation (optional, for testing)
+            registry: Model registry for cost estimation (defaults to global registry)
         """
         self.token_service = token_service
         self.llm_provider = llm_provider
+        self.model_registry = registry or model_registry
         self.dialog_repo = DialogRepository()
         self.message_repo = MessageRepository()
         self._event_handlers: list[MessageEventHandler] = []
@@ -159,6 +191,64 @@ class MessageService:
 
         return dialog
 
+    async def _reserve_tokens(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        dialog: Dialog,
+        content: str,
+        config: dict[str, Any] | None,
+    ) -> int:
+        """Hold the request's estimated cost before calling the LLM.
+
+        The reservation is committed right away so concurrent requests see
+        the reduced balance while this one is in flight.
+
+        Returns:
+            Reservation ID to finalize or release once the LLM call ends
+
+        Raises:
+            InsufficientTokensError: If balance is below the estimate
+        """
+        max_tokens = config.get("max_tokens") if config else None
+        estimated_tokens = self.model_registry.estimate_request_tokens(
+            content, dialog.model_name, max_tokens
+        )
+        reservation_id = await self.token_service.reserve_tokens(
+            session, user_id, estimated_tokens, dialog.id
+        )
+        await session.commit()
+        return reservation_id
+
+    async def _rollback_and_release(self, session: AsyncSession, reservation_id: int) -> None:
+        """Discard the request's pending writes and refund its reservation."""
+        await session.rollback()
+        await self.token_service.release_reservation(session, reservation_id)
+        await session.commit()
+
+    async def _charge_reservation(
+        self,
+        session: AsyncSession,
+        reservation_id: int,
+        user_id: int,
+        dialog_id: UUID,
+        message_id: UUID,
+        total_tokens: int,
+    ) -> None:
+        """Settle the reservation against actual usage (in the caller's transaction).
+
+        Raises:
+            InsufficientTokensError: If usage exceeds the balance plus the hold;
+                the caller rolls back and releases the reservation
+        """
+        if total_tokens <= 0:
+            await self.token_service.release_reservation(session, reservation_id)
+            return
+
+        await self.token_service.finalize_reservation(
+            session, reservation_id, user_id, total_tokens, dialog_id, message_id
+        )
+
     async def _build_messages_for_llm(
         self,
         session: AsyncSession,
@@ -216,91 +306,79 @@ class MessageService:
         # Get dialog with ownership check
         dialog = await self._get_dialog(session, dialog_id, user_id, is_admin)
 
-        # Check balance before proceeding (estimate based on input)
-        estimated_tokens = len(data.content) // 4 + 100  # Rough estimate
-        has_balance = await self.token_service.check_balance(session, user_id, estimated_tokens)
-        if not has_balance:
-            raise InsufficientTokensError(
-                f"Insufficient tokens. Estimated cost: {estimated_tokens}"
-            )
-
-        # Save user message
-        user_message = await self.message_repo.create_user_message(session, dialog.id, data.content)
-        await session.flush()
-
-        # Emit Message Sent event
-        self._emit_event(
-            MessageSentEvent(
-                dialog_id=dialog.id,
-                user_id=user_id,
-                message_id=user_message.id,
-                content_length=len(data.content),
-                timestamp=datetime.now(timezone.utc),
-            )
-        )
-
-        # Build messages for LLM (user message already saved above)
-        messages = await self._build_messages_for_llm(session, dialog)
-
-        # Call LLM
         if self.llm_provider is None:
             raise LLMError("LLM provider not configured")
 
+        # Reserve the estimated cost before proceeding (based on input and model)
+        reservation_id = await self._reserve_tokens(session, user_id, dialog, data.content, config)
+
         try:
-            response_content, prompt_tokens, completion_tokens = await self.llm_provider.generate(
-                messages=messages,
-                model=dialog.model_name,
-                config=config,
+            # Save user message
+            user_message = await self.message_repo.create_user_message(
+                session, dialog.id, data.content
             )
-        except LLMTimeoutError:
-            # Rollback user message on LLM failure
-            await session.rollback()
-            raise
-        except LLMError:
-            # Rollback user message on LLM failure
-            await session.rollback()
-            raise
-        except Exception as e:
-            await session.rollback()
-            raise LLMError(f"LLM error: {e}")
-
-        # Estimate tokens if provider returned 0 (e.g. LM Studio doesn't support usage)
-        if prompt_tokens == 0 and completion_tokens == 0:
-            # Rough estimate: ~4 characters per token
-            prompt_text = " ".join(m["content"] for m in messages)
-            prompt_tokens = max(1, len(prompt_text) // 4)
-            completion_tokens = max(1, len(response_content) // 4)
-            logger.debug(
-                f"Estimated tokens: prompt={prompt_tokens}, completion={completion_tokens}"
+            await session.flush()
+
+            # Emit Message Sent event
+            self._emit_event(
+                MessageSentEvent(
+                    dialog_id=dialog.id,
+                    user_id=user_id,
+                    message_id=user_message.id,
+                    content_length=len(data.content),
+                    timestamp=datetime.now(timezone.utc),
+                )
             )
 
-        # Save assistant message
-        assistant_message = await self.message_repo.create_assistant_message(
-            session,
-            dialog.id,
-            response_content,
-            prompt_tokens=prompt_tokens,
-            completion_tokens=completion_tokens,
-        )
+            # Build messages for LLM (user message already saved above)
+            messages = await self._build_messages_for_llm(session, dialog)
 
-        # Deduct tokens
-        total_tokens = prompt_tokens + completion_tokens
-        if total_tokens > 0:
+            # Call LLM
             try:
-                await self.token_service.deduct_tokens(
-                    session,
-                    user_id,
-                    total_tokens,
-                    dialog.id,
-                    assistant_message.id,
+                response_content, prompt_tokens, completion_tokens = (
+                    await self.llm_provider.generate(
+                        messages=messages,
+                        model=dialog.model_name,
+                        config=config,
+                    )
                 )
-            except InsufficientTokensError:
-                # This shouldn't happen since we checked, but handle it
-                await session.rollback()
+            except (LLMTimeoutError, LLMError):
                 raise
+            except Exception as e:
+                raise LLMError(f"LLM error: {e}")
+
+            # Estimate tokens if provider returned 0 (e.g. LM Studio doesn't support usage)
+            if prompt_tokens == 0 and completion_tokens == 0:
+                # Rough estimate: ~4 characters per token
+                prompt_text = " ".join(m["content"] for m in messages)
+                prompt_tokens = max(1, len(prompt_text) // 4)
+                completion_tokens = max(1, len(response_content) // 4)
+                logger.debug(
+                    f"Estimated tokens: prompt={prompt_tokens}, completion={completion_tokens}"
+                )
 
-        # Commit transaction (atomic: messages + token deduction)
-        await session.commit()
+            # Save assistant message
+            assistant_message = await self.message_repo.create_assistant_message(
+                session,
+                dialog.id,
+                response_content,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+            )
+
+            # Charge actual usage against the reservation
+            total_tokens = prompt_tokens + completion_tokens
+            await self._charge_reservation(
+                session, reservation_id, user_id, dialog.id, assistant_message.id, total_tokens
+            )
+
+            # Commit transaction (atomic: messages + token deduction)
+            await session.commit()
+        except BaseException:
+            # Any failure before the commit (including cancellation) discards
+            # the request's writes and refunds the committed hold
+            await self._rollback_and_release(session, reservation_id)
+            raise
 
         # Calculate latency
         latency_ms = int((time.time() - start_time) * 1000)
@@ -324,7 +402,7 @@ class MessageService:
             f"tokens={total_tokens}, latency={latency_ms}ms"
         )
 
-        return MessageResponse.model_validate(assistant_message)
+        return MessageResponse.from_orm_fast(assistant_message)
 
     async def send_message_stream(
         self,
@@ -360,105 +438,156 @@ class MessageService:
         # Get dialog with ownership check
         dialog = await self._get_dialog(session, dialog_id, user_id, is_admin)
 
-        # Check balance before proceeding
-        estimated_tokens = len(data.content) // 4 + 100
-        has_balance = await self.token_service.check_balance(session, user_id, estimated_tokens)
-        if not has_balance:
-            raise InsufficientTokensError(
-                f"Insufficient tokens. Estimated cost: {estimated_tokens}"
-            )
-
-        # Save user message
-        user_message = await self.message_repo.create_user_message(session, dialog.id, data.content)
-        await session.flush()
-
-        # Emit Message Sent event
-        self._emit_event(
-            MessageSentEvent(
-                dialog_id=dialog.id,
-                user_id=user_id,
-                message_id=user_message.id,
-                content_length=len(data.content),
-                timestamp=datetime.now(timezone.utc),
-            )
-        )
-
-        # Build messages for LLM (user message already saved above)
-        messages = await self._build_messages_for_llm(session, dialog)
-
-        # Call LLM with streaming
         if self.llm_provider is None:
             raise LLMError("LLM provider not configured")
 
-        full_response = ""
-        prompt_tokens = 0
-        completion_tokens = 0
+        # Reserve the estimated cost before proceeding (based on input and model)
+        reservation_id = await self._reserve_tokens(session, user_id, dialog, data.content, config)
 
         try:
-            async for chunk, done, p_tokens, c_tokens in self.llm_provider.generate_stream(
-                messages=messages,
-                model=dialog.model_name,
-                config=config,
-            ):
-                full_response += chunk
-
-                if done:
-                    prompt_tokens = p_tokens or 0
-                    completion_tokens = c_tokens or 0
-
-                yield StreamChunk(
-                    content=chunk,
-                    done=done,
-                    prompt_tokens=p_tokens,
-                    completion_tokens=c_tokens,
+            # Save user message
+            user_message = await self.message_repo.create_user_message(
+                session, dialog.id, data.content
+            )
+            await session.flush()
+
+            # Emit Message Sent event
+            self._emit_event(
+                MessageSentEvent(
+                    dialog_id=dialog.id,
+                    user_id=user_id,
+                    message_id=user_message.id,
+                    content_length=len(data.content),
+                    timestamp=datetime.now(timezone.utc),
                 )
-
-        except LLMTimeoutError:
-            await session.rollback()
-            raise
-        except LLMError:
-            await session.rollback()
-            raise
-        except Exception as e:
-            await session.rollback()
-            raise LLMError(f"LLM streaming error: {e}")
-
-        # Estimate tokens if provider returned 0 (e.g. LM Studio doesn't support usage)
-        if prompt_tokens == 0 and completion_tokens == 0:
-            # Rough estimate: ~4 characters per token
-            prompt_text = " ".join(m["content"] for m in messages)
-            prompt_tokens = max(1, len(prompt_text) // 4)
-            completion_tokens = max(1, len(full_response) // 4)
-            logger.debug(
-                f"Estimated tokens: prompt={prompt_tokens}, completion={completion_tokens}"
             )
 
-        # Save assistant message
-        assistant_message = await self.message_repo.create_assistant_message(
-            session,
-            dialog.id,
-            full_response,
-            prompt_tokens=prompt_tokens,
-            completion_tokens=completion_tokens,
-        )
+            # Build messages for LLM (user message already saved above)
+            messages = await self._build_messages_for_llm(session, dialog)
+
+            # Call LLM with streaming
+            response_parts: list[str] = []
+            prompt_tokens = 0
+            completion_tokens = 0
+
+            # Small provider chunks are coalesced to cut per-event ASGI overhead
+            pending: list[str] = []
+            pending_len = 0
+            loop = asyncio.get_running_loop()
+            last_flush = loop.time()
 
-        # Deduct tokens
-        total_tokens = prompt_tokens + completion_tokens
-        if total_tokens > 0:
             try:
-                await self.token_service.deduct_tokens(
-                    session,
-                    user_id,
-                    total_tokens,
-                    dialog.id,
-                    assistant_message.id,
+                queue: asyncio.Queue[ProviderChunk | Exception | None] = asyncio.Queue(
+                    STREAM_READ_AHEAD
                 )
-            except InsufficientTokensError:
-                await session.rollback()
+                reader = loop.create_task(
+                    _read_provider_stream(
+                        self.llm_provider.generate_stream(
+                            messages=messages,
+                            model=dialog.model_name,
+                            config=config,
+                        ),
+                        queue,
+                    )
+                )
+                try:
+                    while True:
+                        if pending:
+                            # Flush on a deadline rather than when the next chunk
+                            # arrives, so text isn't held while the provider stalls
+                            try:
+                                async with asyncio.timeout_at(last_flush + STREAM_FLUSH_INTERVAL):
+                                    item = await queue.get()
+                            except TimeoutError:
+                                yield StreamChunk(content="".join(pending))
+                                pending.clear()
+                                pending_len = 0
+                                last_flush = loop.time()
+                                continue
+                        else:
+                            item = await queue.get()
+
+                        if item is None:
+                            break
+                        if isinstance(item, Exception):
+                            raise item
+
+                        chunk, done, p_tokens, c_tokens = item
+                        if chunk:
+                            response_parts.append(chunk)
+                            pending.append(chunk)
+                            pending_len += len(chunk)
+
+                        if done:
+                            prompt_tokens = p_tokens or 0
+                            completion_tokens = c_tokens or 0
+                            yield StreamChunk(
+                                content="".join(pending),
+                                done=True,
+                                prompt_tokens=p_tokens,
+                                completion_tokens=c_tokens,
+                            )
+                            pending.clear()
+                            pending_len = 0
+                            continue
+
+                        now = loop.time()
+                        if pending and (
+                            pending_len >= STREAM_FLUSH_CHARS
+                            or now - last_flush >= STREAM_FLUSH_INTERVAL
+                        ):
+                            yield StreamChunk(content="".join(pending))
+                            pending.clear()
+                            pending_len = 0
+                            last_flush = now
+                finally:
+                    # Stop the provider before the request's writes are settled
+                    reader.cancel()
+                    await asyncio.wait({reader})
+
+                if pending:
+                    yield StreamChunk(content="".join(pending))
+
+            except (LLMTimeoutError, LLMError):
                 raise
+            except Exception as e:
+                raise LLMError(f"LLM streaming error: {e}")
+
+            full_response = "".join(response_parts)
+
+            # Estimate tokens if provider returned 0 (e.g. LM Studio doesn't support usage)
+            if prompt_tokens == 0 and completion_tokens == 0:
+                # Rough estimate: ~4 characters per token
+                prompt_text = " ".join(m["content"] for m in messages)
+                prompt_tokens = max(1, len(prompt_text) // 4)
+                completion_tokens = max(1, len(full_response) // 4)
+                logger.debug(
+                    f"Estimated tokens: prompt={prompt_tokens}, completion={completion_tokens}"
+                )
 
-        # Commit transaction
-        await session.commit()
+            # Save assistant message
+            assistant_message = await self.message_repo.create_assistant_message(
+                session,
+                dialog.id,
+                full_response,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+            )
+
+            # Charge actual usage against the reservation
+            total_tokens = prompt_tokens + completion_tokens
+            await self._charge_reservation(
+                session, reservation_id, user_id, dialog.id, assistant_message.id, total_tokens
+            )
+
+            # Commit transaction
+            await session.commit()
+        except BaseException:
+            # Any failure before the commit, including the client going away
+            # mid-stream (generator closed or task cancelled), discards the
+            # request's writes and refunds the committed hold
+            await self._rollback_and_release(session, reservation_id)
+            raise
 
         # Calculate latency
         latency_ms = int((time.time() - start_time) * 1000)
@@ -514,4 +643,4 @@ class MessageService:
         # Get messages
         messages = await self.message_repo.get_by_dialog(session, dialog_id, skip, limit)
 
-        return [MessageResponse.model_validate(m) for m in messages]
+        return [MessageResponse.from_orm_fast(m) for m in messages]
@@ -23,6 +23,10 @@ from src.shared.schemas import CostEstimate, ModelMetadata
 
 logger = logging.getLogger(__name__)
 
+# Completion tokens reserved by the pre-flight balance check when the request
+# does not specify max_tokens
+DEFAULT_COMPLETION_TOKENS_ESTIMATE = 100
+
 
 class ModelRegistry:
     """Registry for available LLM models.
@@ -40,6 +44,8 @@ class ModelRegistry:
     def __init__(self):
         """Initialize empty registry."""
         self._models: Dict[str, Model] = {}
+        # Float pricing per model: (cost_per_1k_prompt, cost_per_1k_completion)
+        self._pricing: dict[str, tuple[float, float]] = {}
         self._loaded = False
 
     async def load_models(self, session: AsyncSession) -> None:
@@ -51,6 +57,7 @@ class ModelRegistry:
         models = await repo.get_enabled_models(session)
 
         self._models = {model.name: model for model in models}
+        self._pricing = {}
         self._loaded = True
 
         logger.info(f"Loaded {len(self._models)} models from database")
@@ -110,6 +117,18 @@ class ModelRegistry:
                 f"Unknown model '{name}'. Available models: {', '.join(available)}"
             )
 
+    def _get_pricing(self, name: str) -> tuple[float, float]:
+        """Get model pricing as floats, converting the Numeric columns once per model."""
+        pricing = self._pricing.get(name)
+        if pricing is None:
+            model = self._models[name]
+            pricing = (
+                float(model.cost_per_1k_prompt_tokens),
+                float(model.cost_per_1k_completion_tokens),
+            )
+            self._pricing[name] = pricing
+        return pricing
+
     def get_model_metadata(self, name: str) -> ModelMetadata:
         """Get model metadata as a typed response.
 
@@ -124,12 +143,13 @@ class ModelRegistry:
         """
         self.validate_model(name)
         model = self._models[name]
+        prompt_price, completion_price = self._get_pricing(name)
 
         return ModelMetadata(
             name=model.name,
             provider=model.provider,
-            cost_per_1k_prompt_tokens=float(model.cost_per_1k_prompt_tokens),
-            cost_per_1k_completion_tokens=float(model.cost_per_1k_completion_tokens),
+            cost_per_1k_prompt_tokens=prompt_price,
+            cost_per_1k_completion_tokens=completion_price,
             context_window=model.context_window,
             enabled=model.enabled,
         )
@@ -158,10 +178,10 @@ class ModelRegistry:
             ValidationError: If model is unknown
         """
         self.validate_model(model_name)
-        model = self._models[model_name]
+        prompt_price, completion_price = self._get_pricing(model_name)
 
-        prompt_cost = (prompt_tokens / 1000) * float(model.cost_per_1k_prompt_tokens)
-        completion_cost = (completion_tokens / 1000) * float(model.cost_per_1k_completion_tokens)
+        prompt_cost = (prompt_tokens / 1000) * prompt_price
+        completion_cost = (completion_tokens / 1000) * completion_price
         total_cost = prompt_cost + completion_cost
 
         return CostEstimate(
@@ -191,6 +211,36 @@ class ModelRegistry:
         # For production, consider using tiktoken for accurate counts
         return max(1, len(text) // 4)
 
+    def estimate_request_tokens(
+        self,
+        text: str,
+        model_name: str,
+        max_completion_tokens: int | None = None,
+    ) -> int:
+        """Estimate total tokens (prompt + completion) a request may consume.
+
+        Used for the pre-flight balance check. The completion budget is capped by
+        the room left in the model's context window, so large prompts on small
+        models are not rejected for tokens the model could never generate.
+
+        Args:
+            text: Prompt text to estimate
+            model_name: Model the request targets (unknown models skip the cap)
+            max_completion_tokens: Requested completion limit
+                (defaults to DEFAULT_COMPLETION_TOKENS_ESTIMATE)
+
+        Returns:
+            Estimated total token count
+        """
+        prompt_tokens = self.estimate_tokens(text, model_name)
+        completion_tokens = max_completion_tokens or DEFAULT_COMPLETION_TOKENS_ESTIMATE
+
+        model = self._models.get(model_name)
+        if model is not None:
+            completion_tokens = max(0, min(completion_tokens, model.context_window - prompt_tokens))
+
+        return prompt_tokens + completion_tokens
+
 
 # Global model registry instance
 model_registry = ModelRegistry()
@@ -1,12 +1,15 @@
 """Token Service - business logic for token accounting."""
 
+import asyncio
 import logging
-from datetime import datetime, timezone
+from collections.abc import Awaitable
+from datetime import datetime, timedelta, timezone
 from typing import Callable
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.data.models import TokenBalance, TokenTransaction
 from src.data.repositories import TokenBalanceRepository, TokenTransactionRepository
 from src.shared.exceptions import ForbiddenError, InsufficientTokensError
 from src.shared.schemas import (
@@ -18,8 +21,33 @@ from src.shared.schemas import (
 
 logger = logging.getLogger(__name__)
 
-# Event handler type
-EventHandler = Callable[[TokenEvent], None]
+
+def _exhausted_event(
+    user_id: int,
+    amount: int,
+    new_balance: int,
+    reason: str,
+    dialog_id: UUID | None = None,
+    message_id: UUID | None = None,
+) -> TokenEvent:
+    """Build a 'balance_exhausted' event for a rejected charge.
+
+    Fields come from already-typed service values, so validation is skipped.
+    """
+    return TokenEvent.model_construct(
+        event_type="balance_exhausted",
+        user_id=user_id,
+        amount=amount,
+        new_balance=new_balance,
+        reason=reason,
+        dialog_id=dialog_id,
+        message_id=message_id,
+        timestamp=datetime.now(timezone.utc),
+    )
+
+
+# Event handler type (sync handlers run in the default executor)
+EventHandler = Callable[[TokenEvent], None | Awaitable[None]]
 
 
 class TokenService:
@@ -29,27 +57,62 @@ class TokenService:
     - Balance checking against estimated costs
     - Token deduction with transaction logging
     - Admin top-up/deduct operations
-    - Event emission for token changes
+    - Event emission for token changes (dispatched in the background)
     - Race condition handling via DB transactions
     """
 
-    def __init__(self):
+    def __init__(self) -> None:
         """Initialize token service with repositories."""
         self.balance_repo = TokenBalanceRepository()
         self.transaction_repo = TokenTransactionRepository()
         self._event_handlers: list[EventHandler] = []
+        self._event_queue: asyncio.Queue[TokenEvent] = asyncio.Queue()
+        self._dispatch_task: asyncio.Task[None] | None = None
 
     def register_event_handler(self, handler: EventHandler) -> None:
-        """Register an event handler for token events."""
+        """Register an event handler for token events.
+
+        Handlers may be plain functions or coroutine functions. Plain functions
+        run in the default executor so they never block the event loop.
+        """
         self._event_handlers.append(handler)
 
     def _emit_event(self, event: TokenEvent) -> None:
-        """Emit event to all registered handlers."""
-        for handler in self._event_handlers:
+        """Queue event for background delivery to registered handlers.
+
+        Never runs handlers inline, so a slow handler can't stall the request.
+        """
+        if not self._event_handlers:
+            return
+
+        self._event_queue.put_nowait(event)
+        if self._dispatch_task is None or self._dispatch_task.done():
+            self._dispatch_task = asyncio.get_running_loop().create_task(self._dispatch_events())
+
+    async def _dispatch_events(self) -> None:
+        """Drain the event queue, fanning each event out to all handlers."""
+        loop = asyncio.get_running_loop()
+        while not self._event_queue.empty():
+            event = self._event_queue.get_nowait()
             try:
-                handler(event)
-            except Exception as e:
-                logger.error(f"Event handler error: {e}")
+                results = await asyncio.gather(
+                    *(
+                        handler(event)
+                        if asyncio.iscoroutinefunction(handler)
+                        else loop.run_in_executor(None, handler, event)
+                        for handler in self._event_handlers
+                    ),
+                    return_exceptions=True,
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.error("Event handler error: %s", result)
+            finally:
+                self._event_queue.task_done()
+
+    async def flush_events(self) -> None:
+        """Wait until all queued events have been delivered to handlers."""
+        await self._event_queue.join()
 
     async def check_balance(self, session: AsyncSession, user_id: int, estimated_cost: int) -> bool:
         """Check if user has sufficient balance for estimated cost.
@@ -70,19 +133,14 @@ class TokenService:
         has_sufficient = balance.balance >= estimated_cost
 
         if not has_sufficient:
-            # Emit balance exhausted event
-            event = TokenEvent(
-                event_type="balance_exhausted",
-                user_id=user_id,
-                amount=estimated_cost,
-                new_balance=balance.balance,
-                reason="check_failed",
-                timestamp=datetime.now(timezone.utc),
+            self._emit_event(
+                _exhausted_event(user_id, estimated_cost, balance.balance, "check_failed")
             )
-            self._emit_event(event)
             logger.warning(
-                f"Balance check failed for user {user_id}: "
-                f"balance={balance.balance}, required={estimated_cost}"
+                "Balance check failed for user %d: balance=%d, required=%d",
+                user_id,
+                balance.balance,
+                estimated_cost,
             )
 
         return has_sufficient
@@ -98,7 +156,7 @@ class TokenService:
             Token balance response
         """
         balance = await self.balance_repo.get_or_create(session, user_id)
-        return TokenBalanceResponse.model_validate(balance)
+        return TokenBalanceResponse.from_orm_fast(balance)
 
     async def get_token_stats(self, session: AsyncSession, user_id: int) -> TokenStatsResponse:
         """Get token stats for user including total usage.
@@ -109,6 +167,10 @@ class TokenService:
 
         Returns:
             Token stats with balance, total_used, and limit
+
+        Note:
+            Both reads run on the caller's session, one after the other, so
+            they see its uncommitted writes
         """
         balance = await self.balance_repo.get_or_create(session, user_id)
         total_used = await self.transaction_repo.get_total_used(session, user_id)
@@ -143,64 +205,53 @@ class TokenService:
             InsufficientTokensError: If balance is insufficient
 
         Note:
+            - Check, deduction and transaction insert run as one SQL statement
+            - Runs in the caller's transaction so the assistant message and its
+              charge commit together; deductions are deliberately not batched
+              across requests (the transaction row references the uncommitted
+              message, so another transaction could not insert it)
             - Creates transaction with reason='llm_usage'
             - Emits 'tokens_deducted' event
-            - Emits 'balance_exhausted' if balance goes negative
+            - Emits 'balance_exhausted' if the balance cannot cover the amount
             - Cache is invalidated automatically by repository
         """
         if amount <= 0:
             raise ValueError("Deduction amount must be positive")
 
-        # Get current balance first to check
-        balance = await self.balance_repo.get_or_create(session, user_id)
+        # Check, deduct and record the transaction in a single round-trip
+        deducted = await self.balance_repo.deduct_with_transaction(
+            session, user_id, amount, dialog_id, message_id
+        )
 
-        if balance.balance < amount:
-            # Emit balance exhausted event
-            event = TokenEvent(
-                event_type="balance_exhausted",
-                user_id=user_id,
-                amount=amount,
-                new_balance=balance.balance,
-                reason="llm_usage",
-                dialog_id=dialog_id,
-                message_id=message_id,
-                timestamp=datetime.now(timezone.utc),
+        if deducted is None:
+            # Nothing was written - read the balance to report the shortfall
+            balance = await self.balance_repo.get_or_create(session, user_id)
+            self._emit_event(
+                _exhausted_event(
+                    user_id, amount, balance.balance, "llm_usage", dialog_id, message_id
+                )
             )
-            self._emit_event(event)
             raise InsufficientTokensError(
                 f"Insufficient tokens: balance={balance.balance}, required={amount}"
             )
 
-        # Deduct tokens (atomic operation in repository)
-        updated_balance = await self.balance_repo.deduct_tokens(session, user_id, amount)
-
-        # Create transaction record
-        transaction = await self.transaction_repo.create_llm_usage_transaction(
-            session, user_id, amount, dialog_id, message_id
-        )
-
-        # Emit tokens deducted event
-        event = TokenEvent(
-            event_type="tokens_deducted",
-            user_id=user_id,
-            amount=amount,
-            new_balance=updated_balance.balance,
-            reason="llm_usage",
-            dialog_id=dialog_id,
-            message_id=message_id,
-            timestamp=datetime.now(timezone.utc),
-        )
-        self._emit_event(event)
+        return self._record_deduction(user_id, amount, dialog_id, message_id, deducted)
 
-        logger.info(
-            f"Deducted {amount} tokens from user {user_id}: "
-            f"new_balance={updated_balance.balance}, dialog={dialog_id}, message={message_id}"
-        )
+    def _record_deduction(
+        self,
+        user_id: int,
+        amount: int,
+        dialog_id: UUID,
+        message_id: UUID,
+        deducted: tuple[TokenBalance, TokenTransaction],
+    ) -> tuple[TokenBalanceResponse, TokenTransactionResponse]:
+        """Emit events and log for a completed llm_usage deduction."""
+        updated_balance, transaction = deducted
 
-        # Check if balance went below zero after deduction
-        if updated_balance.balance < 0:
-            exhaust_event = TokenEvent(
-                event_type="balance_exhausted",
+        # Emit tokens deducted event; skip building it when nobody listens
+        if self._event_handlers:
+            event = TokenEvent.model_construct(
+                event_type="tokens_deducted",
                 user_id=user_id,
                 amount=amount,
                 new_balance=updated_balance.balance,
@@ -209,12 +260,143 @@ class TokenService:
                 message_id=message_id,
                 timestamp=datetime.now(timezone.utc),
             )
-            self._emit_event(exhaust_event)
+            self._emit_event(event)
+
+        logger.info(
+            "Deducted %d tokens from user %d: new_balance=%d, dialog=%s, message=%s",
+            amount,
+            user_id,
+            updated_balance.balance,
+            dialog_id,
+            message_id,
+        )
 
         return (
-            TokenBalanceResponse.model_validate(updated_balance),
-            TokenTransactionResponse.model_validate(transaction),
+            TokenBalanceResponse.from_orm_fast(updated_balance),
+            TokenTransactionResponse.from_orm_fast(transaction),
+        )
+
+    async def reserve_tokens(
+        self, session: AsyncSession, user_id: int, amount: int, dialog_id: UUID
+    ) -> int:
+        """Hold estimated tokens for an LLM request before it is made.
+
+        Replaces a separate balance check: the check and the hold are one
+        atomic statement, so concurrent requests can't both pass a check
+        that only one of them can pay for.
+
+        Args:
+            session: Database session
+            user_id: User to reserve tokens for
+            amount: Estimated token cost
+            dialog_id: Dialog the request belongs to
+
+        Returns:
+            Reservation ID to finalize or release later
+
+        Raises:
+            InsufficientTokensError: If balance can't cover the estimate
+
+        Note:
+            Emits 'balance_exhausted' event if balance is insufficient
+        """
+        reservation_id = await self.balance_repo.reserve(session, user_id, amount, dialog_id)
+        if reservation_id is not None:
+            return reservation_id
+
+        balance = await self.balance_repo.get_or_create(session, user_id)
+        self._emit_event(
+            _exhausted_event(user_id, amount, balance.balance, "check_failed", dialog_id)
+        )
+        logger.warning(
+            "Token reservation failed for user %d: balance=%d, required=%d",
+            user_id,
+            balance.balance,
+            amount,
+        )
+        raise InsufficientTokensError(f"Insufficient tokens. Estimated cost: {amount}")
+
+    async def finalize_reservation(
+        self,
+        session: AsyncSession,
+        reservation_id: int,
+        user_id: int,
+        amount: int,
+        dialog_id: UUID,
+        message_id: UUID,
+    ) -> tuple[TokenBalanceResponse, TokenTransactionResponse]:
+        """Charge actual usage against a reservation.
+
+        Args:
+            session: Database session (should be in transaction)
+            reservation_id: Reservation made by reserve_tokens
+            user_id: User the reservation belongs to
+            amount: Actual tokens used (positive number)
+            dialog_id: Associated dialog ID
+            message_id: Associated message ID
+
+        Returns:
+            Tuple of (updated balance, transaction record)
+
+        Raises:
+            InsufficientTokensError: If usage exceeds the balance plus the hold
+
+        Note:
+            - Refunds the hold and charges the actual amount in one statement
+            - Falls back to a plain deduction if the reservation is gone
+              (e.g. released as stale); the caller must roll back on error
+            - Emits 'tokens_deducted' event
+            - Emits 'balance_exhausted' if the balance plus the hold can't
+              cover the amount
+        """
+        if amount <= 0:
+            raise ValueError("Deduction amount must be positive")
+
+        deducted = await self.balance_repo.finalize_reservation(
+            session, reservation_id, user_id, amount, dialog_id, message_id
         )
+        if deducted is None:
+            return await self.deduct_tokens(session, user_id, amount, dialog_id, message_id)
+
+        if isinstance(deducted, int):
+            # The reservation was deleted but nothing was charged; the caller
+            # rolls back, which restores the hold
+            self._emit_event(
+                _exhausted_event(user_id, amount, deducted, "llm_usage", dialog_id, message_id)
+            )
+            raise InsufficientTokensError(
+                f"Insufficient tokens: balance={deducted}, required={amount}"
+            )
+
+        return self._record_deduction(user_id, amount, dialog_id, message_id, deducted)
+
+    async def release_reservation(self, session: AsyncSession, reservation_id: int) -> bool:
+        """Release a reservation, refunding its held tokens.
+
+        Args:
+            session: Database session
+            reservation_id: Reservation made by reserve_tokens
+
+        Returns:
+            True if released, False if the reservation no longer exists
+        """
+        return await self.balance_repo.release_reservation(session, reservation_id)
+
+    async def release_stale_reservations(self, session: AsyncSession, max_age: timedelta) -> int:
+        """Release reservations older than max_age (left by unfinished requests).
+
+        Args:
+            session: Database session
+            max_age: Age after which a reservation is considered abandoned
+
+        Returns:
+            Number of users whose balances were refunded
+        """
+        cutoff = datetime.now(timezone.utc) - max_age
+        refunded = await self.balance_repo.release_stale_reservations(session, cutoff)
+        if refunded:
+            logger.warning("Released stale token reservations for %d users", refunded)
+        return refunded
 
     async def admin_top_up(
         self,
@@ -263,25 +445,23 @@ class TokenService:
         )
 
         logger.info(
-            f"Admin {admin_user_id} {reason}: {amount} tokens for user {user_id}, "
-            f"new_balance={updated_balance.balance}"
+            "Admin %d %s: %d tokens for user %d, new_balance=%d",
+            admin_user_id,
+            reason,
+            amount,
+            user_id,
+            updated_balance.balance,
         )
 
         # Check if balance is exhausted after admin deduction
         if updated_balance.balance < 0:
-            event = TokenEvent(
-                event_type="balance_exhausted",
-                user_id=user_id,
-                amount=abs(amount),
-                new_balance=updated_balance.balance,
-                reason=reason,
-                timestamp=datetime.now(timezone.utc),
+            self._emit_event(
+                _exhausted_event(user_id, abs(amount), updated_balance.balance, reason)
             )
-            self._emit_event(event)
 
         return (
-            TokenBalanceResponse.model_validate(updated_balance),
-            TokenTransactionResponse.model_validate(transaction),
+            TokenBalanceResponse.from_orm_fast(updated_balance),
+            TokenTransactionResponse.from_orm_fast(transaction),
         )
 
     async def get_transaction_history(
@@ -299,4 +479,4 @@ class TokenService:
             List of transaction records, ordered by created_at desc
         """
         transactions = await self.transaction_repo.get_by_user(session, user_id, skip, limit)
-        return [TokenTransactionResponse.model_validate(t) for t in transactions]
+        return [TokenTransactionResponse.from_orm_fast(t) for t in transactions]
@@ -8,19 +8,34 @@ Security:
     - API key is never logged
 """
 
+import asyncio
+import hashlib
+import json
 import logging
+import time
 from collections.abc import AsyncGenerator
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, cast
 
 from anthropic import (
+    DEFAULT_CONNECTION_LIMITS,
     APIConnectionError,
     APIStatusError,
     APITimeoutError,
     AsyncAnthropic,
 )
+from anthropic.types import (
+    RawContentBlockDeltaEvent,
+    RawMessageDeltaEvent,
+    RawMessageStartEvent,
+    TextBlock,
+    TextDelta,
+)
 
 from src.config.settings import settings
+from src.data.cache import cache_service
+from src.integrations.http_pool import get_shared_http_client
 from src.shared.exceptions import LLMError, LLMTimeoutError
 
 logger = logging.getLogger(__name__)
@@ -31,8 +46,42 @@ DEFAULT_TIMEOUT = 30.0  # 30 seconds
 # Default max_tokens for Anthropic (required parameter)
 DEFAULT_MAX_TOKENS = 4096
 
-
-@dataclass
+# Streamed text deltas are coalesced and yielded once the buffer reaches
+# STREAM_FLUSH_CHARS or STREAM_FLUSH_INTERVAL seconds have passed
+STREAM_FLUSH_CHARS = 128
+STREAM_FLUSH_INTERVAL = 0.02
+
+# Provider name used in completion cache keys
+CACHE_PROVIDER = "anthropic"
+
+# How often a replica waiting on another's identical request polls the cache
+COMPLETION_FILL_POLL = 0.1
+
+# Fixed client-facing messages for API statuses with a known cause
+# (rate limits could later honour retry-after)
+_STATUS_ERROR_MESSAGES: dict[int, str] = {
+    401: "Anthropic authentication failed - check API key",
+    429: "Anthropic rate limit exceeded. Please retry later.",
+}
+
+
+def _request_digest(
+    model: str,
+    messages: list[dict[str, str]],
+    system_prompt: str | None,
+    kwargs: dict[str, Any],
+) -> str:
+    """Build a stable digest of every parameter that affects the completion."""
+    payload = json.dumps(
+        [model, system_prompt, messages, kwargs],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+@dataclass(slots=True, frozen=True)
 class TokenUsage:
     """Token usage from LLM response."""
 
@@ -41,31 +90,43 @@ class TokenUsage:
     total_tokens: int
 
 
+# Usage of the last request made in the current context (request task), so
+# concurrent requests through one shared client never see each other's usage
+_last_usage: ContextVar[TokenUsage | None] = ContextVar("anthropic_last_usage", default=None)
+
+
 class AnthropicClient:
     """Async client adapter for Anthropic API.
 
     Features:
     - Async chat completions (streaming and non-streaming)
     - Token usage tracking
-    - 30s timeout with connection pooling
+    - 30s timeout with a process-wide shared connection pool
     - Proper error handling (401 -> 500, 429 -> 429, timeout -> 504)
     """
 
-    def __init__(self, api_key: str | None = None, timeout: float = DEFAULT_TIMEOUT):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        stream_timeout: float | None = None,
+    ):
         """Initialize Anthropic client.
 
         Args:
             api_key: Anthropic API key (defaults to settings.anthropic_api_key)
             timeout: Request timeout in seconds (default 30s)
+            stream_timeout: Max total duration of a streamed response in seconds
+                (defaults to settings.llm_stream_timeout)
         """
         self._api_key = api_key or settings.anthropic_api_key
         self._timeout = timeout
-        self._last_usage: TokenUsage | None = None
+        self._stream_timeout = stream_timeout or settings.llm_stream_timeout
 
         if not self._api_key:
             logger.warning("Anthropic API key not configured")
 
-        # Initialize async client with connection pooling
+        # Async client over the shared connection pool, created lazily
         self._client: AsyncAnthropic | None = None
 
     def _get_client(self) -> AsyncAnthropic:
@@ -78,16 +139,25 @@ class AnthropicClient:
                 api_key=self._api_key,
                 timeout=self._timeout,
                 max_retries=0,  # We handle retries ourselves
+                http_client=get_shared_http_client(DEFAULT_CONNECTION_LIMITS),
             )
         return self._client
 
+    def warm_up(self) -> None:
+        """Create the SDK client and shared connection pool ahead of first use.
+
+        Raises:
+            LLMError: If API key is not configured
+        """
+        self._get_client()
+
     def get_usage(self) -> TokenUsage | None:
-        """Get token usage from last request.
+        """Get token usage from the last request made in the current context.
 
         Returns:
             TokenUsage from last request, or None if no request made
         """
-        return self._last_usage
+        return _last_usage.get()
 
     async def send_message(
         self,
@@ -113,19 +183,13 @@ class AnthropicClient:
             LLMError: For API errors (401, 5xx)
             LLMTimeoutError: For timeout errors (504)
         """
-        # Extract system prompt from messages if present
-        filtered_messages = []
-        extracted_system = system_prompt
-
-        for msg in messages:
-            if msg.get("role") == "system":
-                # Anthropic requires system prompt as separate parameter
-                extracted_system = msg.get("content", extracted_system)
-            else:
-                filtered_messages.append(msg)
-
-        # Use provided system_prompt or extracted one
-        final_system = system_prompt if system_prompt else extracted_system
+        # Anthropic requires system prompt as separate parameter; an explicit
+        # system_prompt wins, otherwise the last system message is used
+        final_system = system_prompt or next(
+            (msg.get("content") for msg in reversed(messages) if msg.get("role") == "system"),
+            None,
+        )
+        filtered_messages = [msg for msg in messages if msg.get("role") != "system"]
 
         # Ensure max_tokens is set (required by Anthropic)
         if "max_tokens" not in kwargs:
@@ -143,7 +207,76 @@ class AnthropicClient:
         system_prompt: str | None = None,
         **kwargs: Any,
     ) -> str:
-        """Send non-streaming message request."""
+        """Send non-streaming message request.
+
+        Deterministic requests (temperature == 0) are served from the
+        completion cache when possible. A fill lock ensures only one replica
+        calls Anthropic for a given request while others wait for its result.
+        """
+        if kwargs.get("temperature") != 0:
+            return await self._create_message(model, messages, system_prompt, **kwargs)
+
+        digest = _request_digest(model, messages, system_prompt, kwargs)
+        cached = await cache_service.get_completion(CACHE_PROVIDER, digest)
+        if cached is not None:
+            return self._use_cached_completion(cached)
+
+        lock_ttl_ms = int(self._timeout * 1000)
+        locked = await cache_service.acquire_completion_lock(CACHE_PROVIDER, digest, lock_ttl_ms)
+        if not locked:
+            # Another replica is running the same request - wait for its result
+            cached = await self._wait_for_completion(digest)
+            if cached is not None:
+                return self._use_cached_completion(cached)
+
+        try:
+            content = await self._create_message(model, messages, system_prompt, **kwargs)
+            usage = _last_usage.get()
+            await cache_service.set_completion(
+                CACHE_PROVIDER,
+                digest,
+                {
+                    "content": content,
+                    "input_tokens": usage.prompt_tokens if usage else 0,
+                    "output_tokens": usage.completion_tokens if usage else 0,
+                },
+            )
+            return content
+        finally:
+            if locked:
+                await cache_service.release_completion_lock(CACHE_PROVIDER, digest)
+
+    async def _wait_for_completion(self, digest: str) -> dict[str, Any] | None:
+        """Poll the completion cache until filled or the request timeout passes."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._timeout
+        while loop.time() < deadline:
+            await asyncio.sleep(COMPLETION_FILL_POLL)
+            cached = await cache_service.get_completion(CACHE_PROVIDER, digest)
+            if cached is not None:
+                return cached
+        return None
+
+    def _use_cached_completion(self, cached: dict[str, Any]) -> str:
+        """Restore usage from a cached completion and return its content."""
+        usage = TokenUsage(
+            prompt_tokens=cached["input_tokens"],
+            completion_tokens=cached["output_tokens"],
+            total_tokens=cached["input_tokens"] + cached["output_tokens"],
+        )
+        _last_usage.set(usage)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Anthropic completion served from cache: tokens=%s", usage)
+        return cast(str, cached["content"])
+
+    async def _create_message(
+        self,
+        model: str,
+        messages: list[dict[str, str]],
+        system_prompt: str | None = None,
+        **kwargs: Any,
+    ) -> str:
+        """Call the Messages API without streaming."""
         client = self._get_client()
 
         try:
@@ -161,24 +294,27 @@ class AnthropicClient:
             response = await client.messages.create(**request_kwargs)
 
             # Track usage
-            self._last_usage = TokenUsage(
-                prompt_tokens=response.usage.input_tokens,
-                completion_tokens=response.usage.output_tokens,
-                total_tokens=response.usage.input_tokens + response.usage.output_tokens,
+            input_tokens = response.usage.input_tokens
+            output_tokens = response.usage.output_tokens
+            usage = TokenUsage(
+                prompt_tokens=input_tokens,
+                completion_tokens=output_tokens,
+                total_tokens=input_tokens + output_tokens,
             )
+            _last_usage.set(usage)
 
             # Extract text content
-            content = ""
-            for block in response.content:
-                if hasattr(block, "text"):
-                    content += block.text
+            content = "".join(
+                block.text for block in response.content if isinstance(block, TextBlock)
+            )
 
-            logger.debug(f"Anthropic response: model={model}, tokens={self._last_usage}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Anthropic response: model=%s, tokens=%s", model, usage)
 
             return content
 
         except APITimeoutError as e:
-            logger.error(f"Anthropic timeout: {e}")
+            logger.error("Anthropic timeout: %s", e)
             raise LLMTimeoutError(f"Anthropic request timed out after {self._timeout}s")
 
         except APIStatusError as e:
@@ -186,11 +322,11 @@ class AnthropicClient:
             raise  # unreachable, but satisfies type checker
 
         except APIConnectionError as e:
-            logger.error(f"Anthropic connection error: {e}")
+            logger.error("Anthropic connection error: %s", e)
             raise LLMError(f"Failed to connect to Anthropic API: {e}")
 
         except Exception as e:
-            logger.error(f"Anthropic unexpected error: {e}")
+            logger.error("Anthropic unexpected error: %s", e)
             raise LLMError(f"Anthropic error: {e}")
 
     async def _stream_message(
@@ -219,44 +355,92 @@ class AnthropicClient:
             input_tokens = 0
             output_tokens = 0
 
-            async with client.messages.stream(**request_kwargs) as stream:
-                async for event in stream:
-                    # Handle message start for input tokens
-                    if hasattr(event, "type"):
-                        if event.type == "message_start" and hasattr(event, "message"):
-                            if hasattr(event.message, "usage"):
-                                input_tokens = event.message.usage.input_tokens
+            # Buffered text not yet yielded to the caller
+            pending: list[str] = []
+            pending_len = 0
+            last_flush = time.monotonic()
 
-                        # Handle content block delta for text chunks
-                        elif event.type == "content_block_delta":
-                            if hasattr(event, "delta") and hasattr(event.delta, "text"):
-                                yield event.delta.text
+            # The client timeout only bounds individual reads; the deadline
+            # bounds the whole stream so a trickling response can't hold a
+            # connection forever. Applied per read rather than around the
+            # generator body, since a timeout must not span a yield.
+            deadline = asyncio.get_running_loop().time() + self._stream_timeout
 
-                        # Handle message delta for output tokens
-                        elif event.type == "message_delta":
-                            if hasattr(event, "usage") and hasattr(event.usage, "output_tokens"):
-                                output_tokens = event.usage.output_tokens
+            async with client.messages.stream(**request_kwargs) as stream:
+                events = aiter(stream)
+                while True:
+                    async with asyncio.timeout_at(deadline):
+                        try:
+                            event = await anext(events)
+                        except StopAsyncIteration:
+                            break
+
+                    # Dispatch on the SDK's typed events; text deltas come first
+                    # as they are by far the most frequent. isinstance lets
+                    # mypy narrow the event union in each branch.
+
+                    # Handle content block delta for text chunks
+                    if isinstance(event, RawContentBlockDeltaEvent):
+                        delta = event.delta
+                        if isinstance(delta, TextDelta):
+                            text = delta.text
+                            pending.append(text)
+                            pending_len += len(text)
+                            now = time.monotonic()
+                            if (
+                                pending_len >= STREAM_FLUSH_CHARS
+                                or now - last_flush >= STREAM_FLUSH_INTERVAL
+                            ):
+                                yield "".join(pending)
+                                pending.clear()
+                                pending_len = 0
+                                last_flush = now
+
+                    # Handle message start for input tokens
+                    elif isinstance(event, RawMessageStartEvent):
+                        input_tokens = event.message.usage.input_tokens
+
+                    # Handle message delta for output tokens
+                    elif isinstance(event, RawMessageDeltaEvent):
+                        if pending:
+                            yield "".join(pending)
+                            pending.clear()
+                            pending_len = 0
+                            last_flush = time.monotonic()
+                        output_tokens = event.usage.output_tokens
+
+                # Flush whatever is left when the stream closes
+                if pending:
+                    yield "".join(pending)
 
                 # Update usage after stream completes
-                self._last_usage = TokenUsage(
-                    prompt_tokens=input_tokens,
-                    completion_tokens=output_tokens,
-                    total_tokens=input_tokens + output_tokens,
+                _last_usage.set(
+                    TokenUsage(
+                        prompt_tokens=input_tokens,
+                        completion_tokens=output_tokens,
+                        total_tokens=input_tokens + output_tokens,
+                    )
                 )
 
         except APITimeoutError as e:
-            logger.error(f"Anthropic streaming timeout: {e}")
+            logger.error("Anthropic streaming timeout: %s", e)
             raise LLMTimeoutError(f"Anthropic streaming timed out after {self._timeout}s")
 
+        except TimeoutError:
+            logger.error("Anthropic stream exceeded %ss", self._stream_timeout)
+            raise LLMTimeoutError(
+                f"Anthropic streaming exceeded {self._stream_timeout}s total duration"
+            )
+
         except APIStatusError as e:
             self._handle_api_error(e)
 
         except APIConnectionError as e:
-            logger.error(f"Anthropic connection error: {e}")
+            logger.error("Anthropic connection error: %s", e)
             raise LLMError(f"Failed to connect to Anthropic API: {e}")
 
         except Exception as e:
-            logger.error(f"Anthropic streaming error: {e}")
+            logger.error("Anthropic streaming error: %s", e)
             raise LLMError(f"Anthropic streaming error: {e}")
 
     def _handle_api_error(self, error: APIStatusError) -> None:
@@ -268,29 +452,28 @@ class AnthropicClient:
         - 5xx (server error) -> LLMError (500)
         """
         status_code = error.status_code
-        error_message = str(error)
+        logger.error("Anthropic API error: status=%d", status_code)
+
+        message = _STATUS_ERROR_MESSAGES.get(status_code)
+        if message is not None:
+            raise LLMError(message)
+        if status_code >= 500:
+            raise LLMError(f"Anthropic server error: {status_code}")
 
+        # Only pass-through errors need the text; render and scrub it here
+        error_message = str(error)
         # Don't log the API key in error messages
         if "api_key" in error_message.lower():
             error_message = "Invalid API key"
-
-        logger.error(f"Anthropic API error: status={status_code}")
-
-        if status_code == 401:
-            raise LLMError("Anthropic authentication failed - check API key")
-        elif status_code == 429:
-            # Rate limit - could implement retry-after handling
-            raise LLMError("Anthropic rate limit exceeded. Please retry later.")
-        elif status_code >= 500:
-            raise LLMError(f"Anthropic server error: {status_code}")
-        else:
-            raise LLMError(f"Anthropic API error: {error_message}")
+        raise LLMError(f"Anthropic API error: {error_message}")
 
     async def close(self) -> None:
-        """Close the client connection."""
-        if self._client:
-            await self._client.close()
-            self._client = None
+        """Release the client.
+
+        The underlying connection pool is shared with other clients and is
+        closed on application shutdown via close_shared_http_clients().
+        """
+        self._client = None
 
 
 # Adapter to implement LLMProvider protocol from message_service
@@ -304,6 +487,10 @@ class AnthropicProvider:
         """Initialize with optional client (creates new one if not provided)."""
         self._client = client or AnthropicClient()
 
+    def warm_up(self) -> None:
+        """Allocate the underlying client so the first request skips setup."""
+        self._client.warm_up()
+
     async def generate(
         self,
         messages: list[dict[str, str]],
@@ -369,3 +556,19 @@ class AnthropicProvider:
         completion_tokens = usage.completion_tokens if usage else 0
 
         yield ("", True, prompt_tokens, completion_tokens)
+
+
+# Process-wide provider reused across requests
+_DEFAULT_PROVIDER: AnthropicProvider | None = None
+
+
+def get_anthropic_provider() -> AnthropicProvider:
+    """Get the process-wide Anthropic provider, creating it on first use.
+
+    Returns:
+        Shared AnthropicProvider instance
+    """
+    global _DEFAULT_PROVIDER
+    if _DEFAULT_PROVIDER is None:
+        _DEFAULT_PROVIDER = AnthropicProvider()
+    return _DEFAULT_PROVIDER
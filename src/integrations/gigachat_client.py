@@ -11,15 +11,20 @@ Security:
     - Credentials are never logged
 """
 
+import asyncio
 import logging
 import ssl
 import time
-from collections.abc import AsyncGenerator
-from dataclasses import dataclass
+import weakref
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Any
 from uuid import uuid4
 
 import httpx
+import orjson
 
 from src.config.settings import settings
 from src.shared.exceptions import LLMError, LLMTimeoutError
@@ -33,11 +38,99 @@ DEFAULT_TIMEOUT = 120.0  # 2 minutes (GigaChat can be slow)
 GIGACHAT_AUTH_URL = "https://ngw.devices.sberbank.ru:9443/api/v2/oauth"
 GIGACHAT_API_URL = "https://gigachat.devices.sberbank.ru/api/v1"
 
+# Parsed once so each request skips URL building and parsing
+_AUTH_URL = httpx.URL(GIGACHAT_AUTH_URL)
+_CHAT_URL = httpx.URL(f"{GIGACHAT_API_URL}/chat/completions")
+
+# Streamed deltas are coalesced and yielded once the buffer reaches
+# STREAM_FLUSH_CHARS or STREAM_FLUSH_INTERVAL seconds have passed, so a
+# long completion isn't forwarded one token (and one tuple) at a time
+STREAM_FLUSH_CHARS = 128
+STREAM_FLUSH_INTERVAL = 0.02
+
+# SSE payloads read ahead of the consumer; bounds memory if the caller stalls
+STREAM_READ_AHEAD = 64
+
+# Access tokens are refreshed this many seconds before they expire
+TOKEN_EXPIRY_BUFFER = 60
+
+# Tokens in the last fraction of their lifetime are refreshed in the background
+EARLY_REFRESH_FRACTION = 0.1
+
 # Default max_tokens for GigaChat
 DEFAULT_MAX_TOKENS = 4096
 
+# Default connection pool limits; with HTTP/2 concurrent requests are
+# multiplexed over a few TLS connections instead of one connection each
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 30.0  # seconds
+
+# Fail fast when GigaChat is unreachable or the pool is exhausted; reads
+# and writes use the (much longer) request timeout
+CONNECT_TIMEOUT = 5.0
+POOL_TIMEOUT = 5.0
+
 
-@dataclass
+@lru_cache(maxsize=1)
+def _insecure_ssl_context() -> ssl.SSLContext:
+    """Build the non-verifying SSL context once and share it across clients.
+
+    Creating a context loads the system CA bundle, so rebuilding it on every
+    client (re)creation is wasted work.
+    """
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    return ctx
+
+
+async def _iter_sse_data(chunks: AsyncIterator[bytes]) -> AsyncGenerator[bytearray, None]:
+    """Yield the payload of each SSE 'data:' line straight from raw bytes.
+
+    Lines are split and sliced without decoding to str, since the payload
+    goes to orjson as bytes anyway. Stops at the '[DONE]' sentinel.
+    """
+    buf = bytearray()
+    async for chunk in chunks:
+        buf += chunk
+        start = 0
+        while (end := buf.find(b"\n", start)) != -1:
+            # Test the prefix in place so blank, comment (':keepalive') and
+            # other non-data lines are skipped without copying
+            if buf.startswith(b"data:", start, end):
+                data = buf[start + 5 : end].strip()
+                if data == b"[DONE]":
+                    return
+                yield data
+            start = end + 1
+        del buf[:start]
+
+    # Final line without a trailing newline
+    if buf.startswith(b"data:"):
+        data = buf[5:].strip()
+        if data != b"[DONE]":
+            yield data
+
+
+async def _read_sse_data(
+    chunks: AsyncIterator[bytes], queue: asyncio.Queue[bytearray | Exception | None]
+) -> None:
+    """Feed SSE payloads into a queue, ending with None or the read error.
+
+    Reading in its own task lets the consumer wait on the queue with a
+    timeout, to flush buffered text, without ever cancelling a read.
+    """
+    try:
+        async for data in _iter_sse_data(chunks):
+            await queue.put(data)
+    except Exception as e:
+        await queue.put(e)
+    else:
+        await queue.put(None)
+
+
+@dataclass(slots=True, frozen=True)
 class TokenUsage:
     """Token usage from LLM response."""
 
@@ -46,12 +139,52 @@ class TokenUsage:
     total_tokens: int
 
 
-@dataclass
+# Usage of the last request made in the current context (request task), so
+# concurrent requests through one shared client never see each other's usage
+_last_usage: ContextVar[TokenUsage | None] = ContextVar("gigachat_last_usage", default=None)
+
+
+@dataclass(slots=True, frozen=True)
 class GigaChatToken:
     """GigaChat OAuth2 access token."""
 
     access_token: str
     expires_at: float  # Unix timestamp
+    issued_at: float = field(default_factory=time.time)  # Unix timestamp
+    # Chat request headers, built once per token rather than per request
+    api_headers: dict[str, str] = field(init=False, repr=False)
+    stream_headers: dict[str, str] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        api_headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json",
+        }
+        # Frozen dataclass: derived fields are set once, bypassing __setattr__
+        object.__setattr__(self, "api_headers", api_headers)
+        # Ask intermediaries for an unbuffered, uncached event stream
+        object.__setattr__(
+            self,
+            "stream_headers",
+            {**api_headers, "Accept": "text/event-stream", "Cache-Control": "no-cache"},
+        )
+
+    def nearing_expiry(self, now: float) -> bool:
+        """Whether the token has entered the early-refresh part of its lifetime."""
+        lifetime = self.expires_at - self.issued_at
+        return self.expires_at - now < lifetime * EARLY_REFRESH_FRACTION
+
+
+@dataclass(slots=True)
+class _LoopState:
+    """Per-event-loop token refresh state.
+
+    asyncio locks and tasks are bound to the loop they are first used on,
+    so a client shared across loops keeps one of each per loop.
+    """
+
+    token_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    refresh_task: asyncio.Task[None] | None = None
 
 
 class GigaChatClient:
@@ -70,6 +203,10 @@ class GigaChatClient:
         scope: str | None = None,
         timeout: float = DEFAULT_TIMEOUT,
         verify_ssl: bool = False,  # GigaChat uses self-signed certs
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive: int = MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = KEEPALIVE_EXPIRY,
+        coalesce_stream: bool = True,
     ):
         """Initialize GigaChat client.
 
@@ -78,14 +215,32 @@ class GigaChatClient:
             scope: API scope (GIGACHAT_API_PERS, GIGACHAT_API_B2B, GIGACHAT_API_CORP)
             timeout: Request timeout in seconds
             verify_ssl: Whether to verify SSL certificates (default False for GigaChat)
+            max_connections: Max open connections in the pool
+            max_keepalive: Max idle connections kept alive for reuse
+            keepalive_expiry: Seconds an idle connection is kept alive
+            coalesce_stream: Buffer streamed deltas into larger chunks; disable
+                for latency-critical callers that want every delta immediately
         """
         self._auth_key = auth_key or getattr(settings, "gigachat_auth_key", None)
         self._scope = scope or getattr(settings, "gigachat_scope", "GIGACHAT_API_PERS")
         self._timeout = timeout
         self._verify_ssl = verify_ssl
-        self._last_usage: TokenUsage | None = None
         self._token: GigaChatToken | None = None
-        self._client: httpx.AsyncClient | None = None
+        self._coalesce_stream = coalesce_stream
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        # One pooled HTTP client per event loop; a client must not be used
+        # from a loop other than the one it was created on
+        self._clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncClient
+        ] = weakref.WeakKeyDictionary()
+        # Token lock and background refresh task, likewise per event loop
+        self._loop_states: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, _LoopState
+        ] = weakref.WeakKeyDictionary()
 
         if not self._auth_key:
             logger.warning("GigaChat authorization key not configured")
@@ -95,41 +250,103 @@ class GigaChatClient:
         if self._verify_ssl:
             return True
         # GigaChat uses self-signed certificates
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        return ctx
+        return _insecure_ssl_context()
 
     async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create async HTTP client."""
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(
-                timeout=self._timeout,
+        """Get or create the async HTTP/2 client for the running event loop.
+
+        The same client serves both the auth and API hosts; httpx keeps a
+        separate connection pool per origin.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(
+                    connect=CONNECT_TIMEOUT,
+                    read=self._timeout,
+                    write=self._timeout,
+                    pool=POOL_TIMEOUT,
+                ),
                 verify=self._get_ssl_context(),
+                limits=self._limits,
             )
-        return self._client
-
-    async def _get_access_token(self) -> str:
+            self._clients[loop] = client
+        return client
+
+    def _loop_state(self) -> _LoopState:
+        """Get or create the token refresh state for the running event loop."""
+        loop = asyncio.get_running_loop()
+        state = self._loop_states.get(loop)
+        if state is None:
+            state = self._loop_states[loop] = _LoopState()
+        return state
+
+    async def _get_token(self) -> GigaChatToken:
         """Get valid access token, refreshing if needed.
 
         Returns:
-            Valid access token string
+            Valid access token with its prebuilt request headers
 
         Raises:
             LLMError: If authentication fails
         """
-        # Check if we have a valid token
-        if self._token and self._token.expires_at > time.time() + 60:
-            return self._token.access_token
+        # Fast path: valid cached token, no locking needed
+        token = self._valid_token()
+        if token is not None:
+            self._schedule_early_refresh(token)
+            return token
 
         if not self._auth_key:
             raise LLMError("GigaChat authorization key not configured")
 
+        # Only one coroutine per loop refreshes; the rest wait and reuse its token
+        async with self._loop_state().token_lock:
+            token = self._valid_token()
+            if token is not None:
+                return token
+            return await self._refresh_token()
+
+    def _valid_token(self) -> GigaChatToken | None:
+        """Return the cached access token unless it expires within the buffer."""
+        if self._token and self._token.expires_at > time.time() + TOKEN_EXPIRY_BUFFER:
+            return self._token
+        return None
+
+    def _schedule_early_refresh(self, token: GigaChatToken) -> None:
+        """Refresh a token nearing expiry in the background.
+
+        Requests keep using the still-valid token meanwhile, so none of them
+        waits on the auth endpoint.
+        """
+        if not token.nearing_expiry(time.time()):
+            return
+        state = self._loop_state()
+        if state.refresh_task is None or state.refresh_task.done():
+            state.refresh_task = asyncio.get_running_loop().create_task(
+                self._background_refresh()
+            )
+
+    async def _background_refresh(self) -> None:
+        """Refresh the token unless another coroutine already has."""
+        async with self._loop_state().token_lock:
+            if self._token is not None and not self._token.nearing_expiry(time.time()):
+                return
+            try:
+                await self._refresh_token()
+            except (LLMError, LLMTimeoutError) as e:
+                # Not fatal: the token is still valid and the regular path
+                # refreshes it once it actually expires
+                logger.warning("GigaChat background token refresh failed: %s", e.message)
+
+    async def _refresh_token(self) -> GigaChatToken:
+        """Request a new access token from the OAuth endpoint."""
         client = await self._get_client()
 
         try:
             response = await client.post(
-                GIGACHAT_AUTH_URL,
+                _AUTH_URL,
                 headers={
                     "Authorization": f"Basic {self._auth_key}",
                     "RqUID": str(uuid4()),
@@ -139,27 +356,28 @@ class GigaChatClient:
             )
 
             if response.status_code != 200:
-                logger.error(f"GigaChat auth failed: {response.status_code}")
+                logger.error("GigaChat auth failed: %s", response.status_code)
                 raise LLMError(f"GigaChat authentication failed: {response.status_code}")
 
-            data = response.json()
-            self._token = GigaChatToken(
+            data = orjson.loads(response.content)
+            token = GigaChatToken(
                 access_token=data["access_token"],
                 expires_at=data["expires_at"] / 1000,  # Convert ms to seconds
             )
+            self._token = token
 
             logger.debug("GigaChat token obtained successfully")
-            return self._token.access_token
+            return token
 
         except httpx.TimeoutException:
             raise LLMTimeoutError("GigaChat authentication timed out")
         except Exception as e:
-            logger.error(f"GigaChat auth error: {e}")
+            logger.error("GigaChat auth error: %s", e)
             raise LLMError(f"GigaChat authentication error: {e}")
 
     def get_usage(self) -> TokenUsage | None:
-        """Get token usage from last request."""
-        return self._last_usage
+        """Get token usage from the last request made in the current context."""
+        return _last_usage.get()
 
     async def send_message(
         self,
@@ -195,7 +413,7 @@ class GigaChatClient:
         **kwargs: Any,
     ) -> str:
         """Send non-streaming message request."""
-        access_token = await self._get_access_token()
+        token = await self._get_token()
         client = await self._get_client()
 
         # Set default max_tokens if not provided
@@ -210,41 +428,45 @@ class GigaChatClient:
 
         try:
             response = await client.post(
-                f"{GIGACHAT_API_URL}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Content-Type": "application/json",
-                },
-                json=payload,
+                _CHAT_URL,
+                headers=token.api_headers,
+                content=orjson.dumps(payload),
             )
 
             if response.status_code != 200:
                 self._handle_api_error(response.status_code, response.text)
 
-            data = response.json()
+            data = orjson.loads(response.content)
 
             # Track usage
             usage = data.get("usage", {})
-            self._last_usage = TokenUsage(
+            token_usage = TokenUsage(
                 prompt_tokens=usage.get("prompt_tokens", 0),
                 completion_tokens=usage.get("completion_tokens", 0),
                 total_tokens=usage.get("total_tokens", 0),
             )
+            _last_usage.set(token_usage)
 
             # Extract content
             content = data["choices"][0]["message"]["content"]
 
-            logger.debug(f"GigaChat response: model={model}, tokens={self._last_usage}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "GigaChat response: model=%s, http=%s, tokens=%s",
+                    model,
+                    response.http_version,
+                    token_usage,
+                )
 
             return content
 
         except httpx.TimeoutException:
-            logger.error(f"GigaChat timeout after {self._timeout}s")
+            logger.error("GigaChat timeout after %ss", self._timeout)
             raise LLMTimeoutError(f"GigaChat request timed out after {self._timeout}s")
         except LLMError:
             raise
         except Exception as e:
-            logger.error(f"GigaChat unexpected error: {e}")
+            logger.error("GigaChat unexpected error: %s", e)
             raise LLMError(f"GigaChat error: {e}")
 
     async def _stream_message(
@@ -254,7 +476,7 @@ class GigaChatClient:
         **kwargs: Any,
     ) -> AsyncGenerator[str, None]:
         """Stream message response."""
-        access_token = await self._get_access_token()
+        token = await self._get_token()
         client = await self._get_client()
 
         if "max_tokens" not in kwargs:
@@ -270,32 +492,55 @@ class GigaChatClient:
         prompt_tokens = 0
         completion_tokens = 0
 
+        # Buffered text not yet yielded to the caller; without coalescing
+        # every delta meets the threshold and is yielded as it arrives
+        flush_chars = STREAM_FLUSH_CHARS if self._coalesce_stream else 0
+        pending: list[str] = []
+        pending_len = 0
+        loop = asyncio.get_running_loop()
+        last_flush = loop.time()
+
         try:
             async with client.stream(
                 "POST",
-                f"{GIGACHAT_API_URL}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Content-Type": "application/json",
-                },
-                json=payload,
+                _CHAT_URL,
+                headers=token.stream_headers,
+                content=orjson.dumps(payload),
             ) as response:
                 if response.status_code != 200:
                     error_text = await response.aread()
                     self._handle_api_error(response.status_code, error_text.decode())
 
-                async for line in response.aiter_lines():
-                    if not line or not line.startswith("data:"):
-                        continue
-
-                    data_str = line[5:].strip()
-                    if data_str == "[DONE]":
-                        break
-
-                    try:
-                        import json
-
-                        data = json.loads(data_str)
+                queue: asyncio.Queue[bytearray | Exception | None] = asyncio.Queue(
+                    STREAM_READ_AHEAD
+                )
+                reader = loop.create_task(_read_sse_data(response.aiter_bytes(), queue))
+                try:
+                    while True:
+                        if pending:
+                            # Flush on a deadline rather than when the next delta
+                            # arrives, so text isn't held while the provider stalls
+                            try:
+                                async with asyncio.timeout_at(last_flush + STREAM_FLUSH_INTERVAL):
+                                    item = await queue.get()
+                            except TimeoutError:
+                                yield "".join(pending)
+                                pending.clear()
+                                pending_len = 0
+                                last_flush = loop.time()
+                                continue
+                        else:
+                            item = await queue.get()
+
+                        if item is None:
+                            break
+                        if isinstance(item, Exception):
+                            raise item
+
+                        try:
+                            data = orjson.loads(item)
+                        except orjson.JSONDecodeError:
+                            continue
 
                         # Extract content delta
                         choices = data.get("choices", [])
@@ -303,36 +548,53 @@ class GigaChatClient:
                             delta = choices[0].get("delta", {})
                             content = delta.get("content", "")
                             if content:
-                                yield content
+                                pending.append(content)
+                                pending_len += len(content)
+                                now = loop.time()
+                                if (
+                                    pending_len >= flush_chars
+                                    or now - last_flush >= STREAM_FLUSH_INTERVAL
+                                ):
+                                    yield "".join(pending)
+                                    pending.clear()
+                                    pending_len = 0
+                                    last_flush = now
 
                         # Track usage if provided
                         usage = data.get("usage")
                         if usage:
                             prompt_tokens = usage.get("prompt_tokens", prompt_tokens)
                             completion_tokens = usage.get("completion_tokens", completion_tokens)
+                finally:
+                    # Stop reading before the response is closed
+                    reader.cancel()
+                    await asyncio.wait({reader})
 
-                    except json.JSONDecodeError:
-                        continue
+                # Flush whatever is left when the stream closes
+                if pending:
+                    yield "".join(pending)
 
             # Update usage after stream completes
-            self._last_usage = TokenUsage(
-                prompt_tokens=prompt_tokens,
-                completion_tokens=completion_tokens,
-                total_tokens=prompt_tokens + completion_tokens,
+            _last_usage.set(
+                TokenUsage(
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    total_tokens=prompt_tokens + completion_tokens,
+                )
             )
 
         except httpx.TimeoutException:
-            logger.error(f"GigaChat streaming timeout after {self._timeout}s")
+            logger.error("GigaChat streaming timeout after %ss", self._timeout)
             raise LLMTimeoutError(f"GigaChat streaming timed out after {self._timeout}s")
         except LLMError:
             raise
         except Exception as e:
-            logger.error(f"GigaChat streaming error: {e}")
+            logger.error("GigaChat streaming error: %s", e)
             raise LLMError(f"GigaChat streaming error: {e}")
 
     def _handle_api_error(self, status_code: int, error_text: str) -> None:
         """Handle GigaChat API errors."""
-        logger.error(f"GigaChat API error: status={status_code}")
+        logger.error("GigaChat API error: status=%s", status_code)
 
         if status_code == 401:
             self._token = None  # Force token refresh
@@ -345,10 +607,76 @@ class GigaChatClient:
             raise LLMError(f"GigaChat API error ({status_code}): {error_text[:200]}")
 
     async def close(self) -> None:
-        """Close the client connection."""
-        if self._client and not self._client.is_closed:
-            await self._client.aclose()
-            self._client = None
+        """Close the HTTP client of the running event loop."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+
+# Process-wide clients keyed by (auth_key, scope), so providers share one
+# connection pool and OAuth token per set of credentials
+_shared_clients: dict[tuple[str | None, str], GigaChatClient] = {}
+
+# Key of the shared client built from the configured credentials; when they
+# rotate, that client is closed and evicted
+_settings_client_key: tuple[str | None, str] | None = None
+
+# Close tasks of evicted clients, referenced until they finish
+_closing_clients: set[asyncio.Task[None]] = set()
+
+
+def get_shared_client(auth_key: str | None = None, scope: str | None = None) -> GigaChatClient:
+    """Get or create the shared GigaChat client for a set of credentials.
+
+    Rotated credentials map to a new key and therefore a fresh client. The
+    client built from the previously configured credentials is closed and
+    forgotten, so its connection pool doesn't stay open until shutdown.
+
+    Args:
+        auth_key: GigaChat authorization key (defaults to settings.gigachat_auth_key)
+        scope: API scope (defaults to settings.gigachat_scope)
+
+    Returns:
+        Shared GigaChatClient instance
+    """
+    global _settings_client_key
+
+    key = (auth_key or settings.gigachat_auth_key, scope or settings.gigachat_scope)
+    if auth_key is None and scope is None:
+        if _settings_client_key is not None and _settings_client_key != key:
+            _evict_shared_client(_settings_client_key)
+        _settings_client_key = key
+
+    client = _shared_clients.get(key)
+    if client is None:
+        client = _shared_clients[key] = GigaChatClient(auth_key=key[0], scope=key[1])
+    return client
+
+
+def _evict_shared_client(key: tuple[str | None, str]) -> None:
+    """Forget a shared client and close its connection pool in the background."""
+    client = _shared_clients.pop(key, None)
+    if client is None:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # HTTP clients only exist on running loops; there is nothing to close
+        return
+    task = loop.create_task(client.close())
+    _closing_clients.add(task)
+    task.add_done_callback(_closing_clients.discard)
+
+
+async def close_shared_clients() -> None:
+    """Close and forget all shared GigaChat clients (call on shutdown)."""
+    global _settings_client_key
+
+    clients = list(_shared_clients.values())
+    _shared_clients.clear()
+    _settings_client_key = None
+    for client in clients:
+        await client.close()
 
 
 class GigaChatProvider:
@@ -358,8 +686,8 @@ class GigaChatProvider:
     """
 
     def __init__(self, client: GigaChatClient | None = None):
-        """Initialize with optional client (creates new one if not provided)."""
-        self._client = client or GigaChatClient()
+        """Initialize with optional client (uses the shared one if not provided)."""
+        self._client = client or get_shared_client()
 
     async def generate(
         self,
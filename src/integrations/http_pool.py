@@ -0,0 +1,57 @@
+"""Process-wide HTTP connection pool shared by the LLM SDK clients.
+
+The OpenAI and Anthropic SDKs accept an injected HTTP client. Both are given
+the same one, so the gateway keeps a single pool (one set of limits and file
+descriptors) instead of one per SDK.
+"""
+
+import sys
+from typing import Any
+
+# Connection pool limits for the shared HTTP client
+MAX_CONNECTIONS = 1000
+MAX_KEEPALIVE_CONNECTIONS = 200
+
+# Pool-level default; the SDKs pass their own per-request timeouts
+DEFAULT_TIMEOUT = 30.0
+
+# Shared clients keyed by httpx package name. SDK versions differ in which
+# httpx package they are built on, and a client only works with the SDK whose
+# package it comes from, so SDKs on the same package share one client.
+_shared_clients: dict[str, Any] = {}
+
+
+def get_shared_http_client(sdk_limits: Any) -> Any:
+    """Get or create the shared HTTP/2 client for an SDK.
+
+    Args:
+        sdk_limits: The SDK's DEFAULT_CONNECTION_LIMITS, which identifies the
+            httpx package the SDK runs on
+
+    Returns:
+        Async HTTP client to pass to the SDK as http_client
+    """
+    package = type(sdk_limits).__module__.partition(".")[0]
+    client = _shared_clients.get(package)
+    if client is None or client.is_closed:
+        httpx = sys.modules[package]
+        client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            timeout=DEFAULT_TIMEOUT,
+            follow_redirects=True,
+        )
+        _shared_clients[package] = client
+    return client
+
+
+async def close_shared_http_clients() -> None:
+    """Close the shared HTTP clients (called on application shutdown)."""
+    clients = list(_shared_clients.values())
+    _shared_clients.clear()
+    for client in clients:
+        if not client.is_closed:
+            await client.aclose()
@@ -7,11 +7,18 @@ Implements JWT validation with support for:
 Security:
     - Secret keys from environment variables, never logged
     - JWKS keys cached for 1 hour to reduce load on auth server
+    - Validated claims cached for up to 1 minute (never past token expiry),
+      keyed by a hash of the token so raw tokens are not kept in memory
 """
 
+import hashlib
 import logging
+import re
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 
 import jwt
@@ -24,6 +31,7 @@ from jwt.exceptions import (
     InvalidSignatureError,
     InvalidTokenError,
 )
+from jwt.types import Options
 
 from src.config.settings import settings
 from src.shared.exceptions import UnauthorizedError
@@ -33,8 +41,32 @@ logger = logging.getLogger(__name__)
 # JWKS cache TTL in seconds (1 hour)
 JWKS_CACHE_TTL = 3600
 
+# Max signing keys (by kid) kept by the JWKS client
+JWKS_MAX_CACHED_KEYS = 16
 
-@dataclass
+# Compact JWS shape: three base64url segments. Tokens that don't match are
+# rejected before any hashing, key lookup or signature verification.
+_JWT_FORMAT = re.compile(r"[A-Za-z0-9_\-=]+\.[A-Za-z0-9_\-=]+\.[A-Za-z0-9_\-=]*")
+
+# jwt.decode arguments shared by every validation (PyJWT copies, never mutates)
+_HS256 = ("HS256",)
+_RS256 = ("RS256",)
+_JWT_OPTIONS: Options = {
+    "verify_exp": True,
+    "verify_iat": True,
+    "verify_nbf": True,
+    "require": ["exp", "iat"],
+}
+
+# String values of is_admin/is_staff treated as true
+_TRUTHY_STRINGS = frozenset({"true", "1", "yes"})
+
+# Validated claims cache: TTL in seconds (capped at token exp) and max entries
+CLAIMS_CACHE_TTL = 60
+CLAIMS_CACHE_MAX_SIZE = 4096
+
+
+@dataclass(slots=True, frozen=True)
 class JWTClaims:
     """Extracted claims from a validated JWT token."""
 
@@ -49,8 +81,9 @@ class JWTClaims:
 class JWKSCache:
     """Cache for JWKS keys with TTL.
 
-    Caches the PyJWKClient to avoid refetching keys on every request.
-    Keys are refreshed automatically when TTL expires.
+    Holds one PyJWKClient, which refreshes its JWK set once the TTL passes
+    and caches signing keys by kid. The client is only rebuilt when the cache
+    is explicitly invalidated.
     """
 
     def __init__(self, jwks_url: str, ttl: int = JWKS_CACHE_TTL):
@@ -62,28 +95,35 @@ class JWKSCache:
         """
         self._jwks_url = jwks_url
         self._ttl = ttl
-        self._client: PyJWKClient | None = None
-        self._last_refresh: float = 0
+        self._client = self._create_client()
+
+    def _create_client(self) -> PyJWKClient:
+        """Create a JWKS client with empty key caches."""
+        return PyJWKClient(
+            self._jwks_url,
+            cache_keys=True,
+            lifespan=self._ttl,
+            max_cached_keys=JWKS_MAX_CACHED_KEYS,
+        )
 
     def get_client(self) -> PyJWKClient:
-        """Get JWKS client, refreshing if cache expired.
+        """Get JWKS client.
 
         Returns:
             PyJWKClient instance with cached keys
         """
-        now = time.time()
-
-        if self._client is None or (now - self._last_refresh) > self._ttl:
-            logger.debug(f"Refreshing JWKS cache from {self._jwks_url}")
-            self._client = PyJWKClient(self._jwks_url, cache_keys=True)
-            self._last_refresh = now
-
         return self._client
 
     def invalidate(self) -> None:
-        """Invalidate cache to force refresh on next access."""
-        self._client = None
-        self._last_refresh = 0
+        """Replace the client, dropping cached signing keys, and refetch keys.
+
+        Raises:
+            PyJWKClientError: If the JWKS endpoint can't be reached
+        """
+        logger.debug(f"Refreshing JWKS keys from {self._jwks_url}")
+        client = self._create_client()
+        client.get_jwk_set(refresh=True)
+        self._client = client
 
 
 class JWTValidator:
@@ -95,6 +135,7 @@ class JWTValidator:
     - Validates exp, iat, nbf claims
     - Extracts user_id and is_admin claims
     - Caches JWKS keys for 1 hour
+    - Caches validated claims per token for up to 1 minute
 
     Usage:
         validator = JWTValidator()
@@ -119,6 +160,11 @@ class JWTValidator:
         self._jwks_url = jwks_url or settings.jwt_jwks_url
         self._algorithm = algorithm or settings.jwt_algorithm
 
+        # Validated claims by token hash -> (cache expiry, claims), oldest first.
+        # validate() may run in worker threads, hence the lock.
+        self._claims_cache: OrderedDict[bytes, tuple[float, JWTClaims]] = OrderedDict()
+        self._claims_cache_lock = threading.Lock()
+
         # Initialize JWKS cache if using RS256
         self._jwks_cache: JWKSCache | None = None
         if self._algorithm == "RS256" and self._jwks_url:
@@ -146,13 +192,26 @@ class JWTValidator:
         if token.startswith("Bearer "):
             token = token[7:]
 
+        if _JWT_FORMAT.fullmatch(token) is None:
+            logger.warning("JWT token malformed: not a compact JWS")
+            raise UnauthorizedError("Malformed token")
+
+        # Repeat tokens skip signature verification until the entry expires
+        cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        now = time.time()
+        cached = self._get_cached_claims(cache_key, now)
+        if cached is not None:
+            return cached
+
         try:
             if self._algorithm == "RS256":
                 claims = self._validate_rs256(token)
             else:  # Default to HS256
                 claims = self._validate_hs256(token)
 
-            return self._extract_claims(claims)
+            extracted = self._extract_claims(claims)
+            self._cache_claims(cache_key, extracted, now)
+            return extracted
 
         except ExpiredSignatureError:
             logger.warning("JWT token expired")
@@ -186,6 +245,27 @@ class JWTValidator:
             logger.error(f"JWT validation error: {e}")
             raise UnauthorizedError("Token validation failed")
 
+    def _get_cached_claims(self, cache_key: bytes, now: float) -> JWTClaims | None:
+        """Return cached claims for a token hash unless the entry has expired."""
+        with self._claims_cache_lock:
+            entry = self._claims_cache.get(cache_key)
+            if entry is None:
+                return None
+            expires_at, claims = entry
+            if now >= expires_at:
+                del self._claims_cache[cache_key]
+                return None
+            return claims
+
+    def _cache_claims(self, cache_key: bytes, claims: JWTClaims, now: float) -> None:
+        """Cache validated claims, evicting the oldest entries past the size cap."""
+        expires_at = min(now + CLAIMS_CACHE_TTL, claims.exp)
+        with self._claims_cache_lock:
+            self._claims_cache[cache_key] = (expires_at, claims)
+            self._claims_cache.move_to_end(cache_key)
+            while len(self._claims_cache) > CLAIMS_CACHE_MAX_SIZE:
+                self._claims_cache.popitem(last=False)
+
     def _validate_hs256(self, token: str) -> dict[str, Any]:
         """Validate token with HS256 algorithm.
 
@@ -205,13 +285,8 @@ class JWTValidator:
         return jwt.decode(
             token,
             self._secret,
-            algorithms=["HS256"],
-            options={
-                "verify_exp": True,
-                "verify_iat": True,
-                "verify_nbf": True,
-                "require": ["exp", "iat"],
-            },
+            algorithms=_HS256,
+            options=_JWT_OPTIONS,
         )
 
     def _validate_rs256(self, token: str) -> dict[str, Any]:
@@ -238,13 +313,8 @@ class JWTValidator:
             return jwt.decode(
                 token,
                 signing_key.key,
-                algorithms=["RS256"],
-                options={
-                    "verify_exp": True,
-                    "verify_iat": True,
-                    "verify_nbf": True,
-                    "require": ["exp", "iat"],
-                },
+                algorithms=_RS256,
+                options=_JWT_OPTIONS,
             )
 
         except jwt.exceptions.PyJWKClientError as e:
@@ -263,8 +333,10 @@ class JWTValidator:
         Raises:
             UnauthorizedError: If required claims missing
         """
+        get = raw_claims.get
+
         # Extract user_id (may be in different fields)
-        user_id = raw_claims.get("user_id") or raw_claims.get("sub")
+        user_id = get("user_id") or get("sub")
         if user_id is None:
             raise UnauthorizedError("Token missing user_id claim")
 
@@ -275,50 +347,46 @@ class JWTValidator:
             raise UnauthorizedError("Invalid user_id in token")
 
         # Extract is_admin (check both is_admin and is_staff for compatibility)
-        is_admin = raw_claims.get("is_admin") or raw_claims.get("is_staff", False)
-        if isinstance(is_admin, str):
-            is_admin = is_admin.lower() in ("true", "1", "yes")
-
-        # Extract exp and iat (required by validation)
-        exp = raw_claims.get("exp", 0)
-        iat = raw_claims.get("iat", 0)
-        nbf = raw_claims.get("nbf")
+        is_admin = get("is_admin") or get("is_staff", False)
 
+        # exp and iat are required by validation
         return JWTClaims(
             user_id=user_id,
-            is_admin=bool(is_admin),
-            exp=exp,
-            iat=iat,
-            nbf=nbf,
+            is_admin=(
+                is_admin.lower() in _TRUTHY_STRINGS
+                if isinstance(is_admin, str)
+                else bool(is_admin)
+            ),
+            exp=get("exp", 0),
+            iat=get("iat", 0),
+            nbf=get("nbf"),
             raw_claims=raw_claims,
         )
 
     def refresh_jwks(self) -> None:
-        """Force refresh of JWKS cache.
+        """Force refresh of JWKS cache and drop cached claims.
 
         Call this if keys have been rotated at the auth server.
         """
+        with self._claims_cache_lock:
+            self._claims_cache.clear()
+
         if self._jwks_cache:
             self._jwks_cache.invalidate()
             logger.info("JWKS cache invalidated")
 
 
-# Global validator instance for convenience
-_validator: JWTValidator | None = None
-
-
+@lru_cache(maxsize=1)
 def get_jwt_validator() -> JWTValidator:
     """Get global JWT validator instance.
 
-    Creates validator on first call, reuses on subsequent calls.
+    Creates validator on first call, reuses on subsequent calls. lru_cache
+    makes creation thread-safe without a check on every call.
 
     Returns:
         JWTValidator instance
     """
-    global _validator
-    if _validator is None:
-        _validator = JWTValidator()
-    return _validator
+    return JWTValidator()
 
 
 def validate_jwt(token: str) -> JWTClaims:
@@ -5,12 +5,10 @@ adapter (OpenAI or Anthropic) based on provider name or model metadata.
 """
 
 import logging
+import sys
 from typing import Protocol, Any
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable
 
-from src.integrations.anthropic_client import AnthropicProvider
-from src.integrations.gigachat_client import GigaChatProvider
-from src.integrations.openai_client import OpenAIProvider
 from src.shared.exceptions import LLMError
 
 logger = logging.getLogger(__name__)
@@ -69,8 +67,51 @@ class LLMProviderContract(Protocol):
         ...
 
 
+# Provider modules (and their SDKs) are imported on first use, so a process
+# only pays the import cost of the providers it actually serves
+
+
+def _create_openai() -> LLMProviderContract:
+    from src.integrations.openai_client import get_openai_provider
+
+    return get_openai_provider()
+
+
+def _create_anthropic() -> LLMProviderContract:
+    from src.integrations.anthropic_client import get_anthropic_provider
+
+    return get_anthropic_provider()
+
+
+def _create_gigachat() -> LLMProviderContract:
+    from src.integrations.gigachat_client import GigaChatProvider
+
+    return GigaChatProvider()
+
+
+# Constructors for each supported provider, called once on first use
+_PROVIDER_FACTORIES: dict[str, Callable[[], LLMProviderContract]] = {
+    "openai": _create_openai,
+    "anthropic": _create_anthropic,
+    "gigachat": _create_gigachat,
+}
+
+# Shutdown hook of each provider module, as (module, coroutine function)
+_SHUTDOWN_HOOKS = (
+    ("src.integrations.openai_client", "close_openai_provider"),
+    ("src.integrations.gigachat_client", "close_shared_clients"),
+    ("src.integrations.http_pool", "close_shared_http_clients"),
+)
+
 # Supported providers
-SUPPORTED_PROVIDERS = {"openai", "anthropic", "gigachat"}
+SUPPORTED_PROVIDERS = set(_PROVIDER_FACTORIES)
+
+# Sorted names, computed once for listings and error messages
+_SUPPORTED_PROVIDERS_SORTED: tuple[str, ...] = tuple(sorted(SUPPORTED_PROVIDERS))
+
+# Provider instances by requested name (raw and normalized), so repeat lookups
+# are a single dict hit
+_PROVIDERS: dict[str, LLMProviderContract] = {}
 
 
 class LLMProviderFactory:
@@ -92,33 +133,36 @@ class LLMProviderFactory:
 
         Raises:
             LLMError: If provider is unknown or initialization fails (500)
+
+        Note:
+            Providers are created once and reused for every later lookup
         """
-        provider_name = provider_name.lower().strip()
-
-        if provider_name not in SUPPORTED_PROVIDERS:
-            available = ", ".join(sorted(SUPPORTED_PROVIDERS))
-            logger.error(f"Unknown LLM provider: {provider_name}")
-            raise LLMError(
-                f"Unknown LLM provider '{provider_name}'. Supported providers: {available}"
-            )
-
-        try:
-            if provider_name == "openai":
-                return OpenAIProvider()
-            elif provider_name == "anthropic":
-                return AnthropicProvider()
-            elif provider_name == "gigachat":
-                return GigaChatProvider()
-            else:
-                # This shouldn't happen due to the check above
-                raise LLMError(f"Unsupported provider: {provider_name}")
-
-        except LLMError:
-            # Re-raise LLM errors as-is
-            raise
-        except Exception as e:
-            logger.error(f"Failed to initialize {provider_name} provider: {e}")
-            raise LLMError(f"Failed to initialize LLM provider '{provider_name}': {e}")
+        provider = _PROVIDERS.get(provider_name)
+        if provider is not None:
+            return provider
+
+        key = provider_name.lower().strip()
+        factory = _PROVIDER_FACTORIES.get(key)
+
+        if factory is None:
+            available = ", ".join(_SUPPORTED_PROVIDERS_SORTED)
+            logger.error(f"Unknown LLM provider: {key}")
+            raise LLMError(f"Unknown LLM provider '{key}'. Supported providers: {available}")
+
+        provider = _PROVIDERS.get(key)
+        if provider is None:
+            try:
+                provider = factory()
+            except LLMError:
+                # Re-raise LLM errors as-is
+                raise
+            except Exception as e:
+                logger.error(f"Failed to initialize {key} provider: {e}")
+                raise LLMError(f"Failed to initialize LLM provider '{key}': {e}")
+            _PROVIDERS[key] = provider
+
+        _PROVIDERS[provider_name] = provider
+        return provider
 
     @staticmethod
     def get_provider_for_model(
@@ -160,7 +204,7 @@ class LLMProviderFactory:
         Returns:
             List of supported provider names
         """
-        return sorted(SUPPORTED_PROVIDERS)
+        return list(_SUPPORTED_PROVIDERS_SORTED)
 
 
 # Convenience function for simple provider lookup
@@ -179,3 +223,17 @@ def get_llm_provider(provider_name: str) -> LLMProviderContract:
         LLMError: If provider is unknown or initialization fails (500)
     """
     return LLMProviderFactory.get_provider(provider_name)
+
+
+async def aclose_providers() -> None:
+    """Close the shared provider clients and their connection pools.
+
+    Called once on application shutdown so pooled sockets are released
+    cleanly instead of being dropped with the process. Provider modules that
+    were never imported have nothing to close and are skipped.
+    """
+    _PROVIDERS.clear()
+    for module_name, hook in _SHUTDOWN_HOOKS:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            await getattr(module, hook)()
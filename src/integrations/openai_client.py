@@ -9,13 +9,22 @@ Security:
 """
 
 import logging
+import threading
 from collections.abc import AsyncGenerator
+from contextvars import ContextVar
 from dataclasses import dataclass
 from typing import Any
 
-from openai import APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI
+from openai import (
+    DEFAULT_CONNECTION_LIMITS,
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    AsyncOpenAI,
+)
 
 from src.config.settings import settings
+from src.integrations.http_pool import get_shared_http_client
 from src.shared.exceptions import LLMError, LLMTimeoutError
 
 logger = logging.getLogger(__name__)
@@ -23,8 +32,15 @@ logger = logging.getLogger(__name__)
 # Timeout configuration
 DEFAULT_TIMEOUT = 30.0  # 30 seconds
 
+# Fixed client-facing messages for API statuses with a known cause
+# (rate limits could later honour retry-after)
+_STATUS_ERROR_MESSAGES: dict[int, str] = {
+    401: "OpenAI authentication failed - check API key",
+    429: "OpenAI rate limit exceeded. Please retry later.",
+}
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class TokenUsage:
     """Token usage from LLM response."""
 
@@ -33,6 +49,11 @@ class TokenUsage:
     total_tokens: int
 
 
+# Usage of the last request made in the current context. The client is shared
+# across concurrent requests, so this can't live on the instance.
+_last_usage: ContextVar[TokenUsage | None] = ContextVar("openai_last_usage", default=None)
+
+
 class OpenAIClient:
     """Async client adapter for OpenAI API.
 
@@ -60,7 +81,6 @@ class OpenAIClient:
         self._api_key = api_key or settings.openai_api_key
         self._base_url = base_url or settings.openai_base_url
         self._timeout = timeout
-        self._last_usage: TokenUsage | None = None
 
         if not self._api_key:
             logger.warning("OpenAI API key not configured")
@@ -68,21 +88,34 @@ class OpenAIClient:
         if self._base_url:
             logger.info(f"Using custom OpenAI base URL: {self._base_url}")
 
-        # Initialize async client with connection pooling
+        # Async client over the shared connection pool, created lazily
         self._client: AsyncOpenAI | None = None
+        self._init_lock = threading.Lock()
 
     def _get_client(self) -> AsyncOpenAI:
-        """Get or create async OpenAI client."""
+        """Get or create async OpenAI client.
+
+        Creation is double-checked under a lock so concurrent first callers
+        build exactly one client and connection pool. The method stays
+        synchronous: nothing in it awaits, so coroutines on one loop can't
+        interleave here, and the lock covers callers on other threads.
+        """
         if self._client is None:
-            if not self._api_key:
-                raise LLMError("OpenAI API key not configured")
-
-            self._client = AsyncOpenAI(
-                api_key=self._api_key,
-                base_url=self._base_url,  # Support custom endpoints (LM Studio, Ollama)
-                timeout=self._timeout,
-                max_retries=0,  # We handle retries ourselves
-            )
+            with self._init_lock:
+                if self._client is None:
+                    if not self._api_key:
+                        raise LLMError("OpenAI API key not configured")
+
+                    # AsyncOpenAI has no limits= argument; pool limits and
+                    # HTTP/2 come from the shared client passed in here
+                    self._client = AsyncOpenAI(
+                        api_key=self._api_key,
+                        # Support custom endpoints (LM Studio, Ollama)
+                        base_url=self._base_url,
+                        timeout=self._timeout,
+                        max_retries=0,  # We handle retries ourselves
+                        http_client=get_shared_http_client(DEFAULT_CONNECTION_LIMITS),
+                    )
         return self._client
 
     def get_usage(self) -> TokenUsage | None:
@@ -91,7 +124,7 @@ class OpenAIClient:
         Returns:
             TokenUsage from last request, or None if no request made
         """
-        return self._last_usage
+        return _last_usage.get()
 
     async def send_message(
         self,
@@ -117,9 +150,10 @@ class OpenAIClient:
             LLMError: For API errors (401, 5xx)
             LLMTimeoutError: For timeout errors (504)
         """
-        # Prepend system prompt if provided and not already in messages
+        # Prepend system prompt if provided and not already in messages. Built
+        # in one allocation, without the temporary list that `+` would create.
         if system_prompt and (not messages or messages[0].get("role") != "system"):
-            messages = [{"role": "system", "content": system_prompt}] + messages
+            messages = [{"role": "system", "content": system_prompt}, *messages]
 
         if stream:
             return self._stream_message(model, messages, **kwargs)
@@ -145,14 +179,16 @@ class OpenAIClient:
 
             # Track usage
             if response.usage:
-                self._last_usage = TokenUsage(
-                    prompt_tokens=response.usage.prompt_tokens,
-                    completion_tokens=response.usage.completion_tokens,
-                    total_tokens=response.usage.total_tokens,
+                _last_usage.set(
+                    TokenUsage(
+                        prompt_tokens=response.usage.prompt_tokens,
+                        completion_tokens=response.usage.completion_tokens,
+                        total_tokens=response.usage.total_tokens,
+                    )
                 )
 
             content = response.choices[0].message.content or ""
-            logger.debug(f"OpenAI response: model={model}, tokens={self._last_usage}")
+            logger.debug(f"OpenAI response: model={model}, tokens={_last_usage.get()}")
 
             return content
 
@@ -177,7 +213,42 @@ class OpenAIClient:
         messages: list[dict[str, str]],
         **kwargs: Any,
     ) -> AsyncGenerator[str, None]:
-        """Stream chat completion response."""
+        """Stream chat completion response as text chunks."""
+        events = self.stream_events(model, messages, **kwargs)
+        try:
+            async for chunk, _, _, _ in events:
+                if chunk:
+                    yield chunk
+        finally:
+            await events.aclose()
+
+    async def stream_events(
+        self,
+        model: str,
+        messages: list[dict[str, str]],
+        **kwargs: Any,
+    ) -> AsyncGenerator[tuple[str, bool, int | None, int | None], None]:
+        """Stream chat completion as provider tuples in a single pass.
+
+        Content deltas and the trailing usage chunk are read off the SDK
+        stream in one loop, so callers get ready-made tuples without a second
+        generator layer. The last content delta is held back and sent on the
+        done tuple, so no separate empty event is needed to carry the usage.
+
+        Args:
+            model: Model name
+            messages: List of message dicts with 'role' and 'content'
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
+
+        Yields:
+            Tuples of (content_chunk, is_done, prompt_tokens, completion_tokens).
+            The final tuple has is_done=True, carries the last content
+            delta, and has zero counts if the API reported no usage.
+
+        Raises:
+            LLMError: For API errors (401, 5xx)
+            LLMTimeoutError: For timeout errors (504)
+        """
         client = self._get_client()
 
         try:
@@ -189,18 +260,39 @@ class OpenAIClient:
                 **kwargs,
             )
 
-            async for chunk in stream:
-                # Handle usage in final chunk
-                if chunk.usage:
-                    self._last_usage = TokenUsage(
-                        prompt_tokens=chunk.usage.prompt_tokens,
-                        completion_tokens=chunk.usage.completion_tokens,
-                        total_tokens=chunk.usage.total_tokens,
-                    )
-
-                # Yield content chunks
-                if chunk.choices and chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
+            done = False
+            # Latest content delta, sent once the next one (or the end) arrives
+            pending = ""
+            try:
+                async for chunk in stream:
+                    if chunk.choices:
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            if pending:
+                                yield (pending, False, None, None)
+                            pending = delta
+
+                    # Usage arrives in the final chunk
+                    usage = chunk.usage
+                    if usage:
+                        _last_usage.set(
+                            TokenUsage(
+                                prompt_tokens=usage.prompt_tokens,
+                                completion_tokens=usage.completion_tokens,
+                                total_tokens=usage.total_tokens,
+                            )
+                        )
+                        done = True
+                        yield (pending, True, usage.prompt_tokens, usage.completion_tokens)
+                        pending = ""
+            finally:
+                # Hand the connection back to the pool even if the consumer
+                # stopped early or the stream failed part-way
+                await stream.close()
+
+            if not done:
+                # Some OpenAI-compatible servers (e.g. LM Studio) omit usage
+                yield (pending, True, 0, 0)
 
         except APITimeoutError as e:
             logger.error(f"OpenAI streaming timeout: {e}")
@@ -226,29 +318,27 @@ class OpenAIClient:
         - 5xx (server error) -> LLMError (500)
         """
         status_code = error.status_code
-        error_message = str(error)
+        logger.error(f"OpenAI API error: status={status_code}")
 
+        message = _STATUS_ERROR_MESSAGES.get(status_code)
+        if message is not None:
+            raise LLMError(message)
+        if status_code >= 500:
+            raise LLMError(f"OpenAI server error: {status_code}")
+
+        error_message = str(error)
         # Don't log the API key in error messages
         if "api_key" in error_message.lower():
             error_message = "Invalid API key"
-
-        logger.error(f"OpenAI API error: status={status_code}")
-
-        if status_code == 401:
-            raise LLMError("OpenAI authentication failed - check API key")
-        elif status_code == 429:
-            # Rate limit - could implement retry-after handling
-            raise LLMError("OpenAI rate limit exceeded. Please retry later.")
-        elif status_code >= 500:
-            raise LLMError(f"OpenAI server error: {status_code}")
-        else:
-            raise LLMError(f"OpenAI API error: {error_message}")
+        raise LLMError(f"OpenAI API error: {error_message}")
 
     async def close(self) -> None:
-        """Close the client connection."""
-        if self._client:
-            await self._client.close()
-            self._client = None
+        """Release the client.
+
+        The underlying connection pool is shared with other clients and is
+        closed on application shutdown via close_shared_http_clients().
+        """
+        self._client = None
 
 
 # Adapter to implement LLMProvider protocol from message_service
@@ -262,6 +352,14 @@ class OpenAIProvider:
         """Initialize with optional client (creates new one if not provided)."""
         self._client = client or OpenAIClient()
 
+    async def close(self) -> None:
+        """Release the underlying client.
+
+        The connection pool is shared with other clients and is closed on
+        application shutdown via close_shared_http_clients().
+        """
+        await self._client.close()
+
     async def generate(
         self,
         messages: list[dict[str, str]],
@@ -301,6 +399,8 @@ class OpenAIProvider:
     ) -> AsyncGenerator[tuple[str, bool, int | None, int | None], None]:
         """Generate a streaming response from OpenAI.
 
+        Passes the client's tuples through unchanged.
+
         Args:
             messages: List of message dicts with 'role' and 'content'
             model: Model name to use
@@ -310,20 +410,35 @@ class OpenAIProvider:
             Tuples of (content_chunk, is_done, prompt_tokens, completion_tokens)
         """
         kwargs = config or {}
+        events = self._client.stream_events(model=model, messages=messages, **kwargs)
+        try:
+            async for event in events:
+                yield event
+        finally:
+            # Close the SDK stream and release its pooled connection as soon
+            # as the consumer stops, not when the generator is collected
+            await events.aclose()
 
-        stream = await self._client.send_message(
-            model=model,
-            messages=messages,
-            stream=True,
-            **kwargs,
-        )
 
-        async for chunk in stream:  # type: ignore
-            yield (chunk, False, None, None)
+# Process-wide provider so every request reuses one AsyncOpenAI connection pool
+_DEFAULT_PROVIDER: OpenAIProvider | None = None
 
-        # Final chunk with usage
-        usage = self._client.get_usage()
-        prompt_tokens = usage.prompt_tokens if usage else 0
-        completion_tokens = usage.completion_tokens if usage else 0
 
-        yield ("", True, prompt_tokens, completion_tokens)
+def get_openai_provider() -> OpenAIProvider:
+    """Get the process-wide OpenAI provider, creating it on first use.
+
+    Returns:
+        Shared OpenAIProvider instance
+    """
+    global _DEFAULT_PROVIDER
+    if _DEFAULT_PROVIDER is None:
+        _DEFAULT_PROVIDER = OpenAIProvider()
+    return _DEFAULT_PROVIDER
+
+
+async def close_openai_provider() -> None:
+    """Close the shared OpenAI provider (called on application shutdown)."""
+    global _DEFAULT_PROVIDER
+    if _DEFAULT_PROVIDER is not None:
+        await _DEFAULT_PROVIDER.close()
+    _DEFAULT_PROVIDER = None
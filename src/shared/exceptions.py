@@ -1,8 +1,15 @@
 """Custom exceptions for the application."""
 
+from typing import Any
+
 
 class ApplicationError(Exception):
-    """Base exception for all application errors."""
+    """Base exception for all application errors.
+
+    Fields are slotted, so raising one doesn't allocate an instance __dict__.
+    """
+
+    __slots__ = ("details", "message", "status_code")
 
     code: str = "INTERNAL_ERROR"
 
@@ -10,12 +17,22 @@ class ApplicationError(Exception):
         self.message = message
         self.status_code = status_code
         self.details = details
-        super().__init__(self.message)
+        # Same result as Exception.__init__(message), without the extra call
+        self.args = (message,)
+
+    def __reduce__(self) -> tuple[type["ApplicationError"], tuple[Any, ...], dict[str, Any]]:
+        # Slotted fields aren't in __dict__, so pass them to __setstate__ explicitly
+        return (
+            type(self),
+            self.args,
+            {"message": self.message, "status_code": self.status_code, "details": self.details},
+        )
 
 
 class ValidationError(ApplicationError):
     """Validation error (400 Bad Request)."""
 
+    __slots__ = ()
     code = "VALIDATION_ERROR"
 
     def __init__(self, message: str, details: dict | None = None):
@@ -25,6 +42,7 @@ class ValidationError(ApplicationError):
 class NotFoundError(ApplicationError):
     """Resource not found (404 Not Found)."""
 
+    __slots__ = ()
     code = "NOT_FOUND"
 
     def __init__(self, message: str, details: dict | None = None):
@@ -34,6 +52,7 @@ class NotFoundError(ApplicationError):
 class ForbiddenError(ApplicationError):
     """Access forbidden (403 Forbidden)."""
 
+    __slots__ = ()
     code = "FORBIDDEN"
 
     def __init__(self, message: str, details: dict | None = None):
@@ -43,6 +62,7 @@ class ForbiddenError(ApplicationError):
 class UnauthorizedError(ApplicationError):
     """Authentication required (401 Unauthorized)."""
 
+    __slots__ = ()
     code = "UNAUTHORIZED"
 
     def __init__(self, message: str, details: dict | None = None):
@@ -52,6 +72,7 @@ class UnauthorizedError(ApplicationError):
 class InsufficientTokensError(ApplicationError):
     """Insufficient tokens for operation (402 Payment Required)."""
 
+    __slots__ = ()
     code = "INSUFFICIENT_TOKENS"
 
     def __init__(self, message: str, details: dict | None = None):
@@ -61,6 +82,7 @@ class InsufficientTokensError(ApplicationError):
 class LLMTimeoutError(ApplicationError):
     """LLM request timed out (504 Gateway Timeout)."""
 
+    __slots__ = ()
     code = "LLM_TIMEOUT"
 
     def __init__(self, message: str = "LLM request timed out", details: dict | None = None):
@@ -70,6 +92,7 @@ class LLMTimeoutError(ApplicationError):
 class LLMError(ApplicationError):
     """LLM error (500 Internal Server Error)."""
 
+    __slots__ = ()
     code = "LLM_ERROR"
 
     def __init__(self, message: str = "LLM error", details: dict | None = None):
@@ -5,10 +5,29 @@ Provides:
 - Token usage metrics
 - LLM request metrics
 - Business metrics (dialogs, messages)
+
+While the metrics worker runs (started in the app lifespan), request-path
+recorders only queue their values; a single background task applies them.
+Without the worker they are applied inline.
 """
 
+import asyncio
+import logging
+import re
+from collections.abc import Callable, Iterable
+from functools import lru_cache
+
 from prometheus_client import Counter, Histogram, Gauge, Info
 
+logger = logging.getLogger(__name__)
+
+# Path normalization patterns (compiled once at import)
+_UUID_RE = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
+    re.IGNORECASE,
+)
+_NUM_RE = re.compile(r"/\d+(/|$)")
+
 # Application info
 APP_INFO = Info("llm_gateway", "LLM Gateway application info")
 APP_INFO.info({"version": "1.0.0", "name": "llm_gateway"})
@@ -33,11 +52,12 @@ HTTP_REQUESTS_IN_PROGRESS = Gauge(
     ["method", "path"],
 )
 
-# Token Metrics
+# Token Metrics. Aggregated by model only: per-user accounting lives in the
+# database, and a user_id label would grow without bound.
 TOKENS_USED_TOTAL = Counter(
     "tokens_used_total",
     "Total tokens used",
-    ["user_id", "model"],
+    ["model"],
 )
 
 TOKENS_PROMPT_TOTAL = Counter(
@@ -52,12 +72,6 @@ TOKENS_COMPLETION_TOTAL = Counter(
     ["model"],
 )
 
-TOKEN_BALANCE = Gauge(
-    "token_balance",
-    "Current token balance",
-    ["user_id"],
-)
-
 # LLM Request Metrics
 LLM_REQUESTS_TOTAL = Counter(
     "llm_requests_total",
@@ -65,6 +79,9 @@ LLM_REQUESTS_TOTAL = Counter(
     ["provider", "model", "status"],
 )
 
+# Values of the LLM request 'status' label
+LLM_REQUEST_STATUSES = ("success", "error", "timeout")
+
 LLM_REQUEST_DURATION_SECONDS = Histogram(
     "llm_request_duration_seconds",
     "LLM request duration in seconds",
@@ -103,6 +120,132 @@ ERRORS_TOTAL = Counter(
 )
 
 
+# Bound label children, cached so repeat label sets skip the label hashing and
+# dict lookup prometheus_client does on every labels() call. Label values are
+# bounded (normalized paths, configured models), so the caches stay small.
+@lru_cache(maxsize=2048)
+def _http_requests_child(method: str, path: str, status_code: int) -> Counter:
+    return HTTP_REQUESTS_TOTAL.labels(method=method, path=path, status_code=str(status_code))
+
+
+@lru_cache(maxsize=2048)
+def _http_duration_child(method: str, path: str) -> Histogram:
+    return HTTP_REQUEST_DURATION_SECONDS.labels(method=method, path=path)
+
+
+@lru_cache(maxsize=2048)
+def _llm_requests_child(provider: str, model: str, status: str) -> Counter:
+    return LLM_REQUESTS_TOTAL.labels(provider=provider, model=model, status=status)
+
+
+@lru_cache(maxsize=2048)
+def _llm_duration_child(provider: str, model: str) -> Histogram:
+    return LLM_REQUEST_DURATION_SECONDS.labels(provider=provider, model=model)
+
+
+@lru_cache(maxsize=2048)
+def _prompt_tokens_child(model: str) -> Counter:
+    return TOKENS_PROMPT_TOTAL.labels(model=model)
+
+
+@lru_cache(maxsize=2048)
+def _completion_tokens_child(model: str) -> Counter:
+    return TOKENS_COMPLETION_TOTAL.labels(model=model)
+
+
+@lru_cache(maxsize=2048)
+def _tokens_used_child(model: str) -> Counter:
+    return TOKENS_USED_TOTAL.labels(model=model)
+
+
+@lru_cache(maxsize=2048)
+def _errors_child(error_type: str, path: str) -> Counter:
+    return ERRORS_TOTAL.labels(error_type=error_type, path=path)
+
+
+def warm_llm_metrics(models: Iterable[tuple[str, str]]) -> None:
+    """Create the LLM metric children for known models ahead of traffic.
+
+    The first request for a label set otherwise pays for building the child
+    and its cache entry. Pre-created children are exported as zeros.
+
+    Args:
+        models: (provider, model) pairs, e.g. from the model registry
+    """
+    for provider, model in models:
+        for status in LLM_REQUEST_STATUSES:
+            _llm_requests_child(provider, model, status)
+        _llm_duration_child(provider, model)
+        _prompt_tokens_child(model)
+        _completion_tokens_child(model)
+        _tokens_used_child(model)
+
+
+# Metric update queued by the record_* functions as an (apply, args) pair
+_MetricUpdate = tuple[Callable[..., None], tuple[object, ...]]
+
+# Queue and worker task are both created by start_metrics_worker on the
+# running loop
+_metrics_queue: asyncio.Queue[_MetricUpdate] | None = None
+_metrics_task: asyncio.Task[None] | None = None
+
+
+def _submit(apply: Callable[..., None], *args: object) -> None:
+    """Queue a metric update for the worker, or apply it now if none is running."""
+    if _metrics_queue is None:
+        apply(*args)
+    else:
+        _metrics_queue.put_nowait((apply, args))
+
+
+async def _drain_metrics(queue: asyncio.Queue[_MetricUpdate]) -> None:
+    """Apply queued metric updates, draining everything pending per wake-up."""
+    while True:
+        apply, args = await queue.get()
+        while True:
+            try:
+                apply(*args)
+            except Exception as e:  # noqa: BLE001 - a failed update must not stop the worker
+                logger.error("Metrics update failed: %s", e)
+            finally:
+                queue.task_done()
+            if queue.empty():
+                break
+            apply, args = queue.get_nowait()
+
+
+def start_metrics_worker() -> None:
+    """Start the background task that applies queued metric updates."""
+    global _metrics_queue, _metrics_task
+    if _metrics_task is not None:
+        return
+    _metrics_queue = asyncio.Queue()
+    _metrics_task = asyncio.get_running_loop().create_task(_drain_metrics(_metrics_queue))
+
+
+async def stop_metrics_worker() -> None:
+    """Stop the worker after applying everything already queued."""
+    global _metrics_queue, _metrics_task
+    if _metrics_queue is None or _metrics_task is None:
+        return
+    queue, task = _metrics_queue, _metrics_task
+    # Later updates are applied inline again
+    _metrics_queue = _metrics_task = None
+
+    await queue.join()
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+async def flush_metrics() -> None:
+    """Wait until all queued metric updates have been applied."""
+    if _metrics_queue is not None:
+        await _metrics_queue.join()
+
+
 def record_http_request(method: str, path: str, status_code: int, duration: float) -> None:
     """Record HTTP request metrics.
 
@@ -112,19 +255,15 @@ def record_http_request(method: str, path: str, status_code: int, duration: floa
         status_code: HTTP status code
         duration: Request duration in seconds
     """
+    _submit(_apply_http_request, method, path, status_code, duration)
+
+
+def _apply_http_request(method: str, path: str, status_code: int, duration: float) -> None:
     # Normalize path to avoid high cardinality
     normalized_path = _normalize_path(path)
 
-    HTTP_REQUESTS_TOTAL.labels(
-        method=method,
-        path=normalized_path,
-        status_code=str(status_code),
-    ).inc()
-
-    HTTP_REQUEST_DURATION_SECONDS.labels(
-        method=method,
-        path=normalized_path,
-    ).observe(duration)
+    _http_requests_child(method, normalized_path, status_code).inc()
+    _http_duration_child(method, normalized_path).observe(duration)
 
 
 def record_llm_request(
@@ -145,43 +284,41 @@ def record_llm_request(
         prompt_tokens: Number of prompt tokens
         completion_tokens: Number of completion tokens
     """
-    LLM_REQUESTS_TOTAL.labels(
-        provider=provider,
-        model=model,
-        status=status,
-    ).inc()
+    _submit(
+        _apply_llm_request, provider, model, status, duration, prompt_tokens, completion_tokens
+    )
+
 
-    LLM_REQUEST_DURATION_SECONDS.labels(
-        provider=provider,
-        model=model,
-    ).observe(duration)
+def _apply_llm_request(
+    provider: str,
+    model: str,
+    status: str,
+    duration: float,
+    prompt_tokens: int,
+    completion_tokens: int,
+) -> None:
+    _llm_requests_child(provider, model, status).inc()
+    _llm_duration_child(provider, model).observe(duration)
 
     if prompt_tokens > 0:
-        TOKENS_PROMPT_TOTAL.labels(model=model).inc(prompt_tokens)
+        _prompt_tokens_child(model).inc(prompt_tokens)
 
     if completion_tokens > 0:
-        TOKENS_COMPLETION_TOTAL.labels(model=model).inc(completion_tokens)
+        _completion_tokens_child(model).inc(completion_tokens)
 
 
-def record_token_usage(user_id: int, model: str, tokens: int) -> None:
+def record_token_usage(model: str, tokens: int) -> None:
     """Record token usage.
 
     Args:
-        user_id: User ID
         model: Model name
         tokens: Number of tokens used
     """
-    TOKENS_USED_TOTAL.labels(user_id=str(user_id), model=model).inc(tokens)
-
+    _submit(_apply_token_usage, model, tokens)
 
-def record_token_balance(user_id: int, balance: int) -> None:
-    """Record current token balance.
 
-    Args:
-        user_id: User ID
-        balance: Current balance
-    """
-    TOKEN_BALANCE.labels(user_id=str(user_id)).set(balance)
+def _apply_token_usage(model: str, tokens: int) -> None:
+    _tokens_used_child(model).inc(tokens)
 
 
 def record_dialog_created() -> None:
@@ -205,14 +342,20 @@ def record_error(error_type: str, path: str) -> None:
         error_type: Error type/code
         path: Request path
     """
+    _submit(_apply_error, error_type, path)
+
+
+def _apply_error(error_type: str, path: str) -> None:
     normalized_path = _normalize_path(path)
-    ERRORS_TOTAL.labels(error_type=error_type, path=normalized_path).inc()
+    _errors_child(error_type, normalized_path).inc()
 
 
+@lru_cache(maxsize=4096)
 def _normalize_path(path: str) -> str:
     """Normalize path to reduce cardinality.
 
-    Replaces UUIDs and numeric IDs with placeholders.
+    Replaces UUIDs and numeric IDs with placeholders. Results are memoized,
+    so repeat paths skip the regex passes.
 
     Args:
         path: Original path
@@ -220,17 +363,10 @@ def _normalize_path(path: str) -> str:
     Returns:
         Normalized path
     """
-    import re
-
     # Replace UUIDs
-    path = re.sub(
-        r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
-        "{id}",
-        path,
-        flags=re.IGNORECASE,
-    )
+    path = _UUID_RE.sub("{id}", path)
 
     # Replace numeric IDs
-    path = re.sub(r"/\d+(/|$)", r"/{id}\1", path)
+    path = _NUM_RE.sub(r"/{id}\1", path)
 
     return path
@@ -1,11 +1,43 @@
 """Pydantic schemas for DTOs."""
 
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
+from src.config.settings import settings
+
+# Bound once at import; settings are not reloaded at runtime
+_MAX_CONTENT_LENGTH = settings.max_content_length
+
+
+# Agent Config Schemas
+
+
+class AgentConfig(BaseModel):
+    """Schema for agent configuration.
+
+    Configurable parameters for LLM behavior.
+    """
+
+    temperature: float | None = Field(
+        None, ge=0.0, le=1.0, description="Sampling temperature (0-1)"
+    )
+    max_tokens: int | None = Field(None, gt=0, description="Maximum tokens to generate")
+    top_p: float | None = Field(None, ge=0.0, le=1.0, description="Top-p sampling (0-1)")
+    presence_penalty: float | None = Field(
+        None, ge=-2.0, le=2.0, description="Presence penalty (-2 to 2)"
+    )
+    frequency_penalty: float | None = Field(
+        None, ge=-2.0, le=2.0, description="Frequency penalty (-2 to 2)"
+    )
+    stop_sequences: list[str] | None = Field(None, description="Stop sequences")
+
+
+# Dialog Schemas
+
 
 class DialogCreate(BaseModel):
     """Schema for creating a dialog."""
@@ -13,7 +45,7 @@ class DialogCreate(BaseModel):
     title: str | None = Field(None, max_length=255)
     system_prompt: str | None = None
     model_name: str | None = None
-    agent_config: dict[str, Any] | None = None
+    agent_config: AgentConfig | None = None
 
 
 class DialogResponse(BaseModel):
@@ -30,6 +62,25 @@ class DialogResponse(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @classmethod
+    def from_orm_fast(cls, obj: Any) -> "DialogResponse":
+        """Build from a repository row without re-validation.
+
+        Rows come from our own database and are already well-typed, so the
+        pydantic validation pass is skipped. API input still goes through
+        model_validate.
+        """
+        return cls.model_construct(
+            id=obj.id,
+            user_id=obj.user_id,
+            title=obj.title,
+            system_prompt=obj.system_prompt,
+            model_name=obj.model_name,
+            agent_config=obj.agent_config,
+            created_at=obj.created_at,
+            updated_at=obj.updated_at,
+        )
+
 
 class DialogList(BaseModel):
     """Schema for paginated dialog list."""
@@ -54,6 +105,16 @@ class TokenBalanceResponse(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @classmethod
+    def from_orm_fast(cls, obj: Any) -> "TokenBalanceResponse":
+        """Build from a repository row without re-validation."""
+        return cls.model_construct(
+            user_id=obj.user_id,
+            balance=obj.balance,
+            limit=obj.limit,
+            updated_at=obj.updated_at,
+        )
+
 
 class TokenStatsResponse(BaseModel):
     """Schema for token stats response (GET /users/me/tokens)."""
@@ -91,6 +152,20 @@ class TokenTransactionResponse(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @classmethod
+    def from_orm_fast(cls, obj: Any) -> "TokenTransactionResponse":
+        """Build from a repository row without re-validation."""
+        return cls.model_construct(
+            id=obj.id,
+            user_id=obj.user_id,
+            amount=obj.amount,
+            reason=obj.reason,
+            dialog_id=obj.dialog_id,
+            message_id=obj.message_id,
+            admin_user_id=obj.admin_user_id,
+            created_at=obj.created_at,
+        )
+
 
 class TokenEvent(BaseModel):
     """Schema for token events emitted by the service."""
@@ -104,6 +179,8 @@ class TokenEvent(BaseModel):
     message_id: UUID | None = None
     timestamp: datetime
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
 
 # Model Schemas
 
@@ -132,29 +209,6 @@ class CostEstimate(BaseModel):
     total_cost: float
 
 
-# Agent Config Schemas
-
-
-class AgentConfig(BaseModel):
-    """Schema for agent configuration.
-
-    Configurable parameters for LLM behavior.
-    """
-
-    temperature: float | None = Field(
-        None, ge=0.0, le=1.0, description="Sampling temperature (0-1)"
-    )
-    max_tokens: int | None = Field(None, gt=0, description="Maximum tokens to generate")
-    top_p: float | None = Field(None, ge=0.0, le=1.0, description="Top-p sampling (0-1)")
-    presence_penalty: float | None = Field(
-        None, ge=-2.0, le=2.0, description="Presence penalty (-2 to 2)"
-    )
-    frequency_penalty: float | None = Field(
-        None, ge=-2.0, le=2.0, description="Frequency penalty (-2 to 2)"
-    )
-    stop_sequences: list[str] | None = Field(None, description="Stop sequences")
-
-
 class AgentTypeInfo(BaseModel):
     """Schema for agent type information."""
 
@@ -175,11 +229,9 @@ class MessageCreate(BaseModel):
     @classmethod
     def validate_content_length(cls, v: str) -> str:
         """Validate content doesn't exceed max length from settings."""
-        from src.config.settings import settings
-
-        if len(v) > settings.max_content_length:
+        if len(v) > _MAX_CONTENT_LENGTH:
             raise ValueError(
-                f"Content exceeds maximum length of {settings.max_content_length} characters"
+                f"Content exceeds maximum length of {_MAX_CONTENT_LENGTH} characters"
             )
         return v
 
@@ -197,9 +249,27 @@ class MessageResponse(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
-
-class StreamChunk(BaseModel):
-    """Schema for streaming response chunk."""
+    @classmethod
+    def from_orm_fast(cls, obj: Any) -> "MessageResponse":
+        """Build from a repository row without re-validation."""
+        return cls.model_construct(
+            id=obj.id,
+            dialog_id=obj.dialog_id,
+            role=obj.role,
+            content=obj.content,
+            prompt_tokens=obj.prompt_tokens,
+            completion_tokens=obj.completion_tokens,
+            created_at=obj.created_at,
+        )
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class StreamChunk:
+    """Streaming response chunk.
+
+    Internal value object allocated per provider chunk, so it is a slotted
+    dataclass rather than a validated Pydantic model.
+    """
 
     content: str
     done: bool = False
@@ -211,7 +281,8 @@ class StreamChunk(BaseModel):
 # Message Events
 
 
-class MessageSentEvent(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class MessageSentEvent:
     """Event emitted when a user message is sent."""
 
     event_type: str = "message_sent"
@@ -222,7 +293,8 @@ class MessageSentEvent(BaseModel):
     timestamp: datetime
 
 
-class LLMResponseEvent(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class LLMResponseEvent:
     """Event emitted when LLM response is received."""
 
     event_type: str = "llm_response_received"
@@ -272,6 +344,19 @@ class TopUpTokensRequest(BaseModel):
     amount: int = Field(..., description="Amount of tokens (positive = add, negative = deduct)")
 
 
+class TokenAdjustDetails(BaseModel):
+    """Details of a top_up/deduct admin action."""
+
+    amount: int
+    new_balance: int
+
+
+class SetLimitDetails(BaseModel):
+    """Details of a set_limit admin action."""
+
+    limit: int | None
+
+
 class AdminActionEvent(BaseModel):
     """Event emitted for admin actions."""
 
@@ -279,7 +364,7 @@ class AdminActionEvent(BaseModel):
     admin_user_id: int
     target_user_id: int
     action: str
-    details: dict[str, Any]
+    details: TokenAdjustDetails | SetLimitDetails
     timestamp: datetime
 
 
@@ -337,7 +422,12 @@ class ExportResponse(BaseModel):
 
 
 class DialogImport(BaseModel):
-    """Schema for importing a dialog."""
+    """Schema for importing a dialog.
+
+    agent_config mirrors DialogExport and is taken as the exported dict:
+    configs stored before AgentConfig was enforced may carry extra keys or
+    out-of-range values, and must survive an export/import round trip.
+    """
 
     title: str | None = None
     system_prompt: str | None = None
@@ -377,3 +467,18 @@ class AuditLogResponse(BaseModel):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+    @classmethod
+    def from_orm_fast(cls, obj: Any) -> "AuditLogResponse":
+        """Build from a repository row without re-validation."""
+        return cls.model_construct(
+            id=obj.id,
+            user_id=obj.user_id,
+            action=obj.action,
+            resource_type=obj.resource_type,
+            resource_id=obj.resource_id,
+            details=obj.details,
+            ip_address=obj.ip_address,
+            user_agent=obj.user_agent,
+            created_at=obj.created_at,
+        )
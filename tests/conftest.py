@@ -3,20 +3,40 @@
 Test isolation strategy:
 - Uses testcontainers PostgreSQL when USE_TESTCONTAINERS=true (for CI/CD)
 - Falls back to existing database with test_ prefixed tables (for local dev)
-- Each test gets a clean session with truncated tables
+- Tables are created and truncated once per run; each test's session is
+  rolled back on teardown
 - NEVER touches production tables or tables starting with api_
 """
+import asyncio
+import itertools
 import os
 import time
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Iterator
 
+import orjson
 import pytest
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import NullPool
 
 from tests.test_models import TestBase
 
 
+@pytest.fixture(scope="session")
+def event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
+    """Run async tests on uvloop when it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
+
+
 @pytest.fixture(autouse=True)
 async def reset_redis_client():
     """Reset Redis client before each test to avoid event loop issues.
@@ -39,14 +59,12 @@ async def reset_redis_client():
         cache_module._redis_client = None
 
 # Counter for generating unique user IDs across all tests
-_user_id_counter = int(time.time() * 1000) % 1_000_000_000
+_user_id_counter = itertools.count(int(time.time() * 1000) % 1_000_000_000 + 1)
 
 
 def get_unique_user_id() -> int:
     """Generate a unique user ID for each test."""
-    global _user_id_counter
-    _user_id_counter += 1
-    return _user_id_counter
+    return next(_user_id_counter)
 
 
 @pytest.fixture(scope="function")
@@ -111,6 +129,7 @@ def database_url():
 # Production tables to truncate for test isolation
 # Note: "models" is not truncated - it's seeded by migrations with LLM model data
 PRODUCTION_TABLES = [
+    "token_reservations",
     "token_transactions",
     "messages",
     "dialogs",
@@ -118,78 +137,72 @@ PRODUCTION_TABLES = [
 ]
 
 
-@pytest.fixture(scope="function")
-async def session() -> AsyncGenerator[AsyncSession, None]:
-    """Create a fresh database session for each test.
+async def _create_schema(engine: AsyncEngine) -> None:
+    """Create test and production tables, then clear rows left by earlier runs."""
+    from src.data.models import Base as ProductionBase
+
+    async with engine.begin() as conn:
+        await conn.run_sync(TestBase.metadata.create_all)
+        await conn.run_sync(ProductionBase.metadata.create_all)
+        await conn.execute(
+            text(f"TRUNCATE TABLE {', '.join(TEST_TABLES + PRODUCTION_TABLES)} CASCADE")
+        )
+
 
-    - Creates test tables AND production tables if they don't exist
-    - Production tables are needed because services use production models
-    - Truncates relevant tables before each test for isolation
+@pytest.fixture(scope="session")
+def engine() -> Iterator[AsyncEngine]:
+    """Create the test engine and schema once per test run.
+
+    Uses NullPool: every test runs on its own event loop and asyncpg
+    connections can't be reused across loops, so nothing is kept pooled.
+    For the same reason asyncpg's statement caches are turned off.
     """
     # Use settings database for now (testcontainers requires Docker)
     from src.config.settings import settings
-    from src.data.models import Base as ProductionBase
+    from src.data.database import json_dumps
 
     engine = create_async_engine(
         settings.database_url,
         echo=False,
-        pool_pre_ping=True,
-        pool_size=5,
-        max_overflow=10,
+        poolclass=NullPool,
+        # Connections live for one test, so statement caches never pay off
+        connect_args={"statement_cache_size": 0, "prepared_statement_cache_size": 0},
+        json_serializer=json_dumps,
+        json_deserializer=orjson.loads,
     )
+    asyncio.run(_create_schema(engine))
 
-    # Create both test tables and production tables
-    # Production tables are needed because services import from src.data.models
-    async with engine.begin() as conn:
-        await conn.run_sync(TestBase.metadata.create_all)
-        await conn.run_sync(ProductionBase.metadata.create_all)
-
-    async_session = async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autoflush=False,
-    )
+    yield engine
 
-    # Tables to truncate (both test and production)
-    tables_to_truncate = TEST_TABLES + PRODUCTION_TABLES
+    asyncio.run(engine.dispose())
 
-    async with async_session() as sess:
-        # Truncate tables before each test (in reverse order due to FK constraints)
-        for table in tables_to_truncate:
-            try:
-                await sess.execute(text(f"TRUNCATE TABLE {table} CASCADE"))
-            except Exception:
-                pass  # Table might not exist yet
-        await sess.commit()
 
-        yield sess
+@pytest.fixture(scope="function")
+async def session(engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
+    """Create a database session for each test, rolled back on teardown.
 
-    await engine.dispose()
+    - The session is joined to an outer transaction on its own connection
+    - session.commit() inside the test only releases a SAVEPOINT
+    - Rolling back the outer transaction discards everything the test wrote
+    """
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        async with AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            autoflush=False,
+            join_transaction_mode="create_savepoint",
+        ) as sess:
+            yield sess
+        await trans.rollback()
 
 
 @pytest.fixture(scope="function")
-async def session_no_truncate() -> AsyncGenerator[AsyncSession, None]:
-    """Create a database session without truncating tables.
+async def session_no_truncate(engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
+    """Create a database session whose commits are persisted.
 
     Use this for tests that need data to persist across multiple operations.
     """
-    from src.config.settings import settings
-    from src.data.models import Base as ProductionBase
-
-    engine = create_async_engine(
-        settings.database_url,
-        echo=False,
-        pool_pre_ping=True,
-        pool_size=5,
-        max_overflow=10,
-    )
-
-    # Create both test tables and production tables
-    async with engine.begin() as conn:
-        await conn.run_sync(TestBase.metadata.create_all)
-        await conn.run_sync(ProductionBase.metadata.create_all)
-
     async_session = async_sessionmaker(
         engine,
         class_=AsyncSession,
@@ -199,5 +212,3 @@ async def session_no_truncate() -> AsyncGenerator[AsyncSession, None]:
 
     async with async_session() as sess:
         yield sess
-
-    await engine.dispose()
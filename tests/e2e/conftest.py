@@ -6,22 +6,29 @@ Provides:
 - Test data factories (users, dialogs, models)
 - JWT token generation for auth testing
 """
+import asyncio
 import uuid
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Iterator, Mapping
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import jwt
 import pytest
+from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
+from jwt.types import Options
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from src.api.app import create_app
 from src.config.settings import settings
 from src.integrations.jwt_validator import JWTValidator, JWTClaims
-from tests.test_models import TestBase, TestDialog, TestMessage, TestTokenBalance, TestModel
+from src.shared.exceptions import UnauthorizedError, ValidationError
+from tests.test_models import TestDialog, TestMessage, TestTokenBalance, TestModel
 
 
 # Test tables to manage
@@ -32,43 +39,64 @@ TEST_TABLES = [
     "test_token_balances",
     "test_models",
 ]
+_TRUNCATE_TEST_TABLES = text(f"TRUNCATE TABLE {', '.join(TEST_TABLES)} CASCADE")
+
+# Decode settings for TestJWTValidator, built once
+_JWT_ALGS = ("HS256",)
+_JWT_OPTIONS: Options = {
+    "verify_exp": True,
+    "verify_iat": True,
+    "verify_nbf": True,
+    "require": ["exp", "iat"],
+}
+
+# Single issue time for test tokens so identical tokens are signed once
+_TOKEN_ISSUED_AT = datetime.now(timezone.utc)
+
+
+@lru_cache(maxsize=64)
+def _make_token(
+    user_id: int,
+    is_admin: bool = False,
+    exp_hours: int = 24,
+    iat_hours: int = 0,
+) -> str:
+    """Sign a test JWT; exp/iat are offsets in hours from _TOKEN_ISSUED_AT."""
+    payload = {
+        "sub": str(user_id),
+        "user_id": user_id,
+        "is_admin": is_admin,
+        "exp": _TOKEN_ISSUED_AT + timedelta(hours=exp_hours),
+        "iat": _TOKEN_ISSUED_AT + timedelta(hours=iat_hours),
+    }
+    return jwt.encode(payload, settings.django_secret_key, algorithm="HS256")
+
+
+def _create_user_token(
+    user_id: int,
+    is_admin: bool = False,
+    exp_hours: int = 24,
+) -> str:
+    """Create a JWT token for testing."""
+    return _make_token(user_id, is_admin, exp_hours)
+
+
+def _create_expired_token(user_id: int) -> str:
+    """Create an expired JWT token for testing."""
+    return _make_token(user_id, False, exp_hours=-1, iat_hours=-2)
+
+
+def _create_invalid_token() -> str:
+    """Create an invalid JWT token."""
+    return "invalid.jwt.token"
 
 
 class TestDataFactory:
     """Factory for creating test data."""
 
-    @staticmethod
-    def create_user_token(
-        user_id: int,
-        is_admin: bool = False,
-        exp_hours: int = 24,
-    ) -> str:
-        """Create a JWT token for testing."""
-        payload = {
-            "sub": str(user_id),
-            "user_id": user_id,
-            "is_admin": is_admin,
-            "exp": datetime.now(timezone.utc) + timedelta(hours=exp_hours),
-            "iat": datetime.now(timezone.utc),
-        }
-        return jwt.encode(payload, settings.django_secret_key, algorithm="HS256")
-
-    @staticmethod
-    def create_expired_token(user_id: int) -> str:
-        """Create an expired JWT token for testing."""
-        payload = {
-            "sub": str(user_id),
-            "user_id": user_id,
-            "is_admin": False,
-            "exp": datetime.now(timezone.utc) - timedelta(hours=1),
-            "iat": datetime.now(timezone.utc) - timedelta(hours=2),
-        }
-        return jwt.encode(payload, settings.django_secret_key, algorithm="HS256")
-
-    @staticmethod
-    def create_invalid_token() -> str:
-        """Create an invalid JWT token."""
-        return "invalid.jwt.token"
+    create_user_token = staticmethod(_create_user_token)
+    create_expired_token = staticmethod(_create_expired_token)
+    create_invalid_token = staticmethod(_create_invalid_token)
 
 
 class MockLLMProvider:
@@ -80,11 +108,24 @@ class MockLLMProvider:
         prompt_tokens: int = 50,
         completion_tokens: int = 100,
     ):
-        self.response = response
         self.prompt_tokens = prompt_tokens
         self.completion_tokens = completion_tokens
+        self.response = response
         self.call_count = 0
 
+    @property
+    def response(self) -> str:
+        """Mock response text."""
+        return self._response
+
+    @response.setter
+    def response(self, value: str) -> None:
+        # Stream chunks are split once per response, not once per stream
+        self._response = value
+        words = value.split()
+        self._stream_chunks = tuple((word + " ", False, None, None) for word in words[:-1])
+        self._final_word = words[-1] if words else None
+
     async def generate(
         self,
         messages: list[dict[str, str]],
@@ -103,16 +144,13 @@ class MockLLMProvider:
     ) -> AsyncGenerator[tuple[str, bool, int | None, int | None], None]:
         """Generate streaming mock response."""
         self.call_count += 1
-        words = self.response.split()
-        for i, word in enumerate(words):
-            is_final = i == len(words) - 1
-            if is_final:
-                yield word, True, self.prompt_tokens, self.completion_tokens
-            else:
-                yield word + " ", False, None, None
+        for chunk in self._stream_chunks:
+            yield chunk
+        if self._final_word is not None:
+            yield self._final_word, True, self.prompt_tokens, self.completion_tokens
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def test_data_factory():
     """Provide test data factory."""
     return TestDataFactory()
@@ -124,72 +162,71 @@ def mock_llm():
     return MockLLMProvider()
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def regular_user_id():
     """Regular test user ID."""
     return 100001
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def admin_user_id():
     """Admin test user ID."""
     return 999999
 
 
-@pytest.fixture(scope="function")
-def regular_user_token(regular_user_id: int, test_data_factory: TestDataFactory):
+@pytest.fixture(scope="session")
+def regular_user_token(regular_user_id: int):
     """JWT token for regular user."""
-    return test_data_factory.create_user_token(regular_user_id, is_admin=False)
+    return _create_user_token(regular_user_id, is_admin=False)
 
 
-@pytest.fixture(scope="function")
-def admin_user_token(admin_user_id: int, test_data_factory: TestDataFactory):
+@pytest.fixture(scope="session")
+def admin_user_token(admin_user_id: int):
     """JWT token for admin user."""
-    return test_data_factory.create_user_token(admin_user_id, is_admin=True)
+    return _create_user_token(admin_user_id, is_admin=True)
 
 
-@pytest.fixture(scope="function")
-def expired_token(regular_user_id: int, test_data_factory: TestDataFactory):
+@pytest.fixture(scope="session")
+def expired_token(regular_user_id: int):
     """Expired JWT token."""
-    return test_data_factory.create_expired_token(regular_user_id)
+    return _create_expired_token(regular_user_id)
 
 
-@pytest.fixture(scope="function")
-def invalid_token(test_data_factory: TestDataFactory):
+@pytest.fixture(scope="session")
+def invalid_token():
     """Invalid JWT token."""
-    return test_data_factory.create_invalid_token()
+    return _create_invalid_token()
 
 
 @pytest.fixture(scope="function")
-async def test_session() -> AsyncGenerator[AsyncSession, None]:
-    """Create test database session."""
-    engine = create_async_engine(
-        settings.database_url,
-        echo=False,
-        pool_pre_ping=True,
-    )
-
-    # Create test tables
-    async with engine.begin() as conn:
-        await conn.run_sync(TestBase.metadata.create_all)
+async def test_session(engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
+    """Create test database session.
 
+    Uses the session-scoped engine from tests/conftest.py, which has already
+    created the test tables.
+    """
     async_session = async_sessionmaker(
         engine, class_=AsyncSession, expire_on_commit=False
     )
 
     async with async_session() as session:
-        # Truncate test tables
-        for table in TEST_TABLES:
-            try:
-                await session.execute(text(f"TRUNCATE TABLE {table} CASCADE"))
-            except Exception:
-                pass
+        # Truncate test tables in one statement
+        try:
+            await session.execute(_TRUNCATE_TEST_TABLES)
+        except Exception:
+            # Fall back to one table at a time so a missing table doesn't
+            # stop the rest from being cleared
+            await session.rollback()
+            for table in TEST_TABLES:
+                try:
+                    await session.execute(text(f"TRUNCATE TABLE {table} CASCADE"))
+                    await session.commit()
+                except Exception:
+                    await session.rollback()
         await session.commit()
 
         yield session
 
-    await engine.dispose()
-
 
 class MockModel:
     """Mock model for testing."""
@@ -215,6 +252,9 @@ class MockModelRegistry:
             "claude-3-opus-20240229": MockModel("claude-3-opus-20240229", "anthropic"),
         }
         self._loaded = True
+        # Built once; validate_model runs on every chat request
+        self._name_set = frozenset(self._models)
+        self._names_str = ", ".join(self._models)
 
     async def load_models(self, session) -> None:
         pass
@@ -232,12 +272,11 @@ class MockModelRegistry:
         return name in self._models
 
     def validate_model(self, name: str) -> None:
-        from src.shared.exceptions import ValidationError
-        if not self._models:
+        if name in self._name_set:
+            return
+        if not self._name_set:
             raise ValidationError("No models available in registry")
-        if name not in self._models:
-            model_names = ", ".join(self._models.keys())
-            raise ValidationError(f"Invalid model_name '{name}'. Available models: {model_names}")
+        raise ValidationError(f"Invalid model_name '{name}'. Available models: {self._names_str}")
 
 
 class TestJWTValidator:
@@ -245,29 +284,21 @@ class TestJWTValidator:
 
     def __init__(self, *args, **kwargs):
         """Initialize with django_secret_key regardless of args."""
-        self._secret = settings.django_secret_key
+        # Encoded once so PyJWT doesn't re-encode the key on every decode
+        self._secret = settings.django_secret_key.encode()
         self._algorithm = "HS256"
 
     def validate(self, token: str) -> JWTClaims:
         """Validate JWT token and extract claims."""
-        import jwt as pyjwt
-        from src.shared.exceptions import UnauthorizedError
-
         # Clean token (remove "Bearer " prefix if present)
-        if token.startswith("Bearer "):
-            token = token[7:]
+        token = token.removeprefix("Bearer ")
 
         try:
-            claims = pyjwt.decode(
+            claims = jwt.decode(
                 token,
                 self._secret,
-                algorithms=["HS256"],
-                options={
-                    "verify_exp": True,
-                    "verify_iat": True,
-                    "verify_nbf": True,
-                    "require": ["exp", "iat"],
-                },
+                algorithms=_JWT_ALGS,
+                options=_JWT_OPTIONS,
             )
 
             # Extract user_id
@@ -287,17 +318,21 @@ class TestJWTValidator:
                 nbf=claims.get("nbf"),
                 raw_claims=claims,
             )
-        except pyjwt.ExpiredSignatureError:
+        except jwt.ExpiredSignatureError:
             raise UnauthorizedError("Token has expired")
-        except pyjwt.InvalidTokenError as e:
+        except jwt.InvalidTokenError as e:
             raise UnauthorizedError(f"Invalid token: {e}")
         except Exception as e:
             raise UnauthorizedError(f"Token validation failed: {e}")
 
 
-@pytest.fixture(scope="function")
-async def client(mock_llm: MockLLMProvider) -> AsyncGenerator[AsyncClient, None]:
-    """Create async test client with mocked dependencies."""
+@contextmanager
+def _patched_app() -> Iterator[tuple[FastAPI, MagicMock]]:
+    """Create the app with mocked dependencies.
+
+    Yields the app and the patched LLM provider factory, so callers can
+    choose which mock provider it returns.
+    """
     # Create mock registry instance
     mock_registry = MockModelRegistry()
 
@@ -306,21 +341,48 @@ async def client(mock_llm: MockLLMProvider) -> AsyncGenerator[AsyncClient, None]
          patch("src.integrations.llm_factory.LLMProviderFactory.get_provider") as mock_factory, \
          patch("src.api.dependencies.model_registry", mock_registry), \
          patch("src.domain.model_registry.model_registry", mock_registry):
-        mock_factory.return_value = mock_llm
+        yield create_app(), mock_factory
+
+
+@pytest.fixture(scope="package")
+def _shared_client() -> Iterator[tuple[AsyncClient, MagicMock]]:
+    """Build one patched app and client for all e2e tests.
+
+    Package-scoped so the patches are undone before other test packages run.
+    """
+    with _patched_app() as (app, mock_factory):
+        client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+        yield client, mock_factory
+        asyncio.run(client.aclose())
 
-        app = create_app()
+
+@pytest.fixture(scope="function")
+def client(
+    _shared_client: tuple[AsyncClient, MagicMock], mock_llm: MockLLMProvider
+) -> AsyncClient:
+    """Shared async test client, wired to this test's mock LLM provider."""
+    client, mock_factory = _shared_client
+    mock_factory.return_value = mock_llm
+    return client
+
+
+@pytest.fixture(scope="function")
+async def fresh_client(mock_llm: MockLLMProvider) -> AsyncGenerator[AsyncClient, None]:
+    """Async test client on a newly created app, for tests that change app state."""
+    with _patched_app() as (app, mock_factory):
+        mock_factory.return_value = mock_llm
         transport = ASGITransport(app=app)
         async with AsyncClient(transport=transport, base_url="http://test") as client:
             yield client
 
 
-@pytest.fixture(scope="function")
-def auth_headers(regular_user_token: str) -> dict[str, str]:
-    """Authorization headers for regular user."""
-    return {"Authorization": f"Bearer {regular_user_token}"}
+@pytest.fixture(scope="session")
+def auth_headers(regular_user_token: str) -> Mapping[str, str]:
+    """Authorization headers for regular user (read-only, shared)."""
+    return MappingProxyType({"Authorization": f"Bearer {regular_user_token}"})
 
 
-@pytest.fixture(scope="function")
-def admin_headers(admin_user_token: str) -> dict[str, str]:
-    """Authorization headers for admin user."""
-    return {"Authorization": f"Bearer {admin_user_token}"}
+@pytest.fixture(scope="session")
+def admin_headers(admin_user_token: str) -> Mapping[str, str]:
+    """Authorization headers for admin user (read-only, shared)."""
+    return MappingProxyType({"Authorization": f"Bearer {admin_user_token}"})
@@ -9,6 +9,7 @@ Tests:
 - GET /api/v1/admin/users/{id}/tokens/history - Get transaction history
 - Auth scenarios: no auth (401), non-admin (403), admin (200)
 """
+import asyncio
 from datetime import date, timedelta
 
 import pytest
@@ -17,173 +18,72 @@ from httpx import AsyncClient
 # API prefix for all endpoints
 API_PREFIX = "/api/v1"
 
+_TODAY = date.today()
+_YESTERDAY = _TODAY - timedelta(days=1)
+_STATS_PARAMS = {"start_date": str(_YESTERDAY), "end_date": str(_TODAY)}
 
-class TestAdminStatsAuth:
-    """Tests for GET /admin/stats authentication/authorization."""
+# (method, path, query params, JSON body) for every admin endpoint
+ADMIN_ENDPOINTS = [
+    pytest.param("GET", "/admin/stats", _STATS_PARAMS, None, id="stats"),
+    pytest.param("GET", "/admin/users", None, None, id="list_users"),
+    pytest.param("GET", "/admin/users/12345", None, None, id="user_details"),
+    pytest.param(
+        "PATCH", "/admin/users/12345/limits", None, {"limit": 10000}, id="set_limit"
+    ),
+    pytest.param("POST", "/admin/users/12345/tokens", None, {"amount": 1000}, id="top_up"),
+    pytest.param(
+        "GET", "/admin/users/12345/tokens/history", None, None, id="token_history"
+    ),
+]
+
+
+class TestAdminEndpointsAuth:
+    """Tests for admin endpoint authentication/authorization."""
 
     @pytest.mark.asyncio
-    async def test_get_stats_no_auth(self, client: AsyncClient):
-        """Test getting stats without auth fails with 401."""
-        today = date.today()
-        yesterday = today - timedelta(days=1)
-        response = await client.get(
-            f"{API_PREFIX}/admin/stats",
-            params={"start_date": str(yesterday), "end_date": str(today)},
+    async def test_all_admin_endpoints_require_auth(self, client: AsyncClient):
+        """Test calling any admin endpoint without auth fails with 401."""
+        endpoints = [case.values for case in ADMIN_ENDPOINTS]
+        responses = await asyncio.gather(
+            *(
+                client.request(method, f"{API_PREFIX}{path}", params=params, json=body)
+                for method, path, params, body in endpoints
+            )
         )
 
-        assert response.status_code == 401
+        failed = [
+            (method, path, response.status_code)
+            for (method, path, _, _), response in zip(endpoints, responses)
+            if response.status_code != 401
+        ]
+        assert not failed
 
     @pytest.mark.asyncio
-    async def test_get_stats_non_admin(
-        self, client: AsyncClient, auth_headers: dict[str, str]
+    @pytest.mark.parametrize(("method", "path", "params", "body"), ADMIN_ENDPOINTS)
+    async def test_admin_endpoint_non_admin(
+        self, client: AsyncClient, auth_headers: dict[str, str], method, path, params, body
     ):
-        """Test getting stats as non-admin fails with 403."""
-        today = date.today()
-        yesterday = today - timedelta(days=1)
-        response = await client.get(
-            f"{API_PREFIX}/admin/stats",
-            params={"start_date": str(yesterday), "end_date": str(today)},
-            headers=auth_headers,
+        """Test calling an admin endpoint as non-admin fails with 403."""
+        response = await client.request(
+            method, f"{API_PREFIX}{path}", params=params, json=body, headers=auth_headers
         )
 
         assert response.status_code == 403
 
+
+class TestAdminStatsAuth:
+    """Tests for GET /admin/stats as admin."""
+
     @pytest.mark.asyncio
     async def test_get_stats_admin(
         self, client: AsyncClient, admin_headers: dict[str, str]
     ):
         """Test getting stats as admin succeeds."""
-        today = date.today()
-        yesterday = today - timedelta(days=1)
         response = await client.get(
             f"{API_PREFIX}/admin/stats",
-            params={"start_date": str(yesterday), "end_date": str(today)},
+            params=_STATS_PARAMS,
             headers=admin_headers,
         )
 
         # May be 200 or 500 depending on database state
         assert response.status_code in [200, 500]
-
-
-class TestAdminUsersAuth:
-    """Tests for GET /admin/users authentication/authorization."""
-
-    @pytest.mark.asyncio
-    async def test_list_users_no_auth(self, client: AsyncClient):
-        """Test listing users without auth fails with 401."""
-        response = await client.get(f"{API_PREFIX}/admin/users")
-
-        assert response.status_code == 401
-
-    @pytest.mark.asyncio
-    async def test_list_users_non_admin(
-        self, client: AsyncClient, auth_headers: dict[str, str]
-    ):
-        """Test listing users as non-admin fails with 403."""
-        response = await client.get(
-            f"{API_PREFIX}/admin/users",
-            headers=auth_headers,
-        )
-
-        assert response.status_code == 403
-
-class TestAdminUserDetailsAuth:
-    """Tests for GET /admin/users/{id} authentication/authorization."""
-
-    @pytest.mark.asyncio
-    async def test_get_user_no_auth(self, client: AsyncClient):
-        """Test getting user details without auth fails with 401."""
-        response = await client.get(f"{API_PREFIX}/admin/users/12345")
-
-        assert response.status_code == 401
-
-    @pytest.mark.asyncio
-    async def test_get_user_non_admin(
-        self, client: AsyncClient, auth_headers: dict[str, str]
-    ):
-        """Test getting user details as non-admin fails with 403."""
-        response = await client.get(
-            f"{API_PREFIX}/admin/users/12345",
-            headers=auth_headers,
-        )
-
-        assert response.status_code == 403
-
-
-class TestAdminSetLimitAuth:
-    """Tests for PATCH /admin/users/{id}/limits authentication/authorization."""
-
-    @pytest.mark.asyncio
-    async def test_set_limit_no_auth(self, client: AsyncClient):
-        """Test setting limit without auth fails with 401."""
-        response = await client.patch(
-            f"{API_PREFIX}/admin/users/12345/limits",
-            json={"limit": 10000},
-        )
-
-        assert response.status_code == 401
-
-    @pytest.mark.asyncio
-    async def test_set_limit_non_admin(
-        self, client: AsyncClient, auth_headers: dict[str, str]
-    ):
-        """Test setting limit as non-admin fails with 403."""
-        response = await client.patch(
-            f"{API_PREFIX}/admin/users/12345/limits",
-            json={"limit": 10000},
-            headers=auth_headers,
-        )
-
-        assert response.status_code == 403
-
-
-class TestAdminTopUpAuth:
-    """Tests for POST /admin/users/{id}/tokens authentication/authorization."""
-
-    @pytest.mark.asyncio
-    async def test_top_up_no_auth(self, client: AsyncClient):
-        """Test top-up without auth fails with 401."""
-        response = await client.post(
-            f"{API_PREFIX}/admin/users/12345/tokens",
-            json={"amount": 1000},
-        )
-
-        assert response.status_code == 401
-
-    @pytest.mark.asyncio
-    async def test_top_up_non_admin(
-        self, client: AsyncClient, auth_headers: dict[str, str]
-    ):
-        """Test top-up as non-admin fails with 403."""
-        response = await client.post(
-            f"{API_PREFIX}/admin/users/12345/tokens",
-            json={"amount": 1000},
-            headers=auth_headers,
-        )
-
-        assert response.status_code == 403
-
-
-class TestAdminTokenHistoryAuth:
-    """Tests for GET /admin/users/{id}/tokens/history authentication/authorization."""
-
-    @pytest.mark.asyncio
-    async def test_get_history_no_auth(self, client: AsyncClient):
-        """Test getting history without auth fails with 401."""
-        response = await client.get(
-            f"{API_PREFIX}/admin/users/12345/tokens/history"
-        )
-
-        assert response.status_code == 401
-
-    @pytest.mark.asyncio
-    async def test_get_history_non_admin(
-        self, client: AsyncClient, auth_headers: dict[str, str]
-    ):
-        """Test getting history as non-admin fails with 403."""
-        response = await client.get(
-            f"{API_PREFIX}/admin/users/12345/tokens/history",
-            headers=auth_headers,
-        )
-
-        assert response.status_code == 403
@@ -8,12 +8,17 @@ Tests:
 - GET /api/v1/users/me/tokens - Get token balance
 - Auth scenarios: valid JWT, invalid JWT, expired JWT
 """
+import uuid
+
 import pytest
 from httpx import AsyncClient
 
 # API prefix for all endpoints
 API_PREFIX = "/api/v1"
 
+# Dialog id for requests that are rejected before any lookup
+_RANDOM_DIALOG_ID = uuid.uuid4()
+
 
 class TestDialogAuthScenarios:
     """Authentication tests for dialog endpoints."""
@@ -83,9 +88,7 @@ class TestDialogGetAuth:
     @pytest.mark.asyncio
     async def test_get_dialog_no_auth(self, client: AsyncClient):
         """Test getting a dialog without auth fails with 401."""
-        import uuid
-
-        response = await client.get(f"{API_PREFIX}/dialogs/{uuid.uuid4()}")
+        response = await client.get(f"{API_PREFIX}/dialogs/{_RANDOM_DIALOG_ID}")
 
         assert response.status_code == 401
 
@@ -96,10 +99,8 @@ class TestMessageAuth:
     @pytest.mark.asyncio
     async def test_send_message_no_auth(self, client: AsyncClient):
         """Test sending a message without auth fails with 401."""
-        import uuid
-
         response = await client.post(
-            f"{API_PREFIX}/dialogs/{uuid.uuid4()}/messages",
+            f"{API_PREFIX}/dialogs/{_RANDOM_DIALOG_ID}/messages",
             json={"content": "Hello"},
         )
 
@@ -12,6 +12,7 @@ from collections.abc import AsyncGenerator
 from typing import Any
 
 import pytest
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.data.models import TokenBalance
@@ -20,15 +21,23 @@ from src.domain.message_service import MessageService
 from src.domain.model_registry import ModelRegistry
 from src.domain.token_service import TokenService
 from src.shared.schemas import DialogCreate, MessageCreate
+from tests.conftest import get_unique_user_id
 
 
 class MockLLMProvider:
     """Mock LLM provider for testing."""
 
-    def __init__(self, response: str = "Hello! I'm a mock assistant."):
+    DEFAULT_RESPONSE = "Hello! I'm a mock assistant."
+
+    def __init__(self, response: str = DEFAULT_RESPONSE):
         self.response = response
         self.calls: list[dict] = []
 
+    def reset(self) -> None:
+        """Restore the default response and forget recorded calls."""
+        self.response = self.DEFAULT_RESPONSE
+        self.calls.clear()
+
     async def generate(
         self,
         messages: list[dict[str, str]],
@@ -60,12 +69,18 @@ class MockLLMProvider:
         yield "", True, 50, 100
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_llm():
-    """Create mock LLM provider."""
+    """Create mock LLM provider, shared by the tests in this module."""
     return MockLLMProvider()
 
 
+@pytest.fixture(autouse=True)
+def _reset_mock_llm(mock_llm: MockLLMProvider):
+    """Give each test a clean mock LLM provider."""
+    mock_llm.reset()
+
+
 @pytest.fixture
 async def model_registry(session: AsyncSession):
     """Create and load model registry."""
@@ -74,9 +89,9 @@ async def model_registry(session: AsyncSession):
     return registry
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def token_service():
-    """Create token service."""
+    """Create token service, shared by the tests in this module."""
     return TokenService()
 
 
@@ -86,36 +101,26 @@ def dialog_service(model_registry: ModelRegistry):
     return DialogService(model_registry)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def message_service(token_service: TokenService, mock_llm: MockLLMProvider):
-    """Create message service with mock LLM."""
+    """Create message service with mock LLM, shared by the tests in this module."""
     return MessageService(token_service=token_service, llm_provider=mock_llm)
 
 
 async def setup_user_balance(session: AsyncSession, user_id: int, balance: int = 10000) -> TokenBalance:
-    """Helper to set up user balance for testing."""
-    from sqlalchemy import select
-
-    # Check if balance already exists
-    result = await session.execute(
-        select(TokenBalance).where(TokenBalance.user_id == user_id)
+    """Helper to set up user balance for testing.
+
+    Upserts the row in one statement; an existing balance keeps its limit.
+    """
+    stmt = insert(TokenBalance).values(user_id=user_id, balance=balance, limit=None)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TokenBalance.user_id],
+        set_={"balance": stmt.excluded.balance, "updated_at": stmt.excluded.updated_at},
+    ).returning(TokenBalance)
+    token_balance = await session.scalar(
+        stmt, execution_options={"populate_existing": True}
     )
-    existing = result.scalar_one_or_none()
-
-    if existing:
-        existing.balance = balance
-        await session.commit()
-        await session.refresh(existing)
-        return existing
-
-    token_balance = TokenBalance(
-        user_id=user_id,
-        balance=balance,
-        limit=None,
-    )
-    session.add(token_balance)
     await session.commit()
-    await session.refresh(token_balance)
     return token_balance
 
 
@@ -133,7 +138,7 @@ class TestCompleteDialogFlow:
     ):
         """Test creating a dialog and sending a message through it."""
         # Use unique user ID
-        user_id = 300000 + abs(hash(str(uuid.uuid4()))) % 10000
+        user_id = get_unique_user_id()
 
         # Set up user balance
         await setup_user_balance(session, user_id, balance=10000)
@@ -188,7 +193,7 @@ class TestCompleteDialogFlow:
         mock_llm: MockLLMProvider,
     ):
         """Test multi-turn conversation builds correct context."""
-        user_id = 300100 + abs(hash(str(uuid.uuid4()))) % 10000
+        user_id = get_unique_user_id()
         await setup_user_balance(session, user_id, balance=50000)
 
         # Create dialog
@@ -233,7 +238,7 @@ class TestCompleteDialogFlow:
         mock_llm: MockLLMProvider,
     ):
         """Test dialog with system prompt passes it to LLM."""
-        user_id = 300200 + abs(hash(str(uuid.uuid4()))) % 10000
+        user_id = get_unique_user_id()
         await setup_user_balance(session, user_id, balance=10000)
 
         # Create dialog with system prompt
@@ -262,7 +267,6 @@ class TestCompleteDialogFlow:
         print(f"\n✓ System prompt test passed for user {user_id}")
 
 
-@pytest.mark.skip(reason="Session persistence issue with TokenBalance - needs repository fix")
 class TestTokenDeduction:
     """Tests for token deduction during chat flow."""
 
@@ -275,7 +279,7 @@ class TestTokenDeduction:
         token_service: TokenService,
     ):
         """Test tokens are deducted after successful message."""
-        user_id = 300300 + abs(hash(str(uuid.uuid4()))) % 10000
+        user_id = get_unique_user_id()
         initial_balance = 10000
 
         await setup_user_balance(session, user_id, balance=initial_balance)
@@ -316,7 +320,7 @@ class TestMessageHistory:
         message_service: MessageService,
     ):
         """Test message history is returned in correct order."""
-        user_id = 300400 + abs(hash(str(uuid.uuid4()))) % 10000
+        user_id = get_unique_user_id()
         await setup_user_balance(session, user_id, balance=50000)
 
         # Create dialog
@@ -353,7 +357,7 @@ class TestMessageHistory:
         message_service: MessageService,
     ):
         """Test message history pagination."""
-        user_id = 300500 + abs(hash(str(uuid.uuid4()))) % 10000
+        user_id = get_unique_user_id()
         await setup_user_balance(session, user_id, balance=100000)
 
         # Create dialog
@@ -395,7 +399,7 @@ class TestErrorHandling:
         """Test InsufficientTokensError when balance is too low."""
         from src.shared.exceptions import InsufficientTokensError
 
-        user_id = 300600 + abs(hash(str(uuid.uuid4()))) % 10000
+        user_id = get_unique_user_id()
         await setup_user_balance(session, user_id, balance=10)  # Very low balance
 
         # Create dialog
@@ -420,7 +424,7 @@ class TestErrorHandling:
         """Test NotFoundError when dialog doesn't exist."""
         from src.shared.exceptions import NotFoundError
 
-        user_id = 300700 + abs(hash(str(uuid.uuid4()))) % 10000
+        user_id = get_unique_user_id()
         fake_dialog_id = uuid.uuid4()
 
         with pytest.raises(NotFoundError):
@@ -440,8 +444,8 @@ class TestErrorHandling:
         """Test ForbiddenError when accessing another user's dialog."""
         from src.shared.exceptions import ForbiddenError
 
-        owner_id = 300800 + abs(hash(str(uuid.uuid4()))) % 10000
-        other_user_id = owner_id + 1
+        owner_id = get_unique_user_id()
+        other_user_id = get_unique_user_id()
         await setup_user_balance(session, owner_id, balance=10000)
 
         # Create dialog as owner
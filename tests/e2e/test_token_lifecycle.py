@@ -51,9 +51,9 @@ class MockLLMProvider:
         yield "", True, self.prompt_tokens, self.completion_tokens
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def token_service():
-    """Create test token service that uses test tables."""
+    """Create test token service that uses test tables, shared by this module."""
     return TestTokenService()
 
 
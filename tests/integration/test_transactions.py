@@ -4,13 +4,18 @@ Tests atomic commit/rollback behavior for complex operations like:
 - Save messages + deduct tokens (should be atomic)
 - Rollback on failure
 - Concurrent operations
+- Token reservations (reserve / finalize / release) on the production tables
 """
+import asyncio
 import uuid
+from datetime import datetime, timedelta, timezone
 
 import pytest
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
+from src.data.models import Dialog, Message, TokenBalance, TokenReservation, TokenTransaction
+from src.data.repositories import TokenBalanceRepository
 from tests.conftest import get_unique_user_id
 from tests.test_models import (
     TestDialog,
@@ -353,3 +358,217 @@ class TestTransactionHistory:
         assert top_up.amount == 1000
         assert usage.amount == -100
         assert deduct.amount == -50
+
+
+async def _create_balance_and_dialog(
+    session: AsyncSession, user_id: int, balance: int
+) -> tuple[uuid.UUID, uuid.UUID]:
+    """Create a production balance row and a dialog with one assistant message."""
+    session.add(TokenBalance(user_id=user_id, balance=balance))
+    dialog = Dialog(id=uuid.uuid4(), user_id=user_id, title="Test", model_name="gpt-4")
+    session.add(dialog)
+    await session.flush()
+    message = Message(id=uuid.uuid4(), dialog_id=dialog.id, role="assistant", content="Hi")
+    session.add(message)
+    await session.flush()
+    return dialog.id, message.id
+
+
+async def _stored_balance(session: AsyncSession, user_id: int) -> int:
+    """Read the balance straight from the database, bypassing the identity map."""
+    return await session.scalar(select(TokenBalance.balance).where(TokenBalance.user_id == user_id))
+
+
+async def _reservation_count(session: AsyncSession, user_id: int) -> int:
+    result = await session.execute(
+        select(TokenReservation.id).where(TokenReservation.user_id == user_id)
+    )
+    return len(result.all())
+
+
+class TestTokenReservations:
+    """Tests for the reservation statements of TokenBalanceRepository on Postgres."""
+
+    @pytest.fixture
+    def balance_repo(self):
+        return TokenBalanceRepository()
+
+    @pytest.mark.asyncio
+    async def test_reserve_and_finalize_charges_usage(
+        self, session: AsyncSession, balance_repo: TokenBalanceRepository
+    ):
+        """Test finalizing refunds the hold, charges the usage and records it."""
+        user_id = get_unique_user_id()
+        dialog_id, message_id = await _create_balance_and_dialog(session, user_id, 1000)
+
+        reservation_id = await balance_repo.reserve(session, user_id, 300, dialog_id)
+        await session.commit()
+        assert reservation_id is not None
+        assert await _stored_balance(session, user_id) == 700
+
+        result = await balance_repo.finalize_reservation(
+            session, reservation_id, user_id, 200, dialog_id, message_id
+        )
+        await session.commit()
+
+        assert isinstance(result, tuple)
+        balance, transaction = result
+        assert balance.balance == 800  # 1000 - 200
+        assert transaction.amount == -200
+        assert await _stored_balance(session, user_id) == 800
+        assert await _reservation_count(session, user_id) == 0
+        stored = await session.get(TokenTransaction, transaction.id)
+        assert stored is not None
+        assert (stored.amount, stored.reason, stored.message_id) == (-200, "llm_usage", message_id)
+
+    @pytest.mark.asyncio
+    async def test_reserve_insufficient_balance(
+        self, session: AsyncSession, balance_repo: TokenBalanceRepository
+    ):
+        """Test nothing is held when the balance doesn't cover the reservation."""
+        user_id = get_unique_user_id()
+        dialog_id, _ = await _create_balance_and_dialog(session, user_id, 100)
+
+        assert await balance_repo.reserve(session, user_id, 300, dialog_id) is None
+        assert await _stored_balance(session, user_id) == 100
+        assert await _reservation_count(session, user_id) == 0
+
+    @pytest.mark.asyncio
+    async def test_finalize_insufficient_returns_available_and_rollback_restores_hold(
+        self, session: AsyncSession, balance_repo: TokenBalanceRepository
+    ):
+        """Test an uncovered charge returns balance plus hold and writes nothing that sticks."""
+        user_id = get_unique_user_id()
+        dialog_id, message_id = await _create_balance_and_dialog(session, user_id, 1000)
+        reservation_id = await balance_repo.reserve(session, user_id, 300, dialog_id)
+        # Spent elsewhere while the request was in flight
+        await session.execute(
+            update(TokenBalance).where(TokenBalance.user_id == user_id).values(balance=50)
+        )
+        await session.commit()
+
+        result = await balance_repo.finalize_reservation(
+            session, reservation_id, user_id, 500, dialog_id, message_id
+        )
+
+        assert result == 350  # balance before the statement (50) + hold (300)
+        assert await _stored_balance(session, user_id) == 50
+        await session.rollback()
+
+        # The reservation deleted by the statement is back and can be released
+        assert await _reservation_count(session, user_id) == 1
+        assert await balance_repo.release_reservation(session, reservation_id) is True
+        assert await _stored_balance(session, user_id) == 350
+        transactions = await session.execute(
+            select(TokenTransaction.id).where(TokenTransaction.user_id == user_id)
+        )
+        assert transactions.all() == []
+
+    @pytest.mark.asyncio
+    async def test_finalize_missing_reservation_returns_none(
+        self, session: AsyncSession, balance_repo: TokenBalanceRepository
+    ):
+        """Test finalizing an unknown reservation changes nothing."""
+        user_id = get_unique_user_id()
+        dialog_id, message_id = await _create_balance_and_dialog(session, user_id, 1000)
+
+        result = await balance_repo.finalize_reservation(
+            session, -1, user_id, 200, dialog_id, message_id
+        )
+
+        assert result is None
+        assert await _stored_balance(session, user_id) == 1000
+
+    @pytest.mark.asyncio
+    async def test_release_reservation_refunds_hold(
+        self, session: AsyncSession, balance_repo: TokenBalanceRepository
+    ):
+        """Test releasing refunds the hold once."""
+        user_id = get_unique_user_id()
+        dialog_id, _ = await _create_balance_and_dialog(session, user_id, 1000)
+        reservation_id = await balance_repo.reserve(session, user_id, 300, dialog_id)
+
+        assert await balance_repo.release_reservation(session, reservation_id) is True
+        assert await _stored_balance(session, user_id) == 1000
+        assert await balance_repo.release_reservation(session, reservation_id) is False
+        assert await _stored_balance(session, user_id) == 1000
+
+    @pytest.mark.asyncio
+    async def test_release_stale_reservations(
+        self, session: AsyncSession, balance_repo: TokenBalanceRepository
+    ):
+        """Test only reservations older than the cutoff are refunded, summed per user."""
+        user_id = get_unique_user_id()
+        dialog_id, _ = await _create_balance_and_dialog(session, user_id, 1000)
+        stale_ids = [
+            await balance_repo.reserve(session, user_id, amount, dialog_id) for amount in (100, 200)
+        ]
+        fresh_id = await balance_repo.reserve(session, user_id, 300, dialog_id)
+        await session.execute(
+            update(TokenReservation)
+            .where(TokenReservation.id.in_(stale_ids))
+            .values(created_at=datetime.now(timezone.utc) - timedelta(hours=1))
+        )
+        assert await _stored_balance(session, user_id) == 400
+
+        refunded = await balance_repo.release_stale_reservations(
+            session, datetime.now(timezone.utc) - timedelta(minutes=5)
+        )
+
+        assert refunded >= 1
+        assert await _stored_balance(session, user_id) == 700  # 400 + 100 + 200
+        remaining = await session.execute(
+            select(TokenReservation.id).where(TokenReservation.user_id == user_id)
+        )
+        assert remaining.scalars().all() == [fresh_id]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_finalize_and_deduct(
+        self, engine: AsyncEngine, balance_repo: TokenBalanceRepository
+    ):
+        """Test a deduction blocked behind a finalize applies on top of its result."""
+        user_id = get_unique_user_id()
+        async with AsyncSession(engine, expire_on_commit=False) as setup:
+            dialog_id, message_id = await _create_balance_and_dialog(setup, user_id, 1000)
+            other = Message(id=uuid.uuid4(), dialog_id=dialog_id, role="assistant", content="Hi")
+            setup.add(other)
+            reservation_id = await balance_repo.reserve(setup, user_id, 300, dialog_id)
+            await setup.commit()
+
+        try:
+            async with (
+                AsyncSession(engine, expire_on_commit=False) as finalizer,
+                AsyncSession(engine, expire_on_commit=False) as deductor,
+            ):
+                result = await balance_repo.finalize_reservation(
+                    finalizer, reservation_id, user_id, 200, dialog_id, message_id
+                )
+                assert isinstance(result, tuple)
+
+                # The deduction waits on the balance row locked by the finalize
+                deduction = asyncio.create_task(
+                    balance_repo.deduct_with_transaction(
+                        deductor, user_id, 100, dialog_id, other.id
+                    )
+                )
+                await asyncio.sleep(0.2)
+                assert not deduction.done()
+
+                await finalizer.commit()
+                deducted = await deduction
+                await deductor.commit()
+
+            assert deducted is not None
+            assert deducted[0].balance == 700  # 1000 - 200 - 100, no lost update
+            async with AsyncSession(engine) as check:
+                assert await _stored_balance(check, user_id) == 700
+                assert await _reservation_count(check, user_id) == 0
+                amounts = await check.execute(
+                    select(TokenTransaction.amount).where(TokenTransaction.user_id == user_id)
+                )
+                assert sorted(amounts.scalars().all()) == [-200, -100]
+        finally:
+            async with AsyncSession(engine) as cleanup:
+                for model in (TokenTransaction, TokenReservation, TokenBalance, Dialog):
+                    await cleanup.execute(delete(model).where(model.user_id == user_id))
+                await cleanup.commit()
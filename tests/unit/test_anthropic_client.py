@@ -1,10 +1,31 @@
 """Unit tests for Anthropic client adapter with mocked API calls."""
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from anthropic import APIConnectionError, APIStatusError, APITimeoutError
-
-from src.integrations.anthropic_client import AnthropicClient, AnthropicProvider, TokenUsage
+from anthropic import DEFAULT_CONNECTION_LIMITS, APIConnectionError, APIStatusError, APITimeoutError
+from anthropic.types import (
+    InputJSONDelta,
+    Message,
+    MessageDeltaUsage,
+    RawContentBlockDeltaEvent,
+    RawMessageDeltaEvent,
+    RawMessageStartEvent,
+    TextBlock,
+    TextDelta,
+    ToolUseBlock,
+    Usage,
+)
+from anthropic.types.raw_message_delta_event import Delta
+
+from src.integrations.anthropic_client import (
+    AnthropicClient,
+    AnthropicProvider,
+    TokenUsage,
+    get_anthropic_provider,
+)
+from src.integrations.http_pool import close_shared_http_clients, get_shared_http_client
 from src.shared.exceptions import LLMError, LLMTimeoutError
 
 
@@ -12,45 +33,96 @@ from src.shared.exceptions import LLMError, LLMTimeoutError
 def mock_anthropic_response():
     """Create mock Anthropic response."""
     response = MagicMock()
-    response.content = [MagicMock()]
-    response.content[0].text = "Hello! How can I help you?"
+    response.content = [TextBlock(type="text", text="Hello! How can I help you?")]
     response.usage = MagicMock()
     response.usage.input_tokens = 10
     response.usage.output_tokens = 20
     return response
 
 
+def _text_delta_event(text):
+    """Build a content_block_delta event carrying a text delta."""
+    return RawContentBlockDeltaEvent(
+        type="content_block_delta",
+        index=0,
+        delta=TextDelta(type="text_delta", text=text),
+    )
+
+
 @pytest.fixture
 def mock_stream_events():
     """Create mock streaming events."""
     events = []
 
     # Message start event with input tokens
-    start_event = MagicMock()
-    start_event.type = "message_start"
-    start_event.message = MagicMock()
-    start_event.message.usage = MagicMock()
-    start_event.message.usage.input_tokens = 10
-    events.append(start_event)
+    events.append(
+        RawMessageStartEvent(
+            type="message_start",
+            message=Message(
+                id="msg_test",
+                type="message",
+                role="assistant",
+                model="claude-3-sonnet-20240229",
+                content=[],
+                stop_reason=None,
+                stop_sequence=None,
+                usage=Usage(input_tokens=10, output_tokens=0),
+            ),
+        )
+    )
 
     # Content block delta events
     for text in ["Hello", "!", " How", " can", " I", " help", "?"]:
-        delta_event = MagicMock()
-        delta_event.type = "content_block_delta"
-        delta_event.delta = MagicMock()
-        delta_event.delta.text = text
-        events.append(delta_event)
+        events.append(_text_delta_event(text))
 
     # Message delta event with output tokens
-    final_event = MagicMock()
-    final_event.type = "message_delta"
-    final_event.usage = MagicMock()
-    final_event.usage.output_tokens = 7
-    events.append(final_event)
+    events.append(
+        RawMessageDeltaEvent(
+            type="message_delta",
+            delta=Delta(stop_reason="end_turn", stop_sequence=None),
+            usage=MessageDeltaUsage(output_tokens=7),
+        )
+    )
 
     return events
 
 
+class MockStreamContext:
+    """Async context manager / iterator standing in for messages.stream()."""
+
+    def __init__(self, events):
+        self.events = list(events)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.events:
+            return self.events.pop(0)
+        raise StopAsyncIteration
+
+
+async def _collect_stream(client, events):
+    """Run a streaming send_message over mocked events and collect the chunks."""
+    with patch.object(client, "_get_client") as mock_get_client:
+        mock_async_client = MagicMock()
+        mock_async_client.messages.stream = MagicMock(return_value=MockStreamContext(events))
+        mock_get_client.return_value = mock_async_client
+
+        result = await client.send_message(
+            model="claude-3-sonnet-20240229",
+            messages=[{"role": "user", "content": "Hello"}],
+            stream=True,
+        )
+        return [chunk async for chunk in result]
+
+
 class TestAnthropicClient:
     """Tests for AnthropicClient class."""
 
@@ -113,6 +185,168 @@ class TestAnthropicClient:
             assert client.get_usage().completion_tokens == 20
             assert client.get_usage().total_tokens == 30
 
+    @pytest.mark.asyncio
+    async def test_send_message_joins_text_blocks(self, mock_anthropic_response):
+        """Test text blocks are concatenated and non-text blocks skipped."""
+        client = AnthropicClient(api_key="test-key")
+        mock_anthropic_response.content = [
+            TextBlock(type="text", text="Part one. "),
+            ToolUseBlock(type="tool_use", id="toolu_1", name="lookup", input={}),
+            TextBlock(type="text", text="Part two."),
+        ]
+
+        with patch.object(client, "_get_client") as mock_get_client:
+            mock_async_client = AsyncMock()
+            mock_async_client.messages.create = AsyncMock(
+                return_value=mock_anthropic_response
+            )
+            mock_get_client.return_value = mock_async_client
+
+            result = await client.send_message(
+                model="claude-3-sonnet-20240229",
+                messages=[{"role": "user", "content": "Hello"}],
+                stream=False,
+            )
+
+            assert result == "Part one. Part two."
+
+    @pytest.mark.asyncio
+    async def test_usage_is_isolated_between_concurrent_requests(self):
+        """Test concurrent requests through one client each see their own usage."""
+        client = AnthropicClient(api_key="test-key")
+
+        def response_for(tokens: int):
+            response = MagicMock()
+            response.content = [TextBlock(type="text", text="ok")]
+            response.usage = Usage(input_tokens=tokens, output_tokens=tokens)
+            return response
+
+        async def create(**kwargs):
+            tokens = kwargs["max_tokens"]
+            await asyncio.sleep(0.01 if tokens == 2 else 0)
+            return response_for(tokens)
+
+        async def request(tokens: int) -> TokenUsage | None:
+            await client.send_message(
+                model="claude-3-sonnet-20240229",
+                messages=[{"role": "user", "content": "Hello"}],
+                max_tokens=tokens,
+            )
+            # The first request reads its usage only after the second finished
+            await asyncio.sleep(0.02 if tokens == 1 else 0)
+            return client.get_usage()
+
+        with patch.object(client, "_get_client") as mock_get_client:
+            mock_get_client.return_value.messages.create = create
+            first, second = await asyncio.gather(request(1), request(2))
+
+        assert first.prompt_tokens == 1
+        assert second.prompt_tokens == 2
+
+    @pytest.mark.asyncio
+    async def test_nonzero_temperature_skips_completion_cache(self, mock_anthropic_response):
+        """Test only deterministic requests consult the completion cache."""
+        client = AnthropicClient(api_key="test-key")
+
+        with (
+            patch.object(client, "_get_client") as mock_get_client,
+            patch("src.integrations.anthropic_client.cache_service") as mock_cache,
+        ):
+            mock_async_client = AsyncMock()
+            mock_async_client.messages.create = AsyncMock(return_value=mock_anthropic_response)
+            mock_get_client.return_value = mock_async_client
+
+            await client.send_message(
+                model="claude-3-sonnet-20240229",
+                messages=[{"role": "user", "content": "Hello"}],
+                temperature=0.7,
+            )
+
+            mock_cache.get_completion.assert_not_called()
+            mock_cache.set_completion.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_completion_cache_hit_skips_api(self):
+        """Test a cached deterministic completion is returned with its usage."""
+        client = AnthropicClient(api_key="test-key")
+
+        with (
+            patch.object(client, "_get_client") as mock_get_client,
+            patch("src.integrations.anthropic_client.cache_service") as mock_cache,
+        ):
+            mock_cache.get_completion = AsyncMock(
+                return_value={"content": "Cached", "input_tokens": 4, "output_tokens": 2}
+            )
+
+            result = await client.send_message(
+                model="claude-3-sonnet-20240229",
+                messages=[{"role": "user", "content": "Hello"}],
+                temperature=0,
+            )
+
+            assert result == "Cached"
+            assert client.get_usage() == TokenUsage(4, 2, 6)
+            mock_get_client.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_completion_cache_miss_fills_cache(self, mock_anthropic_response):
+        """Test a deterministic miss calls the API, caches and releases the lock."""
+        client = AnthropicClient(api_key="test-key")
+
+        with (
+            patch.object(client, "_get_client") as mock_get_client,
+            patch("src.integrations.anthropic_client.cache_service") as mock_cache,
+        ):
+            mock_async_client = AsyncMock()
+            mock_async_client.messages.create = AsyncMock(return_value=mock_anthropic_response)
+            mock_get_client.return_value = mock_async_client
+            mock_cache.get_completion = AsyncMock(return_value=None)
+            mock_cache.acquire_completion_lock = AsyncMock(return_value=True)
+            mock_cache.set_completion = AsyncMock(return_value=True)
+            mock_cache.release_completion_lock = AsyncMock(return_value=True)
+
+            result = await client.send_message(
+                model="claude-3-sonnet-20240229",
+                messages=[{"role": "user", "content": "Hello"}],
+                temperature=0,
+            )
+
+            assert result == "Hello! How can I help you?"
+            provider, digest, completion = mock_cache.set_completion.call_args.args
+            assert provider == "anthropic"
+            assert completion == {
+                "content": "Hello! How can I help you?",
+                "input_tokens": 10,
+                "output_tokens": 20,
+            }
+            mock_cache.release_completion_lock.assert_called_once_with("anthropic", digest)
+
+    @pytest.mark.asyncio
+    async def test_completion_cache_waits_for_concurrent_fill(self):
+        """Test a request locked by another replica reuses that replica's result."""
+        client = AnthropicClient(api_key="test-key")
+
+        with (
+            patch.object(client, "_get_client") as mock_get_client,
+            patch("src.integrations.anthropic_client.cache_service") as mock_cache,
+            patch("src.integrations.anthropic_client.COMPLETION_FILL_POLL", 0),
+        ):
+            mock_cache.get_completion = AsyncMock(
+                side_effect=[None, None, {"content": "Shared", "input_tokens": 1, "output_tokens": 1}]
+            )
+            mock_cache.acquire_completion_lock = AsyncMock(return_value=False)
+            mock_cache.release_completion_lock = AsyncMock()
+
+            result = await client.send_message(
+                model="claude-3-sonnet-20240229",
+                messages=[{"role": "user", "content": "Hello"}],
+                temperature=0,
+            )
+
+            assert result == "Shared"
+            mock_get_client.assert_not_called()
+            mock_cache.release_completion_lock.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_send_message_with_system_prompt(self, mock_anthropic_response):
         """Test message with system prompt."""
@@ -163,6 +397,33 @@ class TestAnthropicClient:
             assert len(call_kwargs["messages"]) == 1
             assert call_kwargs["messages"][0]["role"] == "user"
 
+    @pytest.mark.asyncio
+    async def test_send_message_system_precedence(self, mock_anthropic_response):
+        """Test explicit system_prompt wins, else the last system message is used."""
+        client = AnthropicClient(api_key="test-key")
+        messages = [
+            {"role": "system", "content": "First."},
+            {"role": "user", "content": "Hello"},
+            {"role": "system", "content": "Last."},
+        ]
+
+        with patch.object(client, "_get_client") as mock_get_client:
+            mock_async_client = AsyncMock()
+            mock_async_client.messages.create = AsyncMock(
+                return_value=mock_anthropic_response
+            )
+            mock_get_client.return_value = mock_async_client
+
+            await client.send_message(model="claude-3-sonnet-20240229", messages=messages)
+            assert mock_async_client.messages.create.call_args.kwargs["system"] == "Last."
+
+            await client.send_message(
+                model="claude-3-sonnet-20240229", messages=messages, system_prompt="Explicit."
+            )
+            call_kwargs = mock_async_client.messages.create.call_args.kwargs
+            assert call_kwargs["system"] == "Explicit."
+            assert call_kwargs["messages"] == [{"role": "user", "content": "Hello"}]
+
     @pytest.mark.asyncio
     async def test_send_message_sets_default_max_tokens(self, mock_anthropic_response):
         """Test default max_tokens is set."""
@@ -189,24 +450,6 @@ class TestAnthropicClient:
         """Test streaming message send."""
         client = AnthropicClient(api_key="test-key")
 
-        class MockStreamContext:
-            def __init__(self, events):
-                self.events = events
-
-            async def __aenter__(self):
-                return self
-
-            async def __aexit__(self, *args):
-                pass
-
-            def __aiter__(self):
-                return self
-
-            async def __anext__(self):
-                if self.events:
-                    return self.events.pop(0)
-                raise StopAsyncIteration
-
         with patch.object(client, "_get_client") as mock_get_client:
             mock_async_client = MagicMock()
             mock_async_client.messages.stream = MagicMock(
@@ -229,6 +472,86 @@ class TestAnthropicClient:
             assert client.get_usage().prompt_tokens == 10
             assert client.get_usage().completion_tokens == 7
 
+    @pytest.mark.asyncio
+    async def test_send_message_streaming_coalesces_deltas(self, mock_stream_events):
+        """Test small deltas are buffered and flushed together on message_delta."""
+        client = AnthropicClient(api_key="test-key")
+
+        with patch("src.integrations.anthropic_client.STREAM_FLUSH_INTERVAL", 60.0):
+            chunks = await _collect_stream(client, mock_stream_events)
+
+        assert chunks == ["Hello! How can I help?"]
+        assert client.get_usage().completion_tokens == 7
+
+    @pytest.mark.asyncio
+    async def test_send_message_streaming_flushes_at_size_threshold(self, mock_stream_events):
+        """Test the buffer is flushed once it reaches STREAM_FLUSH_CHARS."""
+        client = AnthropicClient(api_key="test-key")
+
+        with (
+            patch("src.integrations.anthropic_client.STREAM_FLUSH_INTERVAL", 60.0),
+            patch("src.integrations.anthropic_client.STREAM_FLUSH_CHARS", 6),
+        ):
+            chunks = await _collect_stream(client, mock_stream_events)
+
+        assert chunks == ["Hello!", " How can", " I help", "?"]
+
+    @pytest.mark.asyncio
+    async def test_send_message_streaming_flushes_on_stream_close(self):
+        """Test buffered text is yielded when the stream ends without message_delta."""
+        client = AnthropicClient(api_key="test-key")
+
+        with patch("src.integrations.anthropic_client.STREAM_FLUSH_INTERVAL", 60.0):
+            chunks = await _collect_stream(client, [_text_delta_event("tail")])
+
+        assert chunks == ["tail"]
+
+    @pytest.mark.asyncio
+    async def test_send_message_streaming_ignores_non_text_events(self, mock_stream_events):
+        """Test non-text deltas and unhandled event types yield nothing."""
+        client = AnthropicClient(api_key="test-key")
+        json_delta = RawContentBlockDeltaEvent(
+            type="content_block_delta",
+            index=1,
+            delta=InputJSONDelta(type="input_json_delta", partial_json='{"a": 1}'),
+        )
+        events = mock_stream_events[:2] + [json_delta, MagicMock()] + mock_stream_events[2:]
+
+        chunks = await _collect_stream(client, events)
+
+        assert "".join(chunks) == "Hello! How can I help?"
+        assert client.get_usage().prompt_tokens == 10
+
+    @pytest.mark.asyncio
+    async def test_streaming_total_duration_is_bounded(self, mock_stream_events):
+        """Test a stream that outlives stream_timeout raises LLMTimeoutError."""
+        client = AnthropicClient(api_key="test-key", stream_timeout=0.05)
+
+        class StalledStreamContext(MockStreamContext):
+            async def __anext__(self):
+                if len(self.events) < 5:
+                    await asyncio.sleep(10)
+                return await super().__anext__()
+
+        with patch.object(client, "_get_client") as mock_get_client:
+            mock_async_client = MagicMock()
+            mock_async_client.messages.stream = MagicMock(
+                return_value=StalledStreamContext(mock_stream_events)
+            )
+            mock_get_client.return_value = mock_async_client
+
+            result = await client.send_message(
+                model="claude-3-sonnet-20240229",
+                messages=[{"role": "user", "content": "Hello"}],
+                stream=True,
+            )
+
+            with pytest.raises(LLMTimeoutError) as exc_info:
+                async for _ in result:
+                    pass
+
+            assert "total duration" in exc_info.value.message
+
     @pytest.mark.asyncio
     async def test_timeout_error(self):
         """Test timeout error handling."""
@@ -328,6 +651,29 @@ class TestAnthropicClient:
 
             assert "server error" in exc_info.value.message
 
+    def test_known_status_skips_error_text(self):
+        """Test canned-message statuses never render the SDK error text."""
+        client = AnthropicClient(api_key="test-key")
+        mock_response = MagicMock()
+        mock_response.status_code = 429
+        error = APIStatusError(message="Rate limit exceeded", response=mock_response, body=None)
+
+        with patch.object(APIStatusError, "__str__", side_effect=AssertionError("rendered")):
+            with pytest.raises(LLMError, match="rate limit"):
+                client._handle_api_error(error)
+
+    def test_client_error_hides_api_key(self):
+        """Test other 4xx errors pass the message through with key details scrubbed."""
+        client = AnthropicClient(api_key="test-key")
+        mock_response = MagicMock()
+        mock_response.status_code = 400
+        error = APIStatusError(message="Bad api_key format", response=mock_response, body=None)
+
+        with pytest.raises(LLMError) as exc_info:
+            client._handle_api_error(error)
+
+        assert exc_info.value.message == "Anthropic API error: Invalid API key"
+
     @pytest.mark.asyncio
     async def test_connection_error(self):
         """Test connection error handling."""
@@ -351,7 +697,7 @@ class TestAnthropicClient:
 
     @pytest.mark.asyncio
     async def test_close_client(self):
-        """Test closing client connection."""
+        """Test closing client releases it without closing the shared pool."""
         client = AnthropicClient(api_key="test-key")
 
         # First create the client
@@ -360,9 +706,21 @@ class TestAnthropicClient:
 
         await client.close()
 
-        mock_async_client.close.assert_called_once()
+        mock_async_client.close.assert_not_called()
         assert client._client is None
 
+    @pytest.mark.asyncio
+    async def test_clients_share_http_client(self):
+        """Test every client is built on the same process-wide HTTP client."""
+        first = AnthropicClient(api_key="key-1")._get_client()
+        second = AnthropicClient(api_key="key-2")._get_client()
+
+        try:
+            assert first._client is second._client
+            assert first._client is get_shared_http_client(DEFAULT_CONNECTION_LIMITS)
+        finally:
+            await close_shared_http_clients()
+
     @pytest.mark.asyncio
     async def test_close_client_when_none(self):
         """Test closing client when not initialized."""
@@ -493,6 +851,22 @@ class TestAnthropicProvider:
         assert final[3] == 0
 
 
+class TestGetAnthropicProvider:
+    """Tests for the process-wide provider accessor."""
+
+    def test_returns_same_instance(self):
+        """Test repeated calls share one provider."""
+        assert get_anthropic_provider() is get_anthropic_provider()
+
+    def test_warm_up_creates_client(self):
+        """Test warm_up allocates the SDK client ahead of the first request."""
+        provider = AnthropicProvider(AnthropicClient(api_key="test-key"))
+
+        provider.warm_up()
+
+        assert provider._client._client is not None
+
+
 class TestTokenUsage:
     """Tests for TokenUsage dataclass."""
 
@@ -0,0 +1,148 @@
+"""Unit tests for cache service and cached balance reads with mocked Redis."""
+import json
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.data.cache import CacheService, cache_service
+from src.data.models import TokenBalance
+from src.data.repositories import TokenBalanceRepository
+
+
+def _cached_balance(user_id: int = 1, balance: int = 500) -> dict:
+    return {
+        "user_id": user_id,
+        "balance": balance,
+        "limit": None,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+@pytest.fixture
+def mock_redis():
+    """Patch get_redis to return an in-memory mock client."""
+    redis = MagicMock()
+    redis.get = AsyncMock(return_value=None)
+    redis.set = AsyncMock(return_value=True)
+    redis.setex = AsyncMock(return_value=True)
+    redis.delete = AsyncMock(return_value=1)
+    with patch("src.data.cache.get_redis", AsyncMock(return_value=redis)):
+        yield redis
+
+
+# Lock Tests
+
+
+@pytest.mark.asyncio
+async def test_acquire_lock_uses_set_nx_px(mock_redis):
+    """Test lock acquisition issues SET NX PX."""
+    acquired = await CacheService.acquire_lock("user:1:balance:lock", 2000)
+
+    assert acquired is True
+    mock_redis.set.assert_called_once_with("user:1:balance:lock", "1", nx=True, px=2000)
+
+
+@pytest.mark.asyncio
+async def test_acquire_lock_held_elsewhere(mock_redis):
+    """Test lock acquisition fails when another worker holds it."""
+    mock_redis.set.return_value = None
+
+    assert await CacheService.acquire_lock("k:lock", 2000) is False
+
+
+@pytest.mark.asyncio
+async def test_acquire_lock_without_redis():
+    """Test lock is granted when Redis is unavailable."""
+    with patch("src.data.cache.get_redis", AsyncMock(return_value=None)):
+        assert await CacheService.acquire_lock("k:lock", 2000) is True
+
+
+# Completion Cache Tests
+
+
+@pytest.mark.asyncio
+async def test_completion_round_trip_uses_completion_ttl(mock_redis):
+    """Test completions are stored under the provider key with the completion TTL."""
+    completion = {"content": "Hi", "input_tokens": 3, "output_tokens": 1}
+
+    await cache_service.set_completion("anthropic", "abc", completion)
+
+    mock_redis.setex.assert_called_once_with(
+        "completion:anthropic:abc", CacheService.TTL_COMPLETION, json.dumps(completion)
+    )
+
+
+@pytest.mark.asyncio
+async def test_completion_lock_key(mock_redis):
+    """Test completion fill lock is derived from the completion key."""
+    await cache_service.acquire_completion_lock("anthropic", "abc", 30000)
+
+    mock_redis.set.assert_called_once_with(
+        "completion:anthropic:abc:lock", "1", nx=True, px=30000
+    )
+
+
+# Cached Balance Read Tests
+
+
+@pytest.mark.asyncio
+async def test_get_by_user_cache_hit_skips_db(mock_redis):
+    """Test cached balance is returned without a DB query."""
+    mock_redis.get.return_value = json.dumps(_cached_balance(balance=750))
+    session = AsyncMock()
+
+    balance = await TokenBalanceRepository().get_by_user(session, 1)
+
+    assert balance.balance == 750
+    session.get.assert_not_called()
+    mock_redis.set.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_by_user_miss_fills_cache_and_releases_lock(mock_redis):
+    """Test cache miss loads from DB, caches it, and releases the fill lock."""
+    db_balance = TokenBalance(
+        user_id=1, balance=300, limit=None, updated_at=datetime.now(timezone.utc)
+    )
+    session = AsyncMock()
+    session.get.return_value = db_balance
+
+    balance = await TokenBalanceRepository().get_by_user(session, 1)
+
+    assert balance is db_balance
+    mock_redis.setex.assert_called_once()
+    assert mock_redis.setex.call_args.args[0] == "user:1:balance"
+    mock_redis.delete.assert_called_once_with("user:1:balance:lock")
+
+
+@pytest.mark.asyncio
+async def test_get_by_user_waits_for_concurrent_fill(mock_redis):
+    """Test reader that loses the fill lock picks up the value cached meanwhile."""
+    mock_redis.get.side_effect = [None, json.dumps(_cached_balance(balance=420))]
+    mock_redis.set.return_value = None  # Lock held by another worker
+    session = AsyncMock()
+
+    with patch("src.data.repositories.BALANCE_FILL_WAIT", 0):
+        balance = await TokenBalanceRepository().get_by_user(session, 1)
+
+    assert balance.balance == 420
+    session.get.assert_not_called()
+    mock_redis.delete.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_deduct_tokens_bypasses_cache(mock_redis):
+    """Test writes load the session-attached row, not the cached copy."""
+    mock_redis.get.return_value = json.dumps(_cached_balance(balance=999))
+    db_balance = TokenBalance(
+        user_id=1, balance=500, limit=None, updated_at=datetime.now(timezone.utc)
+    )
+    session = AsyncMock()
+    session.get.return_value = db_balance
+
+    balance = await TokenBalanceRepository().deduct_tokens(session, 1, 100)
+
+    assert balance is db_balance
+    assert balance.balance == 400
+    mock_redis.delete.assert_called_once_with(cache_service.balance_key(1))
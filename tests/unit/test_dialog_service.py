@@ -72,6 +72,29 @@ async def test_create_dialog_with_model(dialog_service):
     session.commit.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_create_dialog_stores_agent_config_as_dict(dialog_service):
+    """Test agent_config is stored as a plain dict without unset parameters."""
+    session = AsyncMock()
+    dialog_service.dialog_repo = AsyncMock()
+    dialog_service.dialog_repo.create.return_value = Dialog(
+        id=uuid.uuid4(),
+        user_id=1,
+        title=None,
+        system_prompt=None,
+        model_name="gpt-4-turbo",
+        agent_config={"temperature": 0.3},
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+    )
+
+    data = DialogCreate(model_name="gpt-4-turbo", agent_config={"temperature": 0.3})
+    await dialog_service.create_dialog(session, user_id=1, data=data)
+
+    kwargs = dialog_service.dialog_repo.create.call_args.kwargs
+    assert kwargs["agent_config"] == {"temperature": 0.3}
+
+
 @pytest.mark.asyncio
 async def test_create_dialog_with_default_model(dialog_service):
     """Test creating dialog without model uses default."""
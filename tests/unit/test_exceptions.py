@@ -0,0 +1,76 @@
+"""Unit tests for application exceptions."""
+import pickle
+
+import pytest
+
+from src.shared import exceptions
+from src.shared.exceptions import (
+    ApplicationError,
+    ForbiddenError,
+    InsufficientTokensError,
+    LLMError,
+    LLMTimeoutError,
+    NotFoundError,
+    UnauthorizedError,
+    ValidationError,
+)
+
+
+class TestApplicationErrors:
+    """Tests for the ApplicationError hierarchy."""
+
+    @pytest.mark.parametrize(
+        ("error_cls", "code", "status_code"),
+        [
+            (ValidationError, "VALIDATION_ERROR", 400),
+            (UnauthorizedError, "UNAUTHORIZED", 401),
+            (InsufficientTokensError, "INSUFFICIENT_TOKENS", 402),
+            (ForbiddenError, "FORBIDDEN", 403),
+            (NotFoundError, "NOT_FOUND", 404),
+            (LLMError, "LLM_ERROR", 500),
+            (LLMTimeoutError, "LLM_TIMEOUT", 504),
+        ],
+    )
+    def test_code_and_status(self, error_cls, code, status_code):
+        """Test each error carries its code, status and details."""
+        error = error_cls("boom", details={"field": "x"})
+
+        assert error.code == code
+        assert error.status_code == status_code
+        assert error.message == "boom"
+        assert error.details == {"field": "x"}
+        assert str(error) == "boom"
+
+    def test_every_subclass_defines_code(self):
+        """Test no subclass falls back to the base INTERNAL_ERROR code."""
+        subclasses = [
+            obj
+            for obj in vars(exceptions).values()
+            if isinstance(obj, type)
+            and issubclass(obj, ApplicationError)
+            and obj is not ApplicationError
+        ]
+
+        assert subclasses
+        for error_cls in subclasses:
+            assert "code" in vars(error_cls), error_cls.__name__
+            assert "__slots__" in vars(error_cls), error_cls.__name__
+
+    def test_fields_are_slotted(self):
+        """Test raising an error doesn't allocate an instance __dict__."""
+        error = LLMError("boom")
+
+        assert error.__dict__ == {}
+
+    def test_args_hold_only_message(self):
+        """Test args match what Exception.__init__ would have stored."""
+        error = ApplicationError("boom", 418, {"a": 1})
+
+        assert error.args == ("boom",)
+        assert str(error) == "boom"
+
+    def test_pickle_round_trip_keeps_fields(self):
+        """Test slotted fields survive pickling."""
+        error = pickle.loads(pickle.dumps(ApplicationError("boom", 418, {"a": 1})))
+
+        assert (error.message, error.status_code, error.details) == ("boom", 418, {"a": 1})
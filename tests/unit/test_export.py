@@ -1,8 +1,11 @@
 """Tests for export/import schemas."""
 import pytest
 from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
+from src.api.routes.export import export_dialogs, import_dialogs
 from src.shared.schemas import (
     DialogExport,
     DialogImport,
@@ -125,3 +128,96 @@ class TestImportSchemas:
             messages_imported=0,
         )
         assert result.errors == []
+
+
+class TestExportEndpoint:
+    """Tests for the export endpoint's direct JSON encoding."""
+
+    @pytest.mark.asyncio
+    async def test_export_matches_schema(self):
+        """Test the orjson-encoded export validates as ExportResponse."""
+        created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        later = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        dialog = SimpleNamespace(
+            id=uuid4(),
+            title="Chat",
+            system_prompt=None,
+            model_name="gpt-4",
+            agent_config={"temperature": 0.5},
+            created_at=created,
+            updated_at=later,
+            messages=[
+                SimpleNamespace(
+                    role="assistant",
+                    content="Hi there",
+                    prompt_tokens=3,
+                    completion_tokens=5,
+                    created_at=later,
+                ),
+                SimpleNamespace(
+                    role="user",
+                    content="Hello",
+                    prompt_tokens=None,
+                    completion_tokens=None,
+                    created_at=created,
+                ),
+            ],
+        )
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = [dialog]
+        session = AsyncMock()
+        session.execute.return_value = result
+
+        response = await export_dialogs(session=session, user_id=42)
+
+        assert response.media_type == "application/json"
+        export = ExportResponse.model_validate_json(response.body)
+        assert export.version == "1.0"
+        assert (export.user_id, export.dialog_count, export.message_count) == (42, 1, 2)
+        exported = export.dialogs[0]
+        assert exported.id == dialog.id
+        assert exported.agent_config == {"temperature": 0.5}
+        assert [m.content for m in exported.messages] == ["Hello", "Hi there"]
+        assert exported.messages[0].created_at == created
+        assert b'"created_at":"2024-01-01T00:00:00Z"' in response.body
+
+    @pytest.mark.asyncio
+    async def test_export_import_round_trip_keeps_legacy_agent_config(self):
+        """Test a config stored before AgentConfig was enforced survives a round trip."""
+        created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        legacy_config = {"temperature": 1.5, "custom_flag": True}
+        dialog = SimpleNamespace(
+            id=uuid4(),
+            title="Chat",
+            system_prompt="Be brief",
+            model_name="gpt-4",
+            agent_config=legacy_config,
+            created_at=created,
+            updated_at=created,
+            messages=[
+                SimpleNamespace(
+                    role="user",
+                    content="Hello",
+                    prompt_tokens=None,
+                    completion_tokens=None,
+                    created_at=created,
+                ),
+            ],
+        )
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = [dialog]
+        export_session = AsyncMock()
+        export_session.execute.return_value = result
+
+        response = await export_dialogs(session=export_session, user_id=42)
+        request = ImportRequest.model_validate_json(response.body)
+
+        import_session = AsyncMock()
+        import_session.add = MagicMock()
+        imported = await import_dialogs(data=request, session=import_session, user_id=42)
+
+        assert (imported.dialogs_imported, imported.messages_imported) == (1, 1)
+        assert imported.errors == []
+        restored = import_session.add.call_args_list[0].args[0]
+        assert restored.agent_config == legacy_config
+        assert (restored.title, restored.system_prompt) == ("Chat", "Be brief")
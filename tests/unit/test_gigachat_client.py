@@ -0,0 +1,458 @@
+"""Unit tests for GigaChat client adapter with mocked API calls."""
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import orjson
+import pytest
+
+from src.integrations.gigachat_client import (
+    CONNECT_TIMEOUT,
+    GigaChatClient,
+    GigaChatProvider,
+    GigaChatToken,
+    _closing_clients,
+    _insecure_ssl_context,
+    close_shared_clients,
+    get_shared_client,
+)
+from src.shared.exceptions import LLMError
+
+
+class MockStreamResponse:
+    """Async context manager standing in for an httpx streaming response."""
+
+    def __init__(self, chunks: list[bytes], status_code: int = 200):
+        self.status_code = status_code
+        self._chunks = chunks
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def aiter_bytes(self):
+        for chunk in self._chunks:
+            yield chunk
+
+
+class StallingStreamResponse(MockStreamResponse):
+    """Streaming response that stalls after the first chunk until resumed."""
+
+    def __init__(self, first: bytes, rest: bytes):
+        super().__init__([first, rest])
+        self.resume = asyncio.Event()
+
+    async def aiter_bytes(self):
+        first, rest = self._chunks
+        yield first
+        await self.resume.wait()
+        yield rest
+
+
+class TestGigaChatClient:
+    """Tests for GigaChatClient class."""
+
+    def test_init_with_auth_key(self):
+        """Test client initialization with auth key."""
+        client = GigaChatClient(auth_key="test-key", scope="GIGACHAT_API_PERS")
+        assert client._auth_key == "test-key"
+        assert client._timeout == 120.0
+        assert client._limits.max_connections == 20
+
+    def test_init_with_custom_limits(self):
+        """Test pool limits are configurable."""
+        client = GigaChatClient(
+            auth_key="test-key", max_connections=5, max_keepalive=2, keepalive_expiry=10.0
+        )
+        assert client._limits.max_connections == 5
+        assert client._limits.max_keepalive_connections == 2
+        assert client._limits.keepalive_expiry == 10.0
+
+    def test_ssl_context_is_shared(self):
+        """Test the non-verifying SSL context is built once."""
+        first = GigaChatClient(auth_key="test-key")._get_ssl_context()
+        second = GigaChatClient(auth_key="test-key")._get_ssl_context()
+        assert first is second is _insecure_ssl_context()
+
+    def test_ssl_verification_enabled(self):
+        """Test verify_ssl defers to httpx default verification."""
+        client = GigaChatClient(auth_key="test-key", verify_ssl=True)
+        assert client._get_ssl_context() is True
+
+    @pytest.mark.asyncio
+    async def test_get_client_reuses_client(self):
+        """Test the HTTP client is reused across calls on one loop."""
+        client = GigaChatClient(auth_key="test-key")
+
+        http_client = await client._get_client()
+
+        assert await client._get_client() is http_client
+        assert http_client.timeout.connect == CONNECT_TIMEOUT
+        assert http_client.timeout.read == client._timeout
+        await client.close()
+
+    def test_get_client_per_event_loop(self):
+        """Test each event loop gets its own HTTP client."""
+        client = GigaChatClient(auth_key="test-key")
+
+        async def get_and_close():
+            http_client = await client._get_client()
+            await client.close()
+            return http_client
+
+        first = asyncio.run(get_and_close())
+        second = asyncio.run(get_and_close())
+
+        assert first is not second
+        assert first.is_closed and second.is_closed
+
+    @pytest.mark.asyncio
+    async def test_close_client_when_none(self):
+        """Test closing client when not initialized."""
+        client = GigaChatClient(auth_key="test-key")
+
+        # Should not raise
+        await client.close()
+
+
+class TestGigaChatMessages:
+    """Tests for chat completion requests."""
+
+    @pytest.mark.asyncio
+    async def test_send_message_non_streaming(self):
+        """Test payload is sent as JSON bytes and the response parsed."""
+        client = GigaChatClient(auth_key="test-key")
+        response = MagicMock()
+        response.status_code = 200
+        response.content = orjson.dumps(
+            {
+                "choices": [{"message": {"content": "Привет"}}],
+                "usage": {"prompt_tokens": 5, "completion_tokens": 3, "total_tokens": 8},
+            }
+        )
+        http_client = MagicMock()
+        http_client.post = AsyncMock(return_value=response)
+
+        with (
+            patch.object(
+                client, "_get_token", return_value=GigaChatToken("token", time.time() + 600)
+            ),
+            patch.object(client, "_get_client", return_value=http_client),
+        ):
+            result = await client.send_message(
+                model="GigaChat", messages=[{"role": "user", "content": "Hi"}]
+            )
+
+        assert result == "Привет"
+        assert client.get_usage().total_tokens == 8
+        assert str(http_client.post.call_args.args[0]) == (
+            "https://gigachat.devices.sberbank.ru/api/v1/chat/completions"
+        )
+        assert http_client.post.call_args.kwargs["headers"]["Authorization"] == "Bearer token"
+        payload = orjson.loads(http_client.post.call_args.kwargs["content"])
+        assert payload["model"] == "GigaChat"
+        assert payload["max_tokens"] == 4096
+
+    @pytest.mark.asyncio
+    async def test_send_message_streaming(self):
+        """Test SSE lines are parsed across chunk boundaries, skipping malformed data."""
+        client = GigaChatClient(auth_key="test-key")
+        body = (
+            ": keepalive\n\n"
+            'data: {"choices": [{"delta": {"content": "Прив"}}]}\n\n'
+            "event: message\n"
+            "data: {not json\r\n\r\n"
+            'data: {"choices": [{"delta": {"content": "ет"}}]}\n\n'
+            'data: {"choices": [], "usage": {"prompt_tokens": 4, "completion_tokens": 2}}\n\n'
+            "data: [DONE]\n\n"
+            'data: {"choices": [{"delta": {"content": "ignored"}}]}\n\n'
+        ).encode()
+        # Split mid-line and mid-character to exercise buffering
+        raw_chunks = [body[i : i + 7] for i in range(0, len(body), 7)]
+        http_client = MagicMock()
+        http_client.stream = MagicMock(return_value=MockStreamResponse(raw_chunks))
+
+        with (
+            patch.object(
+                client, "_get_token", return_value=GigaChatToken("token", time.time() + 600)
+            ),
+            patch.object(client, "_get_client", return_value=http_client),
+        ):
+            stream = await client.send_message(
+                model="GigaChat", messages=[{"role": "user", "content": "Hi"}], stream=True
+            )
+            chunks = [chunk async for chunk in stream]
+
+        # Deltas arriving together are coalesced into one chunk
+        assert chunks == ["Привет"]
+        assert client.get_usage().prompt_tokens == 4
+        assert client.get_usage().completion_tokens == 2
+        payload = orjson.loads(http_client.stream.call_args.kwargs["content"])
+        assert payload["stream"] is True
+        headers = http_client.stream.call_args.kwargs["headers"]
+        assert headers["Accept"] == "text/event-stream"
+        assert headers["Authorization"] == "Bearer token"
+
+
+    @pytest.mark.asyncio
+    async def test_streaming_flushes_at_size_threshold(self):
+        """Test buffered deltas are yielded once they reach STREAM_FLUSH_CHARS."""
+        client = GigaChatClient(auth_key="test-key")
+        body = b"".join(
+            b'data: {"choices": [{"delta": {"content": "%s"}}]}\n\n' % text
+            for text in (b"ab", b"cd", b"e")
+        )
+        http_client = MagicMock()
+        http_client.stream = MagicMock(return_value=MockStreamResponse([body]))
+
+        with (
+            patch("src.integrations.gigachat_client.STREAM_FLUSH_CHARS", 4),
+            patch.object(
+                client, "_get_token", return_value=GigaChatToken("token", time.time() + 600)
+            ),
+            patch.object(client, "_get_client", return_value=http_client),
+        ):
+            stream = await client.send_message(
+                model="GigaChat", messages=[{"role": "user", "content": "Hi"}], stream=True
+            )
+            chunks = [chunk async for chunk in stream]
+
+        assert chunks == ["abcd", "e"]
+
+    @pytest.mark.asyncio
+    async def test_streaming_flushes_buffer_while_provider_stalls(self):
+        """Test buffered text is yielded on the flush timer, not held until the next delta."""
+        client = GigaChatClient(auth_key="test-key")
+        response = StallingStreamResponse(
+            b'data: {"choices": [{"delta": {"content": "a"}}]}\n\n',
+            b'data: {"choices": [{"delta": {"content": "b"}}]}\n\ndata: [DONE]\n\n',
+        )
+        http_client = MagicMock()
+        http_client.stream = MagicMock(return_value=response)
+
+        with (
+            patch.object(
+                client, "_get_token", return_value=GigaChatToken("token", time.time() + 600)
+            ),
+            patch.object(client, "_get_client", return_value=http_client),
+        ):
+            stream = await client.send_message(
+                model="GigaChat", messages=[{"role": "user", "content": "Hi"}], stream=True
+            )
+            # The provider sends nothing more until the first chunk is received
+            async with asyncio.timeout(1):
+                first = await anext(stream)
+            response.resume.set()
+            rest = [chunk async for chunk in stream]
+
+        assert first == "a"
+        assert rest == ["b"]
+
+    @pytest.mark.asyncio
+    async def test_streaming_without_coalescing(self):
+        """Test coalesce_stream=False yields every delta as it arrives."""
+        client = GigaChatClient(auth_key="test-key", coalesce_stream=False)
+        body = b"".join(
+            b'data: {"choices": [{"delta": {"content": "%s"}}]}\n\n' % text
+            for text in (b"a", b"b", b"c")
+        )
+        http_client = MagicMock()
+        http_client.stream = MagicMock(return_value=MockStreamResponse([body]))
+
+        with (
+            patch.object(
+                client, "_get_token", return_value=GigaChatToken("token", time.time() + 600)
+            ),
+            patch.object(client, "_get_client", return_value=http_client),
+        ):
+            stream = await client.send_message(
+                model="GigaChat", messages=[{"role": "user", "content": "Hi"}], stream=True
+            )
+            chunks = [chunk async for chunk in stream]
+
+        assert chunks == ["a", "b", "c"]
+
+
+class TestGigaChatAccessToken:
+    """Tests for OAuth2 access token handling."""
+
+    @staticmethod
+    def _auth_response(token: str) -> MagicMock:
+        response = MagicMock()
+        response.status_code = 200
+        response.content = orjson.dumps(
+            {"access_token": token, "expires_at": (time.time() + 1800) * 1000}
+        )
+        return response
+
+    @pytest.mark.asyncio
+    async def test_cached_token_skips_auth_request(self):
+        """Test a valid cached token is returned without calling the auth endpoint."""
+        client = GigaChatClient(auth_key="test-key")
+        client._token = GigaChatToken(access_token="cached", expires_at=time.time() + 600)
+
+        with patch.object(client, "_get_client") as mock_get_client:
+            assert await client._get_token() is client._token
+            mock_get_client.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_refresh_posts_once(self):
+        """Test concurrent callers share a single token refresh."""
+        client = GigaChatClient(auth_key="test-key")
+        calls = 0
+
+        async def post(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return self._auth_response("fresh")
+
+        http_client = MagicMock()
+        http_client.post = post
+        with patch.object(client, "_get_client", return_value=http_client):
+            tokens = await asyncio.gather(*(client._get_token() for _ in range(10)))
+
+        assert [token.access_token for token in tokens] == ["fresh"] * 10
+        assert calls == 1
+
+    def test_concurrent_refresh_on_each_event_loop(self):
+        """Test a shared client refreshes under contention on successive loops."""
+        client = GigaChatClient(auth_key="test-key")
+        calls = 0
+
+        async def post(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return self._auth_response(f"fresh-{calls}")
+
+        http_client = MagicMock()
+        http_client.post = post
+
+        async def refresh_burst():
+            # Expire the token so every caller contends for the loop's lock
+            client._token = None
+            tokens = await asyncio.gather(*(client._get_token() for _ in range(10)))
+            return {token.access_token for token in tokens}
+
+        with patch.object(client, "_get_client", return_value=http_client):
+            first = asyncio.run(refresh_burst())
+            second = asyncio.run(refresh_burst())
+
+        assert first == {"fresh-1"}
+        assert second == {"fresh-2"}
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_token_near_expiry_is_refreshed(self):
+        """Test a token inside the expiry buffer is replaced."""
+        client = GigaChatClient(auth_key="test-key")
+        client._token = GigaChatToken(access_token="stale", expires_at=time.time() + 30)
+
+        http_client = MagicMock()
+        http_client.post = AsyncMock(return_value=self._auth_response("fresh"))
+        with patch.object(client, "_get_client", return_value=http_client):
+            token = await client._get_token()
+
+        assert token.access_token == "fresh"
+        assert token.api_headers["Authorization"] == "Bearer fresh"
+
+    @pytest.mark.asyncio
+    async def test_token_nearing_expiry_refreshed_in_background(self):
+        """Test a token in the early-refresh window is served while a refresh runs."""
+        client = GigaChatClient(auth_key="test-key")
+        now = time.time()
+        client._token = GigaChatToken(
+            access_token="aging", expires_at=now + 120, issued_at=now - 1680
+        )
+
+        http_client = MagicMock()
+        http_client.post = AsyncMock(return_value=self._auth_response("fresh"))
+        with patch.object(client, "_get_client", return_value=http_client):
+            first = await client._get_token()
+            second = await client._get_token()
+            await client._loop_state().refresh_task
+
+        assert first.access_token == second.access_token == "aging"
+        http_client.post.assert_awaited_once()
+        assert client._token.access_token == "fresh"
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_failure_keeps_token(self):
+        """Test a failed background refresh leaves the current token in place."""
+        client = GigaChatClient(auth_key="test-key")
+        now = time.time()
+        client._token = GigaChatToken(
+            access_token="aging", expires_at=now + 120, issued_at=now - 1680
+        )
+
+        http_client = MagicMock()
+        http_client.post = AsyncMock(return_value=MagicMock(status_code=503))
+        with patch.object(client, "_get_client", return_value=http_client):
+            assert (await client._get_token()).access_token == "aging"
+            await client._loop_state().refresh_task
+
+        assert client._token.access_token == "aging"
+
+    @pytest.mark.asyncio
+    async def test_missing_auth_key_raises(self):
+        """Test refreshing without an auth key raises LLMError."""
+        with patch("src.integrations.gigachat_client.settings") as mock_settings:
+            mock_settings.gigachat_auth_key = None
+            client = GigaChatClient()
+
+        with pytest.raises(LLMError) as exc_info:
+            await client._get_token()
+
+        assert "not configured" in exc_info.value.message
+
+
+class TestSharedClients:
+    """Tests for the process-wide GigaChat clients."""
+
+    @pytest.mark.asyncio
+    async def test_providers_share_client(self):
+        """Test providers without an explicit client share one per credentials."""
+        shared = get_shared_client("key-a", "GIGACHAT_API_PERS")
+
+        assert get_shared_client("key-a", "GIGACHAT_API_PERS") is shared
+        assert get_shared_client("key-b", "GIGACHAT_API_PERS") is not shared
+        with patch("src.integrations.gigachat_client.settings") as mock_settings:
+            mock_settings.gigachat_auth_key = "key-a"
+            mock_settings.gigachat_scope = "GIGACHAT_API_PERS"
+            assert GigaChatProvider()._client is shared
+
+        await close_shared_clients()
+
+    @pytest.mark.asyncio
+    async def test_rotated_credentials_close_old_client(self):
+        """Test rotating the configured credentials closes and evicts the old client."""
+        with patch("src.integrations.gigachat_client.settings") as mock_settings:
+            mock_settings.gigachat_auth_key = "key-a"
+            mock_settings.gigachat_scope = "GIGACHAT_API_PERS"
+            old = get_shared_client()
+            http_client = await old._get_client()
+
+            mock_settings.gigachat_auth_key = "key-b"
+            new = get_shared_client()
+            await asyncio.gather(*_closing_clients)
+
+        assert new is not old
+        assert new._auth_key == "key-b"
+        assert http_client.is_closed
+        assert get_shared_client("key-a", "GIGACHAT_API_PERS") is not old
+        await close_shared_clients()
+
+    @pytest.mark.asyncio
+    async def test_close_shared_clients(self):
+        """Test closing drops the shared clients and their HTTP pools."""
+        shared = get_shared_client("key-a", "GIGACHAT_API_PERS")
+        http_client = await shared._get_client()
+
+        await close_shared_clients()
+
+        assert http_client.is_closed
+        assert get_shared_client("key-a", "GIGACHAT_API_PERS") is not shared
+        await close_shared_clients()
@@ -0,0 +1,48 @@
+"""Unit tests for the shared HTTP connection pool."""
+import anthropic
+import openai
+import pytest
+
+from src.integrations import http_pool
+from src.integrations.http_pool import close_shared_http_clients, get_shared_http_client
+
+
+class TestGetSharedHttpClient:
+    """Tests for get_shared_http_client."""
+
+    @pytest.mark.asyncio
+    async def test_sdks_on_same_httpx_share_one_client(self):
+        """Test the OpenAI and Anthropic SDKs get the same pool."""
+        try:
+            openai_http = get_shared_http_client(openai.DEFAULT_CONNECTION_LIMITS)
+            anthropic_http = get_shared_http_client(anthropic.DEFAULT_CONNECTION_LIMITS)
+
+            if type(openai.DEFAULT_CONNECTION_LIMITS) is type(anthropic.DEFAULT_CONNECTION_LIMITS):
+                assert openai_http is anthropic_http
+        finally:
+            await close_shared_http_clients()
+
+    @pytest.mark.asyncio
+    async def test_applies_pool_limits_and_http2(self):
+        """Test the shared client uses the configured limits over HTTP/2."""
+        try:
+            client = get_shared_http_client(openai.DEFAULT_CONNECTION_LIMITS)
+
+            pool = client._transport._pool
+            assert pool._max_connections == http_pool.MAX_CONNECTIONS
+            assert pool._max_keepalive_connections == http_pool.MAX_KEEPALIVE_CONNECTIONS
+            assert pool._http2 is True
+        finally:
+            await close_shared_http_clients()
+
+    @pytest.mark.asyncio
+    async def test_close_recreates_on_next_use(self):
+        """Test a closed shared client is replaced on next access."""
+        client = get_shared_http_client(anthropic.DEFAULT_CONNECTION_LIMITS)
+
+        await close_shared_http_clients()
+
+        assert client.is_closed
+        replacement = get_shared_http_client(anthropic.DEFAULT_CONNECTION_LIMITS)
+        assert replacement is not client
+        await close_shared_http_clients()
@@ -4,8 +4,10 @@ from unittest.mock import MagicMock, patch
 
 import jwt
 import pytest
+from jwt import PyJWKClientError
 
 from src.integrations.jwt_validator import (
+    CLAIMS_CACHE_TTL,
     JWKSCache,
     JWTClaims,
     JWTValidator,
@@ -153,6 +155,21 @@ class TestJWTValidator:
         assert exc_info.value.status_code == 401
         assert "malformed" in exc_info.value.message.lower()
 
+    @pytest.mark.parametrize(
+        "token",
+        ["", "onlyonesegment", "two.segments", "a.b.c.d", "a.b$.c", "a.b.c ", "ey.ey.sig/+"],
+    )
+    def test_validate_rejects_bad_shape_before_decoding(self, token):
+        """Test tokens that aren't compact JWS are rejected without decoding."""
+        validator = JWTValidator(secret=TEST_SECRET, algorithm="HS256")
+
+        with patch.object(validator, "_validate_hs256") as mock_decode:
+            with pytest.raises(UnauthorizedError) as exc_info:
+                validator.validate(token)
+
+        mock_decode.assert_not_called()
+        assert "malformed" in exc_info.value.message.lower()
+
     def test_validate_empty_token_raises(self):
         """Test empty token raises UnauthorizedError."""
         validator = JWTValidator(secret=TEST_SECRET, algorithm="HS256")
@@ -217,6 +234,21 @@ class TestJWTValidator:
 
         assert claims.is_admin is True
 
+    def test_validate_is_staff_string_false(self):
+        """Test is_staff as string 'False' is not treated as truthy."""
+        payload = {
+            "user_id": 123,
+            "is_staff": "False",
+            "exp": int(time.time()) + 3600,
+            "iat": int(time.time()),
+        }
+        token = jwt.encode(payload, TEST_SECRET, algorithm="HS256")
+
+        validator = JWTValidator(secret=TEST_SECRET, algorithm="HS256")
+        claims = validator.validate(token)
+
+        assert claims.is_admin is False
+
     def test_validate_is_admin_default_false(self, valid_token):
         """Test is_admin defaults to False when not present."""
         payload = {
@@ -242,56 +274,130 @@ class TestJWTValidator:
         assert "iat" in claims.raw_claims
 
 
+class TestClaimsCache:
+    """Tests for the validated claims cache."""
+
+    def test_repeat_token_skips_verification(self, valid_token):
+        """Test a repeated token is served from the cache."""
+        validator = JWTValidator(secret=TEST_SECRET, algorithm="HS256")
+        first = validator.validate(valid_token)
+
+        with patch.object(validator, "_validate_hs256") as mock_decode:
+            second = validator.validate(f"Bearer {valid_token}")
+
+        mock_decode.assert_not_called()
+        assert second is first
+
+    def test_entry_expires_after_ttl(self, valid_token):
+        """Test cached claims are re-verified once the TTL passes."""
+        validator = JWTValidator(secret=TEST_SECRET, algorithm="HS256")
+        validator.validate(valid_token)
+
+        later = time.time() + CLAIMS_CACHE_TTL + 1
+        with (
+            patch("src.integrations.jwt_validator.time.time", return_value=later),
+            patch.object(
+                validator, "_validate_hs256", wraps=validator._validate_hs256
+            ) as mock_decode,
+        ):
+            validator.validate(valid_token)
+
+        mock_decode.assert_called_once()
+
+    def test_entry_never_outlives_token(self):
+        """Test a token expiring before the TTL is not served past its exp."""
+        now = int(time.time())
+        token = jwt.encode(
+            {"user_id": 1, "exp": now + 5, "iat": now}, TEST_SECRET, algorithm="HS256"
+        )
+        validator = JWTValidator(secret=TEST_SECRET, algorithm="HS256")
+        validator.validate(token)
+
+        expires_at, _ = next(iter(validator._claims_cache.values()))
+        assert expires_at == now + 5
+
+    def test_invalid_token_not_cached(self, valid_token):
+        """Test failed validations are not cached."""
+        validator = JWTValidator(secret="wrong-secret", algorithm="HS256")
+
+        with pytest.raises(UnauthorizedError):
+            validator.validate(valid_token)
+
+        assert not validator._claims_cache
+
+    def test_cache_evicts_oldest_entry(self, valid_token, admin_token):
+        """Test the oldest entry is evicted once the size cap is reached."""
+        validator = JWTValidator(secret=TEST_SECRET, algorithm="HS256")
+
+        with patch("src.integrations.jwt_validator.CLAIMS_CACHE_MAX_SIZE", 1):
+            validator.validate(valid_token)
+            admin_claims = validator.validate(admin_token)
+
+        assert len(validator._claims_cache) == 1
+        assert next(iter(validator._claims_cache.values()))[1] is admin_claims
+
+    def test_refresh_jwks_clears_claims_cache(self, valid_token):
+        """Test refresh_jwks drops cached claims."""
+        validator = JWTValidator(secret=TEST_SECRET, algorithm="HS256")
+        validator.validate(valid_token)
+
+        validator.refresh_jwks()
+
+        assert not validator._claims_cache
+
+
 class TestJWKSCache:
     """Tests for JWKSCache class."""
 
     def test_cache_creates_client(self):
-        """Test cache creates PyJWKClient on first access."""
+        """Test cache creates PyJWKClient with key caching and TTL lifespan."""
         with patch("src.integrations.jwt_validator.PyJWKClient") as mock_client:
-            cache = JWKSCache("https://example.com/.well-known/jwks.json")
-            client = cache.get_client()
+            cache = JWKSCache("https://example.com/.well-known/jwks.json", ttl=600)
 
-            mock_client.assert_called_once()
-            assert cache._client is not None
+            mock_client.assert_called_once_with(
+                "https://example.com/.well-known/jwks.json",
+                cache_keys=True,
+                lifespan=600,
+                max_cached_keys=16,
+            )
+            assert cache.get_client() is mock_client.return_value
 
     def test_cache_reuses_client(self):
-        """Test cache reuses client within TTL."""
+        """Test cache never rebuilds the client."""
         with patch("src.integrations.jwt_validator.PyJWKClient") as mock_client:
             cache = JWKSCache("https://example.com/.well-known/jwks.json", ttl=3600)
 
-            cache.get_client()
             cache.get_client()
             cache.get_client()
 
             # Should only create client once
             assert mock_client.call_count == 1
 
-    def test_cache_refreshes_after_ttl(self):
-        """Test cache refreshes client after TTL expires."""
+    def test_cache_invalidate_replaces_client(self):
+        """Test invalidate swaps in a new client and refetches its keys."""
         with patch("src.integrations.jwt_validator.PyJWKClient") as mock_client:
-            cache = JWKSCache("https://example.com/.well-known/jwks.json", ttl=3600)
-
-            # First access
-            cache.get_client()
-            assert mock_client.call_count == 1
+            old_client, new_client = MagicMock(), MagicMock()
+            mock_client.side_effect = [old_client, new_client]
+            cache = JWKSCache("https://example.com/.well-known/jwks.json")
 
-            # Simulate TTL expiration by manipulating internal state
-            cache._last_refresh = time.time() - 3601
+            cache.invalidate()
 
-            # Second access should refresh
-            cache.get_client()
             assert mock_client.call_count == 2
+            assert cache.get_client() is new_client
+            new_client.get_jwk_set.assert_called_once_with(refresh=True)
 
-    def test_cache_invalidate_forces_refresh(self):
-        """Test invalidate forces refresh on next access."""
+    def test_cache_invalidate_keeps_client_when_fetch_fails(self):
+        """Test a failed refetch leaves the working client in place."""
         with patch("src.integrations.jwt_validator.PyJWKClient") as mock_client:
+            old_client, new_client = MagicMock(), MagicMock()
+            new_client.get_jwk_set.side_effect = PyJWKClientError("unreachable")
+            mock_client.side_effect = [old_client, new_client]
             cache = JWKSCache("https://example.com/.well-known/jwks.json")
 
-            cache.get_client()
-            cache.invalidate()
-            cache.get_client()
+            with pytest.raises(PyJWKClientError):
+                cache.invalidate()
 
-            assert mock_client.call_count == 2
+            assert cache.get_client() is old_client
 
 
 class TestJWTClaims:
@@ -328,6 +434,20 @@ class TestJWTClaims:
 
         assert claims.nbf is None
 
+    def test_claims_are_immutable(self):
+        """Test cached claims can't be modified by one request for the next."""
+        claims = JWTClaims(
+            user_id=123,
+            is_admin=False,
+            exp=1234567890,
+            iat=1234567800,
+            nbf=None,
+            raw_claims={},
+        )
+
+        with pytest.raises(AttributeError):
+            claims.is_admin = True
+
 
 class TestGlobalValidator:
     """Tests for global validator functions."""
@@ -335,8 +455,7 @@ class TestGlobalValidator:
     def test_get_jwt_validator_creates_singleton(self):
         """Test get_jwt_validator returns same instance."""
         # Reset global state
-        import src.integrations.jwt_validator as mod
-        mod._validator = None
+        get_jwt_validator.cache_clear()
 
         with patch.object(JWTValidator, "__init__", return_value=None):
             v1 = get_jwt_validator()
@@ -344,13 +463,17 @@ class TestGlobalValidator:
 
             assert v1 is v2
 
+        get_jwt_validator.cache_clear()
+
     def test_validate_jwt_uses_global_validator(self, valid_token):
         """Test validate_jwt uses global validator."""
-        # Reset global state
-        import src.integrations.jwt_validator as mod
-        mod._validator = JWTValidator(secret=TEST_SECRET, algorithm="HS256")
+        validator = JWTValidator(secret=TEST_SECRET, algorithm="HS256")
+
+        with patch(
+            "src.integrations.jwt_validator.get_jwt_validator", return_value=validator
+        ):
+            claims = validate_jwt(valid_token)
 
-        claims = validate_jwt(valid_token)
         assert claims.user_id == 123
 
 
@@ -1,11 +1,17 @@
 """Unit tests for LLM Provider Factory."""
+import subprocess
+import sys
+
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.integrations.llm_factory import (
     LLMProviderContract,
     LLMProviderFactory,
     SUPPORTED_PROVIDERS,
+    _PROVIDER_FACTORIES,
+    _PROVIDERS,
+    aclose_providers,
     get_llm_provider,
 )
 from src.integrations.openai_client import OpenAIProvider
@@ -27,6 +33,26 @@ class TestLLMProviderFactory:
         provider = LLMProviderFactory.get_provider("anthropic")
         assert isinstance(provider, AnthropicProvider)
 
+    def test_get_provider_reuses_openai_instance(self):
+        """Test repeated lookups share one OpenAI provider and its pool."""
+        assert LLMProviderFactory.get_provider("openai") is LLMProviderFactory.get_provider(
+            "openai"
+        )
+
+    def test_get_provider_builds_each_provider_once(self):
+        """Test a provider is created once and shared across name variants."""
+        factory = MagicMock(return_value=MagicMock())
+        with (
+            patch.dict(_PROVIDERS, clear=True),
+            patch.dict(_PROVIDER_FACTORIES, {"gigachat": factory}),
+        ):
+            first = LLMProviderFactory.get_provider("gigachat")
+            second = LLMProviderFactory.get_provider(" GigaChat ")
+            third = LLMProviderFactory.get_provider("gigachat")
+
+        assert first is second is third
+        factory.assert_called_once_with()
+
     def test_get_provider_case_insensitive(self):
         """Test provider name is case insensitive."""
         provider_upper = LLMProviderFactory.get_provider("OPENAI")
@@ -68,9 +94,12 @@ class TestLLMProviderFactory:
 
     def test_get_provider_handles_initialization_error(self):
         """Test factory handles provider initialization errors."""
-        with patch(
-            "src.integrations.llm_factory.OpenAIProvider",
-            side_effect=Exception("Init failed"),
+        with (
+            patch.dict(_PROVIDERS, clear=True),
+            patch.dict(
+                _PROVIDER_FACTORIES,
+                {"openai": MagicMock(side_effect=Exception("Init failed"))},
+            ),
         ):
             with pytest.raises(LLMError) as exc_info:
                 LLMProviderFactory.get_provider("openai")
@@ -153,6 +182,35 @@ class TestGetLLMProvider:
         assert exc_info.value.status_code == 500
 
 
+class TestAcloseProviders:
+    """Tests for aclose_providers shutdown hook."""
+
+    @pytest.mark.asyncio
+    async def test_closes_all_shared_clients(self):
+        """Test every provider's shared client is closed."""
+        with (
+            patch("src.integrations.openai_client.close_openai_provider", AsyncMock()) as openai,
+            patch("src.integrations.http_pool.close_shared_http_clients", AsyncMock()) as pool,
+            patch("src.integrations.gigachat_client.close_shared_clients", AsyncMock()) as gigachat,
+        ):
+            await aclose_providers()
+
+        openai.assert_awaited_once()
+        pool.assert_awaited_once()
+        gigachat.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_skips_providers_never_imported(self):
+        """Test shutdown doesn't import a provider module just to close it."""
+        with patch.dict(sys.modules, {"src.integrations.gigachat_client": None}):
+            with patch(
+                "src.integrations.openai_client.close_openai_provider", AsyncMock()
+            ) as openai:
+                await aclose_providers()
+
+        openai.assert_awaited_once()
+
+
 class TestSupportedProviders:
     """Tests for SUPPORTED_PROVIDERS constant."""
 
@@ -207,3 +265,19 @@ class TestLLMProviderContract:
         assert hasattr(openai, "generate_stream")
         assert hasattr(anthropic, "generate")
         assert hasattr(anthropic, "generate_stream")
+
+
+class TestLazyProviderImports:
+    """Tests for deferred provider SDK imports."""
+
+    def test_factory_import_does_not_load_sdks(self):
+        """Test importing the factory leaves the provider SDKs unloaded."""
+        code = (
+            "import sys, src.integrations.llm_factory; "
+            "print(sorted(m for m in ('openai', 'anthropic', 'httpx') if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.strip() == "[]"
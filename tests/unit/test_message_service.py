@@ -1,4 +1,5 @@
 """Unit tests for MessageService with mocked dependencies."""
+import asyncio
 import uuid
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -22,8 +23,9 @@ from src.shared.schemas import MessageCreate
 def mock_token_service():
     """Create mock token service."""
     service = MagicMock(spec=TokenService)
-    service.check_balance = AsyncMock(return_value=True)
-    service.deduct_tokens = AsyncMock(return_value=(MagicMock(), MagicMock()))
+    service.reserve_tokens = AsyncMock(return_value=42)
+    service.finalize_reservation = AsyncMock(return_value=(MagicMock(), MagicMock()))
+    service.release_reservation = AsyncMock(return_value=True)
     return service
 
 
@@ -90,7 +92,7 @@ async def test_send_message_success(message_service, mock_dialog, mock_message):
     assert result.id == mock_message.id
     assert result.role == "assistant"
     message_service.llm_provider.generate.assert_called_once()
-    message_service.token_service.deduct_tokens.assert_called_once()
+    message_service.token_service.finalize_reservation.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -151,7 +153,9 @@ async def test_send_message_insufficient_tokens(message_service, mock_dialog):
     """Test send message raises InsufficientTokensError."""
     session = AsyncMock()
     message_service.dialog_repo.get_by_id.return_value = mock_dialog
-    message_service.token_service.check_balance.return_value = False
+    message_service.token_service.reserve_tokens.side_effect = InsufficientTokensError(
+        "Insufficient tokens. Estimated cost: 101"
+    )
 
     data = MessageCreate(content="Hello")
 
@@ -163,6 +167,27 @@ async def test_send_message_insufficient_tokens(message_service, mock_dialog):
     assert "Insufficient tokens" in exc_info.value.message
 
 
+@pytest.mark.asyncio
+async def test_send_message_balance_check_uses_model_estimate(
+    message_service, mock_dialog, mock_message
+):
+    """Test reservation estimates cost from content and requested max_tokens."""
+    session = AsyncMock()
+    message_service.dialog_repo.get_by_id.return_value = mock_dialog
+    message_service.message_repo.create_user_message.return_value = mock_message
+    message_service.message_repo.create_assistant_message.return_value = mock_message
+    message_service.message_repo.get_by_dialog.return_value = []
+
+    data = MessageCreate(content="a" * 400)
+    await message_service.send_message(
+        session, mock_dialog.id, user_id=1, data=data, config={"max_tokens": 50}
+    )
+
+    message_service.token_service.reserve_tokens.assert_called_once_with(
+        session, 1, 150, mock_dialog.id
+    )
+
+
 @pytest.mark.asyncio
 async def test_send_message_llm_timeout(message_service, mock_dialog, mock_message):
     """Test send message raises LLMTimeoutError."""
@@ -206,7 +231,7 @@ async def test_send_message_llm_error(message_service, mock_dialog, mock_message
 async def test_send_message_no_llm_provider():
     """Test send message raises LLMError when no provider."""
     token_service = MagicMock(spec=TokenService)
-    token_service.check_balance = AsyncMock(return_value=True)
+    token_service.reserve_tokens = AsyncMock(return_value=42)
 
     service = MessageService(token_service, llm_provider=None)
     service.dialog_repo = AsyncMock()
@@ -378,10 +403,10 @@ async def test_tokens_deducted_after_success(message_service, mock_dialog, mock_
         session, mock_dialog.id, user_id=1, data=data
     )
 
-    # Should deduct 30 tokens
-    message_service.token_service.deduct_tokens.assert_called_once()
-    call_args = message_service.token_service.deduct_tokens.call_args
-    assert call_args[0][2] == 30  # amount
+    # Should charge 30 tokens against the reservation
+    message_service.token_service.finalize_reservation.assert_called_once_with(
+        session, 42, 1, 30, mock_dialog.id, mock_message.id
+    )
 
 
 @pytest.mark.asyncio
@@ -400,8 +425,9 @@ async def test_no_tokens_deducted_on_llm_failure(message_service, mock_dialog, m
             session, mock_dialog.id, user_id=1, data=data
         )
 
-    # Should NOT deduct tokens
-    message_service.token_service.deduct_tokens.assert_not_called()
+    # Should NOT charge tokens - the reservation is refunded instead
+    message_service.token_service.finalize_reservation.assert_not_called()
+    message_service.token_service.release_reservation.assert_called_once_with(session, 42)
 
 
 # Transaction Tests
@@ -409,7 +435,7 @@ async def test_no_tokens_deducted_on_llm_failure(message_service, mock_dialog, m
 
 @pytest.mark.asyncio
 async def test_transaction_committed_on_success(message_service, mock_dialog, mock_message):
-    """Test transaction is committed on success."""
+    """Test reservation and response are committed separately on success."""
     session = AsyncMock()
     message_service.dialog_repo.get_by_id.return_value = mock_dialog
     message_service.message_repo.create_user_message.return_value = mock_message
@@ -421,7 +447,9 @@ async def test_transaction_committed_on_success(message_service, mock_dialog, mo
         session, mock_dialog.id, user_id=1, data=data
     )
 
-    session.commit.assert_called_once()
+    # Reservation commit, then messages + charge commit
+    assert session.commit.call_count == 2
+    session.rollback.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -440,5 +468,216 @@ async def test_transaction_rolled_back_on_llm_failure(message_service, mock_dial
             session, mock_dialog.id, user_id=1, data=data
         )
 
-    session.rollback.assert_called()
-    session.commit.assert_not_called()
+    # User message rolled back; only the reservation and its refund committed
+    session.rollback.assert_called_once()
+    assert session.commit.call_count == 2
+    message_service.token_service.release_reservation.assert_called_once_with(session, 42)
+
+
+# Streaming Tests
+
+
+def _stream_provider(chunks, prompt_tokens=10, completion_tokens=20):
+    """Create a provider whose generate_stream yields the given text chunks."""
+
+    async def generate_stream(messages, model, config=None):
+        for chunk in chunks:
+            yield (chunk, False, None, None)
+        yield ("", True, prompt_tokens, completion_tokens)
+
+    provider = MagicMock()
+    provider.generate_stream = generate_stream
+    return provider
+
+
+@pytest.fixture
+def stream_service(mock_token_service, mock_dialog, mock_message):
+    """Create MessageService with repositories prepared for a streaming call."""
+
+    def _create(chunks):
+        service = MessageService(mock_token_service, _stream_provider(chunks))
+        service.dialog_repo = AsyncMock()
+        service.message_repo = AsyncMock()
+        service.dialog_repo.get_by_id.return_value = mock_dialog
+        service.message_repo.create_user_message.return_value = mock_message
+        service.message_repo.create_assistant_message.return_value = mock_message
+        service.message_repo.get_by_dialog.return_value = []
+        return service
+
+    return _create
+
+
+@pytest.mark.asyncio
+async def test_send_message_stream_coalesces_small_chunks(stream_service, mock_dialog):
+    """Test small provider chunks are merged before being yielded."""
+    service = stream_service(["Hel", "lo", " wor", "ld"])
+
+    with patch("src.domain.message_service.STREAM_FLUSH_INTERVAL", 60.0):
+        chunks = [
+            c
+            async for c in service.send_message_stream(
+                AsyncMock(), mock_dialog.id, user_id=1, data=MessageCreate(content="Hi")
+            )
+        ]
+
+    assert [c.content for c in chunks] == ["Hello world", ""]
+    assert chunks[0].done is True
+    assert chunks[0].prompt_tokens == 10
+    assert chunks[-1].message_id is not None
+    saved_content = service.message_repo.create_assistant_message.call_args.args[2]
+    assert saved_content == "Hello world"
+
+
+@pytest.mark.asyncio
+async def test_send_message_stream_flushes_at_size_threshold(stream_service, mock_dialog):
+    """Test buffer is flushed once it reaches STREAM_FLUSH_CHARS."""
+    service = stream_service(["aaaa", "bbbb", "cc"])
+
+    with (
+        patch("src.domain.message_service.STREAM_FLUSH_INTERVAL", 60.0),
+        patch("src.domain.message_service.STREAM_FLUSH_CHARS", 8),
+    ):
+        chunks = [
+            c
+            async for c in service.send_message_stream(
+                AsyncMock(), mock_dialog.id, user_id=1, data=MessageCreate(content="Hi")
+            )
+        ]
+
+    assert [(c.content, c.done) for c in chunks] == [
+        ("aaaabbbb", False),
+        ("cc", True),
+        ("", True),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_send_message_stream_flushes_while_provider_stalls(stream_service, mock_dialog):
+    """Test buffered text is yielded on the flush timer, not held until the next chunk."""
+    service = stream_service([])
+    resume = asyncio.Event()
+
+    async def generate_stream(messages, model, config=None):
+        yield ("Hel", False, None, None)
+        yield ("lo", False, None, None)
+        await resume.wait()
+        yield (" world", False, None, None)
+        yield ("", True, 10, 20)
+
+    service.llm_provider.generate_stream = generate_stream
+
+    stream = service.send_message_stream(
+        AsyncMock(), mock_dialog.id, user_id=1, data=MessageCreate(content="Hi")
+    )
+    # The provider sends nothing more until the first chunk is received
+    async with asyncio.timeout(1):
+        first = await stream.__anext__()
+    resume.set()
+    rest = [c async for c in stream]
+
+    assert first.content == "Hello"
+    assert first.done is False
+    assert [(c.content, c.done) for c in rest] == [(" world", True), ("", True)]
+
+
+# Reservation Tests
+
+
+@pytest.mark.asyncio
+async def test_zero_usage_releases_reservation(message_service, mock_dialog, mock_message):
+    """Test a response with no token usage refunds the hold instead of charging."""
+    session = AsyncMock()
+    message_service.dialog_repo.get_by_id.return_value = mock_dialog
+    message_service.message_repo.create_user_message.return_value = mock_message
+    message_service.message_repo.create_assistant_message.return_value = mock_message
+    message_service.message_repo.get_by_dialog.return_value = []
+    message_service.llm_provider.generate.return_value = ("Response", -1, 1)
+
+    await message_service.send_message(
+        session, mock_dialog.id, user_id=1, data=MessageCreate(content="Hello")
+    )
+
+    message_service.token_service.finalize_reservation.assert_not_called()
+    message_service.token_service.release_reservation.assert_called_once_with(session, 42)
+
+
+@pytest.mark.asyncio
+async def test_usage_over_reservation_rolls_back(message_service, mock_dialog, mock_message):
+    """Test usage the balance can't cover rolls back and refunds the hold."""
+    session = AsyncMock()
+    message_service.dialog_repo.get_by_id.return_value = mock_dialog
+    message_service.message_repo.create_user_message.return_value = mock_message
+    message_service.message_repo.create_assistant_message.return_value = mock_message
+    message_service.message_repo.get_by_dialog.return_value = []
+    message_service.token_service.finalize_reservation.side_effect = InsufficientTokensError(
+        "Insufficient tokens: balance=0, required=30"
+    )
+
+    with pytest.raises(InsufficientTokensError):
+        await message_service.send_message(
+            session, mock_dialog.id, user_id=1, data=MessageCreate(content="Hello")
+        )
+
+    session.rollback.assert_called_once()
+    message_service.token_service.release_reservation.assert_called_once_with(session, 42)
+
+
+@pytest.mark.asyncio
+async def test_save_failure_after_llm_releases_reservation(
+    message_service, mock_dialog, mock_message
+):
+    """Test a failure after the LLM call rolls back and refunds the whole hold."""
+    session = AsyncMock()
+    message_service.dialog_repo.get_by_id.return_value = mock_dialog
+    message_service.message_repo.create_user_message.return_value = mock_message
+    message_service.message_repo.get_by_dialog.return_value = []
+    message_service.message_repo.create_assistant_message.side_effect = RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        await message_service.send_message(
+            session, mock_dialog.id, user_id=1, data=MessageCreate(content="Hello")
+        )
+
+    session.rollback.assert_called_once()
+    message_service.token_service.release_reservation.assert_called_once_with(session, 42)
+    message_service.token_service.finalize_reservation.assert_not_called()
+    # Reservation commit, then the refund commit
+    assert session.commit.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_send_message_stream_save_failure_releases_reservation(
+    stream_service, mock_dialog
+):
+    """Test a failure saving the streamed response refunds the hold."""
+    service = stream_service(["Hello"])
+    service.message_repo.create_assistant_message.side_effect = RuntimeError("db down")
+    session = AsyncMock()
+
+    with pytest.raises(RuntimeError):
+        async for _ in service.send_message_stream(
+            session, mock_dialog.id, user_id=1, data=MessageCreate(content="Hi")
+        ):
+            pass
+
+    session.rollback.assert_called_once()
+    service.token_service.release_reservation.assert_called_once_with(session, 42)
+    service.token_service.finalize_reservation.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_send_message_stream_disconnect_releases_reservation(stream_service, mock_dialog):
+    """Test closing the stream early refunds the reservation."""
+    service = stream_service(["Hello", " world"])
+    session = AsyncMock()
+
+    with patch("src.domain.message_service.STREAM_FLUSH_INTERVAL", 0):
+        stream = service.send_message_stream(
+            session, mock_dialog.id, user_id=1, data=MessageCreate(content="Hi")
+        )
+        await stream.__anext__()
+        await stream.aclose()
+
+    session.rollback.assert_called_once()
+    service.token_service.release_reservation.assert_called_once_with(session, 42)
+    service.token_service.finalize_reservation.assert_not_called()
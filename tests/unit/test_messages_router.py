@@ -1,4 +1,5 @@
 """Unit tests for messages API routes with mocked dependencies."""
+import json
 import uuid
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock
@@ -255,6 +256,42 @@ class TestSendMessageStream:
         assert "Hello" in content
         assert "World" in content
 
+    def test_send_message_stream_encodes_utf8_frames(self, client, mock_service):
+        """Test each SSE frame is one JSON event with non-ASCII text intact."""
+        dialog_id = uuid.uuid4()
+        message_id = uuid.uuid4()
+
+        async def mock_stream(*args, **kwargs):
+            yield StreamChunk(content="Привет", done=False)
+            yield StreamChunk(
+                content="",
+                done=True,
+                message_id=message_id,
+                prompt_tokens=10,
+                completion_tokens=5,
+            )
+
+        mock_service.send_message_stream = mock_stream
+
+        response = client.post(
+            f"/api/v1/dialogs/{dialog_id}/messages",
+            json={"content": "Hello"},
+        )
+
+        frames = response.content.split(b"\n\n")
+        assert frames[-1] == b""
+        events = [json.loads(frame.removeprefix(b"data: ")) for frame in frames[:-1]]
+        assert events == [
+            {"content": "Привет", "done": False},
+            {
+                "content": "",
+                "done": True,
+                "message_id": str(message_id),
+                "prompt_tokens": 10,
+                "completion_tokens": 5,
+            },
+        ]
+
 
 class TestGetMessages:
     """Tests for GET /dialogs/{id}/messages endpoint."""
@@ -6,11 +6,16 @@ from src.shared.metrics import (
     record_http_request,
     record_llm_request,
     record_token_usage,
-    record_token_balance,
     record_dialog_created,
     record_message_sent,
     record_error,
     _normalize_path,
+    flush_metrics,
+    start_metrics_worker,
+    stop_metrics_worker,
+    warm_llm_metrics,
+    _http_requests_child,
+    _llm_requests_child,
     HTTP_REQUESTS_TOTAL,
     HTTP_REQUEST_DURATION_SECONDS,
     LLM_REQUESTS_TOTAL,
@@ -18,7 +23,6 @@ from src.shared.metrics import (
     TOKENS_USED_TOTAL,
     TOKENS_PROMPT_TOTAL,
     TOKENS_COMPLETION_TOTAL,
-    TOKEN_BALANCE,
     DIALOGS_CREATED_TOTAL,
     MESSAGES_SENT_TOTAL,
     ERRORS_TOTAL,
@@ -53,6 +57,15 @@ class TestNormalizePath:
         path = "/api/v1/users/42/"
         assert _normalize_path(path) == "/api/v1/users/{id}/"
 
+    def test_repeat_paths_are_memoized(self):
+        """Test repeat paths are served from the cache."""
+        _normalize_path.cache_clear()
+
+        _normalize_path("/api/v1/users/7/tokens")
+        _normalize_path("/api/v1/users/7/tokens")
+
+        assert _normalize_path.cache_info().hits == 1
+
 
 class TestRecordHttpRequest:
     """Tests for HTTP request metrics."""
@@ -100,6 +113,19 @@ class TestRecordHttpRequest:
         assert count >= 1
 
 
+    def test_reuses_bound_label_child(self):
+        """Test repeat label sets reuse the cached child metric."""
+        _http_requests_child.cache_clear()
+
+        record_http_request("GET", "/cached", 200, 0.1)
+        record_http_request("GET", "/cached", 200, 0.1)
+
+        assert _http_requests_child.cache_info().hits == 1
+        assert _http_requests_child("GET", "/cached", 200) is HTTP_REQUESTS_TOTAL.labels(
+            method="GET", path="/cached", status_code="200"
+        )
+
+
 class TestRecordLlmRequest:
     """Tests for LLM request metrics."""
 
@@ -165,31 +191,15 @@ class TestRecordTokenUsage:
 
     def test_records_token_usage(self):
         """Test token usage is recorded."""
-        initial = TOKENS_USED_TOTAL.labels(user_id="999", model="test-model")._value.get()
-
-        record_token_usage(999, "test-model", 500)
-
-        assert TOKENS_USED_TOTAL.labels(
-            user_id="999",
-            model="test-model",
-        )._value.get() == initial + 500
-
-
-class TestRecordTokenBalance:
-    """Tests for token balance metrics."""
-
-    def test_records_token_balance(self):
-        """Test token balance is set."""
-        record_token_balance(888, 10000)
+        initial = TOKENS_USED_TOTAL.labels(model="test-model")._value.get()
 
-        assert TOKEN_BALANCE.labels(user_id="888")._value.get() == 10000
+        record_token_usage("test-model", 500)
 
-    def test_updates_token_balance(self):
-        """Test token balance updates correctly."""
-        record_token_balance(777, 5000)
-        record_token_balance(777, 4500)
+        assert TOKENS_USED_TOTAL.labels(model="test-model")._value.get() == initial + 500
 
-        assert TOKEN_BALANCE.labels(user_id="777")._value.get() == 4500
+    def test_has_no_per_user_label(self):
+        """Test token usage is aggregated by model, not by user."""
+        assert TOKENS_USED_TOTAL._labelnames == ("model",)
 
 
 class TestRecordDialogCreated:
@@ -253,3 +263,58 @@ class TestRecordError:
             path="/api/v1/dialogs/{id}",
         )._value.get()
         assert count >= 1
+
+
+class TestMetricsWorker:
+    """Tests for the background metrics worker."""
+
+    @pytest.mark.asyncio
+    async def test_worker_applies_queued_updates(self):
+        """Test updates are deferred to the worker and applied on flush."""
+        counter = HTTP_REQUESTS_TOTAL.labels(method="PUT", path="/queued", status_code="200")
+        initial = counter._value.get()
+
+        start_metrics_worker()
+        try:
+            record_http_request("PUT", "/queued", 200, 0.1)
+            record_http_request("PUT", "/queued", 200, 0.1)
+            assert counter._value.get() == initial
+
+            await flush_metrics()
+            assert counter._value.get() == initial + 2
+        finally:
+            await stop_metrics_worker()
+
+    @pytest.mark.asyncio
+    async def test_stop_applies_pending_updates_and_reverts_to_inline(self):
+        """Test stop drains the queue and later updates apply immediately."""
+        counter = ERRORS_TOTAL.labels(error_type="QUEUED", path="/stop")
+        initial = counter._value.get()
+
+        start_metrics_worker()
+        record_error("QUEUED", "/stop")
+        await stop_metrics_worker()
+        assert counter._value.get() == initial + 1
+
+        record_error("QUEUED", "/stop")
+        assert counter._value.get() == initial + 2
+
+
+class TestWarmLlmMetrics:
+    """Tests for pre-creating LLM metric children."""
+
+    def test_creates_children_for_each_status(self):
+        """Test every status child exists before the first request."""
+        _llm_requests_child.cache_clear()
+
+        warm_llm_metrics([("openai", "warm-model")])
+
+        assert _llm_requests_child.cache_info().currsize == 3
+        samples = {
+            sample.labels["status"]
+            for metric in REGISTRY.collect()
+            if metric.name == "llm_requests"
+            for sample in metric.samples
+            if sample.labels.get("model") == "warm-model"
+        }
+        assert samples == {"success", "error", "timeout"}
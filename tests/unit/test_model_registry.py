@@ -199,6 +199,35 @@ def test_estimate_tokens_very_short(registry):
     assert tokens == 1  # Minimum 1 token
 
 
+def test_estimate_request_tokens_default_reserve(registry):
+    """Test request estimate adds the default completion reserve."""
+    tokens = registry.estimate_request_tokens("a" * 400, "gpt-3.5-turbo")
+
+    assert tokens == 100 + 100  # 400 chars / 4 + default reserve
+
+
+def test_estimate_request_tokens_uses_max_tokens(registry):
+    """Test request estimate honours an explicit completion limit."""
+    tokens = registry.estimate_request_tokens("a" * 400, "gpt-4-turbo", max_completion_tokens=2000)
+
+    assert tokens == 100 + 2000
+
+
+def test_estimate_request_tokens_capped_by_context_window(registry):
+    """Test completion reserve never exceeds the room left in the context window."""
+    text = "a" * (16000 * 4)  # 16000 prompt tokens, context window 16385
+    tokens = registry.estimate_request_tokens(text, "gpt-3.5-turbo", max_completion_tokens=4096)
+
+    assert tokens == 16385
+
+
+def test_estimate_request_tokens_unknown_model(registry):
+    """Test request estimate falls back to the uncapped reserve for unknown models."""
+    tokens = registry.estimate_request_tokens("a" * 400, "unknown-model")
+
+    assert tokens == 200
+
+
 # Model Exists and Get Model Tests
 
 
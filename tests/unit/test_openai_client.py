@@ -1,10 +1,20 @@
 """Unit tests for OpenAI client adapter with mocked API calls."""
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from openai import APIConnectionError, APIStatusError, APITimeoutError
-
-from src.integrations.openai_client import OpenAIClient, OpenAIProvider, TokenUsage
+from openai import DEFAULT_CONNECTION_LIMITS, APIConnectionError, APIStatusError, APITimeoutError
+
+import src.integrations.openai_client as openai_module
+from src.integrations.http_pool import close_shared_http_clients, get_shared_http_client
+from src.integrations.openai_client import (
+    OpenAIClient,
+    OpenAIProvider,
+    TokenUsage,
+    close_openai_provider,
+    get_openai_provider,
+)
 from src.shared.exceptions import LLMError, LLMTimeoutError
 
 
@@ -46,6 +56,17 @@ def mock_stream_chunks():
     return chunks
 
 
+class _FakeStream:
+    """Async-iterable stand-in for the SDK's AsyncStream."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self.close = AsyncMock()
+
+    def __aiter__(self):
+        return self._chunks
+
+
 class TestOpenAIClient:
     """Tests for OpenAIClient class."""
 
@@ -145,7 +166,7 @@ class TestOpenAIClient:
         with patch.object(client, "_get_client") as mock_get_client:
             mock_async_client = AsyncMock()
             mock_async_client.chat.completions.create = AsyncMock(
-                return_value=mock_stream()
+                return_value=_FakeStream(mock_stream())
             )
             mock_get_client.return_value = mock_async_client
 
@@ -163,6 +184,33 @@ class TestOpenAIClient:
             assert client.get_usage() is not None
             assert client.get_usage().prompt_tokens == 10
             assert client.get_usage().completion_tokens == 7
+            mock_async_client.chat.completions.create.return_value.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_streaming_closes_stream_on_early_exit(self, mock_stream_chunks):
+        """Test an abandoned stream still releases its connection."""
+        client = OpenAIClient(api_key="test-key")
+
+        async def mock_stream():
+            for chunk in mock_stream_chunks:
+                yield chunk
+
+        stream = _FakeStream(mock_stream())
+        with patch.object(client, "_get_client") as mock_get_client:
+            mock_async_client = AsyncMock()
+            mock_async_client.chat.completions.create = AsyncMock(return_value=stream)
+            mock_get_client.return_value = mock_async_client
+
+            result = await client.send_message(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": "Hello"}],
+                stream=True,
+            )
+            async for _ in result:
+                break
+            await result.aclose()
+
+        stream.close.assert_awaited_once()
 
     @pytest.mark.asyncio
     async def test_timeout_error(self):
@@ -257,6 +305,30 @@ class TestOpenAIClient:
 
             assert "server error" in exc_info.value.message
 
+    @pytest.mark.asyncio
+    async def test_client_error_hides_api_key(self):
+        """Test other 4xx errors pass the message through with key details scrubbed."""
+        client = OpenAIClient(api_key="test-key")
+
+        with patch.object(client, "_get_client") as mock_get_client:
+            mock_async_client = AsyncMock()
+            error = APIStatusError(
+                message="Bad api_key format: sk-123",
+                response=MagicMock(status_code=400),
+                body=None,
+            )
+            mock_async_client.chat.completions.create = AsyncMock(side_effect=error)
+            mock_get_client.return_value = mock_async_client
+
+            with pytest.raises(LLMError) as exc_info:
+                await client.send_message(
+                    model="gpt-3.5-turbo",
+                    messages=[{"role": "user", "content": "Hello"}],
+                    stream=False,
+                )
+
+            assert exc_info.value.message == "OpenAI API error: Invalid API key"
+
     @pytest.mark.asyncio
     async def test_connection_error(self):
         """Test connection error handling."""
@@ -290,7 +362,7 @@ class TestOpenAIClient:
         with patch.object(client, "_get_client") as mock_get_client:
             mock_async_client = AsyncMock()
             mock_async_client.chat.completions.create = AsyncMock(
-                return_value=mock_stream_with_timeout()
+                return_value=_FakeStream(mock_stream_with_timeout())
             )
             mock_get_client.return_value = mock_async_client
 
@@ -315,9 +387,31 @@ class TestOpenAIClient:
 
         await client.close()
 
-        mock_async_client.close.assert_called_once()
+        # The connection pool is shared, so it must stay open
+        mock_async_client.close.assert_not_called()
         assert client._client is None
 
+    @pytest.mark.asyncio
+    async def test_get_client_uses_shared_pool(self):
+        """Test the SDK client runs on the process-wide HTTP client."""
+        client = OpenAIClient(api_key="test-key")
+
+        sdk_client = client._get_client()
+
+        try:
+            assert sdk_client._client is get_shared_http_client(DEFAULT_CONNECTION_LIMITS)
+        finally:
+            await close_shared_http_clients()
+
+    def test_get_client_builds_one_client_across_threads(self):
+        """Test concurrent first calls share a single SDK client and pool."""
+        client = OpenAIClient(api_key="test-key")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: client._get_client(), range(32)))
+
+        assert all(result is results[0] for result in results)
+
     @pytest.mark.asyncio
     async def test_close_client_when_none(self):
         """Test closing client when not initialized."""
@@ -392,60 +486,115 @@ class TestOpenAIProvider:
         assert completion_tokens == 0
 
     @pytest.mark.asyncio
-    async def test_generate_stream_yields_chunks(self):
-        """Test generate_stream yields correct tuples."""
-        mock_client = MagicMock()
+    async def test_generate_stream_yields_chunks(self, mock_stream_chunks):
+        """Test generate_stream yields correct tuples straight off the SDK stream."""
+        client = OpenAIClient(api_key="test-key")
 
         async def mock_stream():
-            yield "Hello"
-            yield " World"
+            for chunk in mock_stream_chunks:
+                yield chunk
 
-        mock_client.send_message = AsyncMock(return_value=mock_stream())
-        mock_client.get_usage.return_value = TokenUsage(15, 5, 20)
+        with patch.object(client, "_get_client") as mock_get_client:
+            mock_async_client = AsyncMock()
+            mock_async_client.chat.completions.create = AsyncMock(
+                return_value=_FakeStream(mock_stream())
+            )
+            mock_get_client.return_value = mock_async_client
 
-        provider = OpenAIProvider(client=mock_client)
+            provider = OpenAIProvider(client=client)
 
-        chunks = []
-        async for chunk in provider.generate_stream(
-            messages=[{"role": "user", "content": "Hi"}],
-            model="gpt-3.5-turbo",
-        ):
-            chunks.append(chunk)
+            chunks = []
+            async for chunk in provider.generate_stream(
+                messages=[{"role": "user", "content": "Hi"}],
+                model="gpt-3.5-turbo",
+            ):
+                chunks.append(chunk)
 
         # Content chunks
         assert chunks[0] == ("Hello", False, None, None)
-        assert chunks[1] == (" World", False, None, None)
+        assert chunks[1] == ("!", False, None, None)
+        assert "".join(c[0] for c in chunks) == "Hello! How can I help?"
 
-        # Final chunk with usage
-        assert chunks[2][1] is True  # done=True
-        assert chunks[2][2] == 15  # prompt_tokens
-        assert chunks[2][3] == 5  # completion_tokens
+        # Last delta rides on the final chunk with usage; no extra empty event
+        assert chunks[-1] == ("?", True, 10, 7)
+        assert len(chunks) == 7
+        assert sum(1 for c in chunks if c[1]) == 1
 
     @pytest.mark.asyncio
-    async def test_generate_stream_handles_no_usage(self):
+    async def test_generate_stream_handles_no_usage(self, mock_stream_chunks):
         """Test generate_stream handles missing usage."""
-        mock_client = MagicMock()
+        client = OpenAIClient(api_key="test-key")
 
         async def mock_stream():
-            yield "Response"
+            for chunk in mock_stream_chunks[:-1]:
+                yield chunk
 
-        mock_client.send_message = AsyncMock(return_value=mock_stream())
-        mock_client.get_usage.return_value = None
+        with patch.object(client, "_get_client") as mock_get_client:
+            mock_async_client = AsyncMock()
+            mock_async_client.chat.completions.create = AsyncMock(
+                return_value=_FakeStream(mock_stream())
+            )
+            mock_get_client.return_value = mock_async_client
+
+            provider = OpenAIProvider(client=client)
+
+            chunks = []
+            async for chunk in provider.generate_stream(
+                messages=[{"role": "user", "content": "Hi"}],
+                model="gpt-3.5-turbo",
+            ):
+                chunks.append(chunk)
+
+        # Final chunk should have 0 for tokens
+        final = chunks[-1]
+        assert final == ("?", True, 0, 0)
+        assert "".join(c[0] for c in chunks) == "Hello! How can I help?"
+
+    @pytest.mark.asyncio
+    async def test_generate_stream_close_closes_client_stream(self):
+        """Test closing generate_stream early closes the client's stream."""
+        closed = False
+
+        async def stream_events(**kwargs):
+            nonlocal closed
+            try:
+                yield ("Hello", False, None, None)
+                yield ("!", True, 1, 1)
+            finally:
+                closed = True
 
+        mock_client = MagicMock()
+        mock_client.stream_events = stream_events
         provider = OpenAIProvider(client=mock_client)
 
-        chunks = []
-        async for chunk in provider.generate_stream(
+        stream = provider.generate_stream(
             messages=[{"role": "user", "content": "Hi"}],
             model="gpt-3.5-turbo",
-        ):
-            chunks.append(chunk)
+        )
+        assert await stream.__anext__() == ("Hello", False, None, None)
+        await stream.aclose()
 
-        # Final chunk should have 0 for tokens
-        final = chunks[-1]
-        assert final[1] is True
-        assert final[2] == 0
-        assert final[3] == 0
+        assert closed
+
+
+class TestGetOpenAIProvider:
+    """Tests for the process-wide provider accessor."""
+
+    def test_returns_same_instance(self):
+        """Test repeated calls share one provider."""
+        assert get_openai_provider() is get_openai_provider()
+
+    @pytest.mark.asyncio
+    async def test_close_releases_shared_provider(self):
+        """Test close shuts the pool and the next call builds a fresh provider."""
+        provider = get_openai_provider()
+        provider._client.close = AsyncMock()
+
+        await close_openai_provider()
+
+        provider._client.close.assert_awaited_once()
+        assert openai_module._DEFAULT_PROVIDER is None
+        assert get_openai_provider() is not provider
 
 
 class TestTokenUsage:
@@ -0,0 +1,177 @@
+"""Unit tests for repository query methods with a mocked session."""
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from src.data.models import TokenBalance
+from src.data.repositories import (
+    STALE_BALANCES_INFO_KEY,
+    TokenBalanceRepository,
+    _balance_invalidations,
+)
+
+
+@pytest.fixture
+def session():
+    """Create a mocked async session with an empty identity map."""
+    session = AsyncMock()
+    session.info = {}
+    session.identity_map = {}
+    session.identity_key = MagicMock(side_effect=lambda cls, ident: (cls, ident))
+    return session
+
+
+def _result(row):
+    result = MagicMock()
+    result.one_or_none.return_value = row
+    return result
+
+
+@pytest.mark.asyncio
+async def test_deduct_with_transaction_single_statement(session):
+    """Test check, update and insert are issued as one CTE statement."""
+    now = datetime.now(timezone.utc)
+    row = MagicMock(balance=900, limit=None, updated_at=now, id=7, created_at=now)
+    session.execute.return_value = _result(row)
+    dialog_id, message_id = uuid.uuid4(), uuid.uuid4()
+
+    balance, transaction = await TokenBalanceRepository().deduct_with_transaction(
+        session, 1, 100, dialog_id, message_id
+    )
+
+    session.execute.assert_called_once()
+    sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH upd AS")
+    assert "UPDATE token_balances" in sql
+    assert "INSERT INTO token_transactions" in sql
+
+    assert balance.balance == 900
+    assert transaction.id == 7
+    assert transaction.amount == -100
+    assert transaction.reason == "llm_usage"
+    assert transaction.message_id == message_id
+    assert session.info[STALE_BALANCES_INFO_KEY] == {1}
+
+
+@pytest.mark.asyncio
+async def test_deduct_with_transaction_insufficient_returns_none(session):
+    """Test no row returned means nothing was deducted."""
+    session.execute.return_value = _result(None)
+
+    result = await TokenBalanceRepository().deduct_with_transaction(
+        session, 1, 100, uuid.uuid4(), uuid.uuid4()
+    )
+
+    assert result is None
+    assert STALE_BALANCES_INFO_KEY not in session.info
+
+
+@pytest.mark.asyncio
+async def test_deduct_with_transaction_updates_loaded_balance(session):
+    """Test a balance already in the session reflects the new value."""
+    now = datetime.now(timezone.utc)
+    loaded = TokenBalance(user_id=1, balance=1000, limit=None, updated_at=now)
+    session.identity_map = {(TokenBalance, 1): loaded}
+    row = MagicMock(balance=900, limit=None, updated_at=now, id=7, created_at=now)
+    session.execute.return_value = _result(row)
+
+    balance, _ = await TokenBalanceRepository().deduct_with_transaction(
+        session, 1, 100, uuid.uuid4(), uuid.uuid4()
+    )
+
+    assert balance is loaded
+    assert loaded.balance == 900
+
+
+@pytest.mark.asyncio
+async def test_reserve_single_statement(session):
+    """Test the hold and the reservation insert are one CTE statement."""
+    now = datetime.now(timezone.utc)
+    session.execute.return_value = _result(MagicMock(balance=850, updated_at=now, id=42))
+
+    reservation_id = await TokenBalanceRepository().reserve(session, 1, 150, uuid.uuid4())
+
+    sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH upd AS")
+    assert "INSERT INTO token_reservations" in sql
+    assert reservation_id == 42
+    assert session.info[STALE_BALANCES_INFO_KEY] == {1}
+
+
+@pytest.mark.asyncio
+async def test_finalize_reservation_refunds_hold_and_charges_usage(session):
+    """Test finalization deletes the hold and records usage in one statement."""
+    now = datetime.now(timezone.utc)
+    row = MagicMock(balance=970, limit=None, updated_at=now, id=8, created_at=now)
+    session.execute.return_value = _result(row)
+
+    balance, transaction = await TokenBalanceRepository().finalize_reservation(
+        session, 42, 1, 30, uuid.uuid4(), uuid.uuid4()
+    )
+
+    sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH res AS")
+    assert "DELETE FROM token_reservations" in sql
+    assert "INSERT INTO token_transactions" in sql
+    assert balance.balance == 970
+    assert transaction.amount == -30
+
+
+@pytest.mark.asyncio
+async def test_finalize_reservation_insufficient_returns_available(session):
+    """Test an uncovered charge returns the balance plus the hold."""
+    row = MagicMock(available=40, balance=None, limit=None, updated_at=None, id=None)
+    session.execute.return_value = _result(row)
+
+    result = await TokenBalanceRepository().finalize_reservation(
+        session, 42, 1, 50, uuid.uuid4(), uuid.uuid4()
+    )
+
+    assert result == 40
+    assert STALE_BALANCES_INFO_KEY not in session.info
+
+
+@pytest.mark.asyncio
+async def test_finalize_reservation_missing_returns_none(session):
+    """Test no row means the reservation no longer exists."""
+    session.execute.return_value = _result(None)
+
+    result = await TokenBalanceRepository().finalize_reservation(
+        session, 42, 1, 50, uuid.uuid4(), uuid.uuid4()
+    )
+
+    assert result is None
+
+
+@pytest.mark.asyncio
+async def test_release_reservation_missing_returns_false(session):
+    """Test releasing an already-released reservation is a no-op."""
+    session.execute.return_value = _result(None)
+
+    released = await TokenBalanceRepository().release_reservation(session, 42)
+
+    assert released is False
+    assert STALE_BALANCES_INFO_KEY not in session.info
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("end", ["commit", "rollback"])
+async def test_transaction_end_invalidates_written_balances(end):
+    """Test cached balances written in a transaction are dropped once it ends."""
+    sync_session = Session()
+    sync_session.begin()
+    sync_session.info[STALE_BALANCES_INFO_KEY] = {1, 2}
+
+    with patch("src.data.repositories.cache_service") as cache:
+        cache.invalidate_balance = AsyncMock()
+        getattr(sync_session, end)()
+        await asyncio.gather(*_balance_invalidations)
+
+    invalidated = sorted(call.args[0] for call in cache.invalidate_balance.call_args_list)
+    assert invalidated == [1, 2]
+    assert STALE_BALANCES_INFO_KEY not in sync_session.info
@@ -1,18 +1,34 @@
 """Unit tests for Pydantic schema validation."""
+import uuid
+from dataclasses import FrozenInstanceError
+from datetime import datetime, timezone
+from types import SimpleNamespace
 from unittest.mock import patch
 
 import pytest
 from pydantic import ValidationError
 
 from src.shared.schemas import (
+    AdminActionEvent,
     AgentConfig,
+    AuditLogResponse,
     DialogCreate,
+    DialogResponse,
     MessageCreate,
+    MessageResponse,
+    MessageSentEvent,
+    SetLimitDetails,
     SetLimitRequest,
+    StreamChunk,
+    TokenAdjustDetails,
+    TokenBalanceResponse,
     TokenDeductRequest,
+    TokenTransactionResponse,
     TopUpTokensRequest,
 )
 
+_NOW = datetime.now(timezone.utc)
+
 
 class TestMessageCreate:
     """Tests for MessageCreate schema."""
@@ -30,10 +46,8 @@ class TestMessageCreate:
 
     def test_content_exceeds_max_length(self):
         """Test content exceeding max length is rejected."""
-        # Patch settings to use a small max length for testing
-        with patch("src.config.settings.settings") as mock_settings:
-            mock_settings.max_content_length = 100
-
+        # Patch the bound limit to a small max length for testing
+        with patch("src.shared.schemas._MAX_CONTENT_LENGTH", 100):
             # Content that exceeds the limit
             long_content = "x" * 150
             with pytest.raises(ValidationError) as exc_info:
@@ -43,9 +57,7 @@ class TestMessageCreate:
 
     def test_content_at_max_length(self):
         """Test content exactly at max length is accepted."""
-        with patch("src.config.settings.settings") as mock_settings:
-            mock_settings.max_content_length = 100
-
+        with patch("src.shared.schemas._MAX_CONTENT_LENGTH", 100):
             # Content exactly at limit
             content = "x" * 100
             msg = MessageCreate(content=content)
@@ -144,6 +156,14 @@ class TestDialogCreate:
         dialog = DialogCreate(title=title)
         assert len(dialog.title) == 255
 
+    def test_agent_config_validated(self):
+        """Test agent_config is parsed into AgentConfig with its bounds."""
+        dialog = DialogCreate(agent_config={"temperature": 0.7, "max_tokens": 1000})
+        assert dialog.agent_config == AgentConfig(temperature=0.7, max_tokens=1000)
+
+        with pytest.raises(ValidationError):
+            DialogCreate(agent_config={"temperature": 1.5})
+
 
 class TestTokenDeductRequest:
     """Tests for TokenDeductRequest schema."""
@@ -217,3 +237,141 @@ class TestTopUpTokensRequest:
         """Test zero amount is allowed (no-op)."""
         req = TopUpTokensRequest(amount=0)
         assert req.amount == 0
+
+
+class TestStreamChunk:
+    """Tests for StreamChunk value object."""
+
+    def test_defaults(self):
+        """Test optional fields default to empty values."""
+        chunk = StreamChunk(content="Hi")
+        assert chunk.done is False
+        assert chunk.message_id is None
+        assert chunk.prompt_tokens is None
+        assert chunk.completion_tokens is None
+
+    def test_slotted(self):
+        """Test chunk has no per-instance __dict__."""
+        chunk = StreamChunk(content="Hi")
+        assert not hasattr(chunk, "__dict__")
+        # Frozen + slots raises TypeError rather than AttributeError on 3.11
+        with pytest.raises((AttributeError, TypeError)):
+            chunk.extra = 1
+
+    def test_frozen(self):
+        """Test chunk fields cannot be reassigned."""
+        chunk = StreamChunk(content="Hi")
+        with pytest.raises(FrozenInstanceError):
+            chunk.content = "Bye"
+
+
+class TestMessageSentEvent:
+    """Tests for MessageSentEvent value object."""
+
+    def test_event_type_default(self):
+        """Test event_type defaults to message_sent."""
+        event = MessageSentEvent(
+            dialog_id=uuid.uuid4(),
+            user_id=1,
+            message_id=uuid.uuid4(),
+            content_length=5,
+            timestamp=datetime.now(timezone.utc),
+        )
+        assert event.event_type == "message_sent"
+
+
+class TestAdminActionEvent:
+    """Tests for AdminActionEvent details."""
+
+    @pytest.mark.parametrize(
+        ("details", "expected"),
+        [
+            ({"amount": 50, "new_balance": 150}, TokenAdjustDetails),
+            ({"limit": 1000}, SetLimitDetails),
+            ({"limit": None}, SetLimitDetails),
+        ],
+    )
+    def test_details_parsed_into_submodel(self, details, expected):
+        """Test details dicts resolve to the matching typed submodel."""
+        event = AdminActionEvent(
+            event_type="admin_action",
+            admin_user_id=1,
+            target_user_id=2,
+            action="top_up",
+            details=details,
+            timestamp=_NOW,
+        )
+        assert isinstance(event.details, expected)
+        assert event.details.model_dump() == details
+
+
+class TestFromOrmFast:
+    """Tests for the trusted ORM-row constructors on response schemas."""
+
+    @pytest.mark.parametrize(
+        ("schema", "row"),
+        [
+            (
+                DialogResponse,
+                SimpleNamespace(
+                    id=uuid.uuid4(),
+                    user_id=1,
+                    title="Chat",
+                    system_prompt=None,
+                    model_name="gpt-4",
+                    agent_config={"temperature": 0.5},
+                    created_at=_NOW,
+                    updated_at=_NOW,
+                ),
+            ),
+            (
+                MessageResponse,
+                SimpleNamespace(
+                    id=uuid.uuid4(),
+                    dialog_id=uuid.uuid4(),
+                    role="assistant",
+                    content="Hi",
+                    prompt_tokens=3,
+                    completion_tokens=5,
+                    created_at=_NOW,
+                ),
+            ),
+            (
+                TokenBalanceResponse,
+                SimpleNamespace(user_id=1, balance=100, limit=None, updated_at=_NOW),
+            ),
+            (
+                TokenTransactionResponse,
+                SimpleNamespace(
+                    id=7,
+                    user_id=1,
+                    amount=-10,
+                    reason="llm_usage",
+                    dialog_id=uuid.uuid4(),
+                    message_id=None,
+                    admin_user_id=None,
+                    created_at=_NOW,
+                ),
+            ),
+            (
+                AuditLogResponse,
+                SimpleNamespace(
+                    id=3,
+                    user_id=None,
+                    action="login",
+                    resource_type="user",
+                    resource_id=None,
+                    details={"ok": True},
+                    ip_address="127.0.0.1",
+                    user_agent=None,
+                    created_at=_NOW,
+                ),
+            ),
+        ],
+    )
+    def test_matches_model_validate(self, schema, row):
+        """Test the fast path builds the same model as validation."""
+        fast = schema.from_orm_fast(row)
+
+        assert fast == schema.model_validate(row)
+        assert fast.model_fields_set == set(schema.model_fields)
@@ -1,6 +1,6 @@
 """Unit tests for TokenService with mocked repositories."""
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -8,7 +8,7 @@ import pytest
 from src.data.models import TokenBalance, TokenTransaction
 from src.domain.token_service import TokenService
 from src.shared.exceptions import ForbiddenError, InsufficientTokensError
-from src.shared.schemas import TokenEvent
+from src.shared.schemas import TokenBalanceResponse, TokenEvent, TokenTransactionResponse
 
 
 @pytest.fixture
@@ -74,6 +74,7 @@ async def test_check_balance_insufficient(token_service, mock_balance):
     token_service.register_event_handler(lambda e: emitted_events.append(e))
 
     result = await token_service.check_balance(session, user_id=1, estimated_cost=500)
+    await token_service.flush_events()
 
     assert result is False
     # Should emit balance_exhausted event
@@ -105,19 +106,18 @@ async def test_deduct_tokens_success(token_service, mock_balance, mock_transacti
     dialog_id = uuid.uuid4()
     message_id = uuid.uuid4()
 
-    mock_balance.balance = 1000
-    token_service.balance_repo.get_or_create.return_value = mock_balance
-
     updated_balance = MagicMock(spec=TokenBalance)
     updated_balance.user_id = 1
     updated_balance.balance = 900  # After deduction
     updated_balance.limit = None
     updated_balance.updated_at = datetime.now(timezone.utc)
-    token_service.balance_repo.deduct_tokens.return_value = updated_balance
 
     mock_transaction.dialog_id = dialog_id
     mock_transaction.message_id = message_id
-    token_service.transaction_repo.create_llm_usage_transaction.return_value = mock_transaction
+    token_service.balance_repo.deduct_with_transaction.return_value = (
+        updated_balance,
+        mock_transaction,
+    )
 
     # Track emitted events
     emitted_events = []
@@ -131,12 +131,47 @@ async def test_deduct_tokens_success(token_service, mock_balance, mock_transacti
     assert transaction_resp.amount == -100
     assert transaction_resp.reason == "llm_usage"
 
+    await token_service.flush_events()
     # Should emit tokens_deducted event
     assert len(emitted_events) == 1
     assert emitted_events[0].event_type == "tokens_deducted"
     assert emitted_events[0].amount == 100
     assert emitted_events[0].new_balance == 900
 
+    # Single fused statement - no separate balance read
+    token_service.balance_repo.deduct_with_transaction.assert_called_once_with(
+        session, 1, 100, dialog_id, message_id
+    )
+    token_service.balance_repo.get_or_create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_deduct_tokens_emits_single_event(token_service, mock_transaction):
+    """Test a successful deduction never emits 'balance_exhausted'."""
+    session = AsyncMock()
+    updated_balance = MagicMock(spec=TokenBalance)
+    updated_balance.user_id = 1
+    updated_balance.balance = 0
+    updated_balance.limit = None
+    updated_balance.updated_at = datetime.now(timezone.utc)
+    token_service.balance_repo.deduct_with_transaction.return_value = (
+        updated_balance,
+        mock_transaction,
+    )
+
+    emitted_events = []
+    token_service.register_event_handler(lambda e: emitted_events.append(e))
+
+    await token_service.deduct_tokens(
+        session, user_id=1, amount=100, dialog_id=uuid.uuid4(), message_id=uuid.uuid4()
+    )
+
+    await token_service.flush_events()
+    assert [e.event_type for e in emitted_events] == ["tokens_deducted"]
+    # Events skip validation but must still be valid TokenEvents
+    event = emitted_events[0]
+    assert event == TokenEvent.model_validate(event.model_dump())
+
 
 @pytest.mark.asyncio
 async def test_deduct_tokens_insufficient_balance(token_service, mock_balance):
@@ -147,6 +182,7 @@ async def test_deduct_tokens_insufficient_balance(token_service, mock_balance):
 
     mock_balance.balance = 50
     token_service.balance_repo.get_or_create.return_value = mock_balance
+    token_service.balance_repo.deduct_with_transaction.return_value = None
 
     # Track emitted events
     emitted_events = []
@@ -161,6 +197,7 @@ async def test_deduct_tokens_insufficient_balance(token_service, mock_balance):
     assert "balance=50" in str(exc_info.value.message)
     assert "required=100" in str(exc_info.value.message)
 
+    await token_service.flush_events()
     # Should emit balance_exhausted event
     assert len(emitted_events) == 1
     assert emitted_events[0].event_type == "balance_exhausted"
@@ -293,6 +330,7 @@ async def test_admin_deduct_emits_exhausted_event_when_negative(
         session, user_id=1, amount=-500, admin_user_id=999, is_admin=True
     )
 
+    await token_service.flush_events()
     # Should emit balance_exhausted event
     assert len(emitted_events) == 1
     assert emitted_events[0].event_type == "balance_exhausted"
@@ -315,6 +353,18 @@ async def test_get_balance(token_service, mock_balance):
     assert result.balance == 1000
 
 
+@pytest.mark.asyncio
+async def test_get_balance_matches_validated_response(token_service, mock_balance):
+    """Test the unvalidated balance response equals a fully validated one."""
+    session = AsyncMock()
+    token_service.balance_repo.get_or_create.return_value = mock_balance
+
+    result = await token_service.get_balance(session, user_id=1)
+
+    assert result == TokenBalanceResponse.model_validate(mock_balance)
+    assert result.model_dump(mode="json")["updated_at"]
+
+
 # Transaction History Tests
 
 
@@ -329,7 +379,9 @@ async def test_get_transaction_history(token_service, mock_transaction):
     result = await token_service.get_transaction_history(session, user_id=1)
 
     assert len(result) == 1
+    assert isinstance(result[0], TokenTransactionResponse)
     assert result[0].user_id == 1
+    assert result[0].message_id == mock_transaction.message_id
     token_service.transaction_repo.get_by_user.assert_called_once_with(session, 1, 0, 100)
 
 
@@ -362,6 +414,7 @@ async def test_event_handler_registration(token_service, mock_balance):
     token_service.register_event_handler(lambda e: events_handler2.append(e))
 
     await token_service.check_balance(session, user_id=1, estimated_cost=100)
+    await token_service.flush_events()
 
     # Both handlers should receive the event
     assert len(events_handler1) == 1
@@ -384,4 +437,153 @@ async def test_event_handler_error_does_not_propagate(token_service, mock_balanc
 
     # Should not raise exception
     result = await token_service.check_balance(session, user_id=1, estimated_cost=100)
+    await token_service.flush_events()
     assert result is False
+
+
+@pytest.mark.asyncio
+async def test_emit_event_does_not_run_handlers_inline(token_service, mock_balance):
+    """Test handlers run in the background, not on the request path."""
+    session = AsyncMock()
+    mock_balance.balance = 50
+    token_service.balance_repo.get_or_create.return_value = mock_balance
+
+    received = []
+
+    async def async_handler(event):
+        received.append(event)
+
+    token_service.register_event_handler(async_handler)
+
+    await token_service.check_balance(session, user_id=1, estimated_cost=100)
+    assert received == []
+
+    await token_service.flush_events()
+    assert len(received) == 1
+    assert received[0].event_type == "balance_exhausted"
+
+
+# Reservation Tests
+
+
+@pytest.mark.asyncio
+async def test_reserve_tokens_returns_reservation_id(token_service):
+    """Test a covered estimate is held and its reservation ID returned."""
+    session = AsyncMock()
+    dialog_id = uuid.uuid4()
+    token_service.balance_repo.reserve.return_value = 42
+
+    reservation_id = await token_service.reserve_tokens(session, 1, 150, dialog_id)
+
+    assert reservation_id == 42
+    token_service.balance_repo.reserve.assert_called_once_with(session, 1, 150, dialog_id)
+    token_service.balance_repo.get_or_create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reserve_tokens_insufficient(token_service, mock_balance):
+    """Test an uncovered estimate raises and emits balance_exhausted."""
+    session = AsyncMock()
+    mock_balance.balance = 100
+    token_service.balance_repo.reserve.return_value = None
+    token_service.balance_repo.get_or_create.return_value = mock_balance
+    emitted_events = []
+    token_service.register_event_handler(lambda e: emitted_events.append(e))
+
+    with pytest.raises(InsufficientTokensError) as exc_info:
+        await token_service.reserve_tokens(session, 1, 150, uuid.uuid4())
+
+    assert "Estimated cost: 150" in exc_info.value.message
+    await token_service.flush_events()
+    assert emitted_events[0].event_type == "balance_exhausted"
+    assert emitted_events[0].new_balance == 100
+
+
+@pytest.mark.asyncio
+async def test_finalize_reservation_success(token_service, mock_balance, mock_transaction):
+    """Test finalization charges actual usage and emits tokens_deducted."""
+    session = AsyncMock()
+    dialog_id, message_id = uuid.uuid4(), uuid.uuid4()
+    token_service.balance_repo.finalize_reservation.return_value = (mock_balance, mock_transaction)
+    emitted_events = []
+    token_service.register_event_handler(lambda e: emitted_events.append(e))
+
+    balance_resp, _ = await token_service.finalize_reservation(
+        session, 42, 1, 30, dialog_id, message_id
+    )
+
+    assert balance_resp.balance == 1000
+    token_service.balance_repo.finalize_reservation.assert_called_once_with(
+        session, 42, 1, 30, dialog_id, message_id
+    )
+    token_service.balance_repo.deduct_with_transaction.assert_not_called()
+    await token_service.flush_events()
+    assert [e.event_type for e in emitted_events] == ["tokens_deducted"]
+
+
+@pytest.mark.asyncio
+async def test_finalize_missing_reservation_falls_back_to_deduct(
+    token_service, mock_balance, mock_transaction
+):
+    """Test a reservation released meanwhile is charged as a plain deduction."""
+    session = AsyncMock()
+    token_service.balance_repo.finalize_reservation.return_value = None
+    token_service.balance_repo.deduct_with_transaction.return_value = (
+        mock_balance,
+        mock_transaction,
+    )
+
+    await token_service.finalize_reservation(session, 42, 1, 30, uuid.uuid4(), uuid.uuid4())
+
+    token_service.balance_repo.deduct_with_transaction.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_finalize_reservation_insufficient_raises(token_service):
+    """Test usage beyond balance plus hold raises without a second deduction."""
+    session = AsyncMock()
+    token_service.balance_repo.finalize_reservation.return_value = 40
+    emitted_events = []
+    token_service.register_event_handler(lambda e: emitted_events.append(e))
+
+    with pytest.raises(InsufficientTokensError) as exc_info:
+        await token_service.finalize_reservation(session, 42, 1, 50, uuid.uuid4(), uuid.uuid4())
+
+    assert "balance=40" in exc_info.value.message
+    token_service.balance_repo.deduct_with_transaction.assert_not_called()
+    await token_service.flush_events()
+    assert emitted_events[0].event_type == "balance_exhausted"
+    assert emitted_events[0].new_balance == 40
+
+
+@pytest.mark.asyncio
+async def test_release_stale_reservations_uses_cutoff(token_service):
+    """Test stale reservations are released relative to the current time."""
+    session = AsyncMock()
+    token_service.balance_repo.release_stale_reservations.return_value = 3
+
+    before = datetime.now(timezone.utc)
+    refunded = await token_service.release_stale_reservations(session, timedelta(minutes=10))
+
+    assert refunded == 3
+    cutoff = token_service.balance_repo.release_stale_reservations.call_args.args[1]
+    assert before - timedelta(minutes=10) <= cutoff <= datetime.now(timezone.utc)
+
+
+# Token Stats Tests
+
+
+@pytest.mark.asyncio
+async def test_get_token_stats_uses_callers_session(token_service, mock_balance):
+    """Test balance and usage are read one after the other on the caller's session."""
+    session = AsyncMock()
+    token_service.balance_repo.get_or_create.return_value = mock_balance
+    token_service.transaction_repo.get_total_used.return_value = 150
+
+    stats = await token_service.get_token_stats(session, user_id=1)
+
+    assert stats.balance == 1000
+    assert stats.total_used == 150
+    assert stats.limit is None
+    token_service.balance_repo.get_or_create.assert_called_once_with(session, 1)
+    token_service.transaction_repo.get_total_used.assert_called_once_with(session, 1)